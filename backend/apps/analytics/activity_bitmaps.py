@@ -0,0 +1,196 @@
+"""
+Activity bitmaps - which days a user logged each tracker, one bit per day.
+
+ActivityBitmap stores one row per (user, tracker, calendar year): 46 bytes, bit n set when
+the user logged on day n + 1 of that year. Presence questions become bit operations on a
+row or two instead of log-table scans:
+- logged_on / trackers_logged_on: test one bit (every tracker for a day in one query);
+- days_logged / logged_dates: mask the range and count or walk the set bits;
+- streak_length: find the highest unset bit at or below the day.
+
+apps.analytics.signals sets a day's bit on every log write and clears it when a delete or
+edit leaves the day with no logs. Days are the user's local days for timestamped logs;
+sleep and health logs carry a date.
+"""
+
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from apps.users.timezones import user_timezones
+from apps.workouts.models import WorkoutLog
+from .models import ActivityBitmap
+from .streaks import TRACKER_MODELS, distinct_log_days, logs_on
+
+# 366 days rounded up to whole bytes
+BYTES_PER_YEAR = 46
+
+# Streak trackers plus workout sets (the workout heatmap)
+ACTIVITY_MODELS = {**TRACKER_MODELS, 'workout': WorkoutLog}
+ACTIVITY_TRACKERS = tuple(ACTIVITY_MODELS)
+ACTIVITY_BY_MODEL = {model: tracker for tracker, model in ACTIVITY_MODELS.items()}
+
+
+def _bit(day):
+    """Bit index of day within its year's bitmap."""
+    return day.timetuple().tm_yday - 1
+
+
+def _to_int(bits):
+    # Backends hand BinaryField values back as bytes or memoryview
+    return int.from_bytes(bytes(bits), 'little')
+
+
+def _to_bytes(value):
+    return value.to_bytes(BYTES_PER_YEAR, 'little')
+
+
+def _year_spans(date_from, date_to):
+    """(year, mask of the bits date_from..date_to covers in that year) for each year touched."""
+    for year in range(date_from.year, date_to.year + 1):
+        lo = _bit(date_from) if year == date_from.year else 0
+        hi = _bit(date_to) if year == date_to.year else _bit(date(year, 12, 31))
+        yield year, ((1 << (hi - lo + 1)) - 1) << lo
+
+
+def _year_values(user_id, tracker, first_year=None, last_year=None):
+    """{year: bitmap as int} for the tracker's stored years in first_year..last_year, one query."""
+    rows = ActivityBitmap.objects.filter(user_id=user_id, tracker=tracker)
+    if first_year is not None:
+        rows = rows.filter(year__gte=first_year)
+    if last_year is not None:
+        rows = rows.filter(year__lte=last_year)
+    return {year: _to_int(bits) for year, bits in rows.values_list('year', 'bits')}
+
+
+# ========== WRITES ==========
+
+
+def mark_day(user_id, tracker, day):
+    """Set day's bit: the user logged tracker on day."""
+    mark_days(user_id, tracker, [day])
+
+
+def mark_days(user_id, tracker, days):
+    """Set the bits of several days, one row update per year touched."""
+    by_year = {}
+    for day in days:
+        by_year[day.year] = by_year.get(day.year, 0) | 1 << _bit(day)
+    with transaction.atomic():
+        for year, bits in by_year.items():
+            row, _ = ActivityBitmap.objects.select_for_update().get_or_create(
+                user_id=user_id, tracker=tracker, year=year,
+                defaults={'bits': _to_bytes(0)},
+            )
+            value = _to_int(row.bits)
+            if value | bits == value:
+                continue
+            row.bits = _to_bytes(value | bits)
+            row.save(update_fields=['bits', 'updated_at'])
+
+
+def unmark_day(user_id, tracker, day):
+    """Clear day's bit: the user has no tracker logs left on day."""
+    bit = 1 << _bit(day)
+    with transaction.atomic():
+        row = ActivityBitmap.objects.select_for_update().filter(
+            user_id=user_id, tracker=tracker, year=day.year
+        ).first()
+        if row is None:
+            return
+        value = _to_int(row.bits)
+        if not value & bit:
+            return
+        row.bits = _to_bytes(value & ~bit)
+        row.save(update_fields=['bits', 'updated_at'])
+
+
+def unmark_day_if_empty(user_id, tracker, day, zone):
+    """Clear day's bit after a log left it, unless other logs remain on day (one exists check)."""
+    if not logs_on(ACTIVITY_MODELS[tracker], user_id, day, zone).exists():
+        unmark_day(user_id, tracker, day)
+
+
+def rebuild_activity_bitmaps(user_ids=None, trackers=ACTIVITY_TRACKERS):
+    """
+    Rebuild ActivityBitmap rows from the log tables, one distinct-day query per (user, tracker).
+
+    user_ids: optional iterable restricting the rebuild to those users.
+    trackers: the trackers to rebuild (default: all of them).
+    Returns the number of rows written.
+    """
+    written = 0
+    for user_id, zone in user_timezones(user_ids).items():
+        built = []
+        for tracker in trackers:
+            years = {}
+            for day in distinct_log_days(ACTIVITY_MODELS[tracker], user_id, zone):
+                years[day.year] = years.get(day.year, 0) | 1 << _bit(day)
+            built.extend(
+                ActivityBitmap(user_id=user_id, tracker=tracker, year=year, bits=_to_bytes(value))
+                for year, value in years.items()
+            )
+        with transaction.atomic():
+            ActivityBitmap.objects.filter(user_id=user_id, tracker__in=trackers).delete()
+            ActivityBitmap.objects.bulk_create(built)
+        written += len(built)
+    return written
+
+
+# ========== READS ==========
+
+
+def logged_on(user_id, tracker, day):
+    """Whether the user logged tracker on day."""
+    value = _year_values(user_id, tracker, day.year, day.year).get(day.year, 0)
+    return bool(value >> _bit(day) & 1)
+
+
+def trackers_logged_on(user_id, trackers, day):
+    """{tracker: logged on day} for several trackers, in one query."""
+    values = {
+        tracker: _to_int(bits)
+        for tracker, bits in ActivityBitmap.objects.filter(
+            user_id=user_id, tracker__in=trackers, year=day.year
+        ).values_list('tracker', 'bits')
+    }
+    bit = _bit(day)
+    return {tracker: bool(values.get(tracker, 0) >> bit & 1) for tracker in trackers}
+
+
+def days_logged(user_id, tracker, date_from, date_to):
+    """Number of days in date_from..date_to (inclusive) the user logged tracker on."""
+    if date_from > date_to:
+        return 0
+    values = _year_values(user_id, tracker, date_from.year, date_to.year)
+    return sum((values.get(year, 0) & mask).bit_count() for year, mask in _year_spans(date_from, date_to))
+
+
+def logged_dates(user_id, tracker, date_from, date_to):
+    """Sorted days in date_from..date_to (inclusive) the user logged tracker on."""
+    if date_from > date_to:
+        return []
+    values = _year_values(user_id, tracker, date_from.year, date_to.year)
+    days = []
+    for year, mask in _year_spans(date_from, date_to):
+        value = values.get(year, 0) & mask
+        first = date(year, 1, 1)
+        while value:
+            lowest = value & -value
+            days.append(first + timedelta(days=lowest.bit_length() - 1))
+            value ^= lowest
+    return days
+
+
+def streak_length(user_id, tracker, day):
+    """Consecutive logged days ending on day (0 when day itself was not logged)."""
+    values = _year_values(user_id, tracker, last_year=day.year)
+    length, year, top = 0, day.year, _bit(day)
+    while True:
+        # Unlogged days at or before `top`; the run starts just above the highest of them
+        gaps = ~values.get(year, 0) & ((1 << (top + 1)) - 1)
+        if gaps:
+            return length + top - (gaps.bit_length() - 1)
+        length += top + 1
+        year -= 1
+        top = _bit(date(year, 12, 31))
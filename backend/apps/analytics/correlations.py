@@ -0,0 +1,83 @@
+"""
+Correlation engine - Pearson/Spearman matrices between a user's daily metric series.
+
+Inputs are aligned daily columns from the analytics series cache (NaN where a metric was not
+logged). Each pair of metrics is correlated over the days where both have a value
+("pairwise complete"), computed for all pairs at once with a few matrix products instead of
+a loop per pair. A lag of L days correlates each row metric on day t with each column metric
+on day t + L, e.g. sleep (row) against next-day training volume (column) at lag 1.
+"""
+
+import numpy as np
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+MAX_LAG_DAYS = 7
+# Fewer overlapping days than this gives no coefficient
+MIN_PAIRED_DAYS = 5
+
+
+def average_ranks(values):
+    """
+    Ranks of each column of values (1 = smallest), ties sharing their average rank.
+
+    NaN entries stay NaN and are not counted.
+    """
+    ranks = np.full(values.shape, np.nan)
+    for column in range(values.shape[1]):
+        present = ~np.isnan(values[:, column])
+        if not present.any():
+            continue
+        _, inverse, counts = np.unique(values[present, column], return_inverse=True, return_counts=True)
+        ends = np.cumsum(counts)
+        ranks[present, column] = ((ends - counts + 1 + ends) / 2)[inverse]
+    return ranks
+
+
+def correlation_matrix(values, lag=0):
+    """
+    Pairwise-complete Pearson coefficients between the columns of values (days x metrics).
+
+    Returns (r, n): r[i, j] correlates column i on day t with column j on day t + lag and is
+    NaN when fewer than MIN_PAIRED_DAYS days overlap or either side is constant there;
+    n[i, j] is the number of overlapping days.
+    """
+    days, metrics = values.shape
+    if lag >= days:
+        return np.full((metrics, metrics), np.nan), np.zeros((metrics, metrics), dtype=np.int64)
+    leading, following = values[:days - lag], values[lag:]
+
+    lead_mask = (~np.isnan(leading)).astype(np.float64)
+    follow_mask = (~np.isnan(following)).astype(np.float64)
+    lead = np.nan_to_num(leading)
+    follow = np.nan_to_num(following)
+
+    # Every sum below runs only over the days where both metrics of a pair are present
+    n = lead_mask.T @ follow_mask
+    sum_lead = lead.T @ follow_mask
+    sum_follow = lead_mask.T @ follow
+    sum_lead_sq = (lead * lead).T @ follow_mask
+    sum_follow_sq = lead_mask.T @ (follow * follow)
+    sum_product = lead.T @ follow
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sum_product - sum_lead * sum_follow / n
+        lead_variance = sum_lead_sq - sum_lead ** 2 / n
+        follow_variance = sum_follow_sq - sum_follow ** 2 / n
+        r = covariance / np.sqrt(lead_variance * follow_variance)
+
+    # Rounding can leave a constant series with a tiny non-zero variance
+    scale = np.maximum(sum_lead_sq, 1.0) * np.maximum(sum_follow_sq, 1.0)
+    degenerate = (lead_variance * follow_variance) <= scale * 1e-12
+    r[(n < MIN_PAIRED_DAYS) | degenerate] = np.nan
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+def correlations(values, method='pearson', max_lag=0):
+    """
+    Correlation matrices for lags 0..max_lag: [(lag, r, n), ...].
+
+    spearman ranks each metric over all its logged days, then applies Pearson to the ranks.
+    """
+    if method == 'spearman':
+        values = average_ranks(values)
+    return [(lag, *correlation_matrix(values, lag)) for lag in range(max_lag + 1)]
@@ -0,0 +1,48 @@
+"""
+Distributions - histograms and percentiles of one value column, computed in NumPy.
+
+Callers fetch the column once (values_list, or a registry metric's daily values) and hand
+it over as a sequence; nothing here touches the database. Results are compact: bin edges
+and counts as parallel arrays rather than one object per bin.
+"""
+
+import numpy as np
+
+DEFAULT_BINS = 20
+MAX_BINS = 200
+PERCENTILES = (10, 50, 90)
+
+
+def _rounded(value):
+    return round(float(value), 4)
+
+
+def distribution(values, bins=DEFAULT_BINS):
+    """
+    Summary of values (None/NaN entries ignored): count, min, max, mean, p10/p50/p90 and a
+    histogram of `bins` equal-width bins from min to max.
+
+    'bin_edges' has bins + 1 entries; 'counts'[i] covers bin_edges[i]..bin_edges[i + 1], the
+    last bin including its upper edge. With no values every statistic is None and both
+    arrays are empty.
+    """
+    values = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {
+            'count': 0, 'min': None, 'max': None, 'mean': None,
+            'percentiles': {f'p{p}': None for p in PERCENTILES},
+            'bin_edges': [], 'counts': [],
+        }
+
+    counts, edges = np.histogram(values, bins=bins)
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        'count': int(values.size),
+        'min': _rounded(values.min()),
+        'max': _rounded(values.max()),
+        'mean': _rounded(values.mean()),
+        'percentiles': {f'p{p}': _rounded(value) for p, value in zip(PERCENTILES, percentiles)},
+        'bin_edges': [_rounded(edge) for edge in edges],
+        'counts': counts.tolist(),
+    }
@@ -0,0 +1,137 @@
+"""
+Downsampling for point-series chart endpoints.
+
+Per-set charts (rest time, attributes) return one point per logged set, which over a year
+reaches megabytes. Endpoints accept ?max_points=N; above N points the series is reduced
+with Largest-Triangle-Three-Buckets, which keeps the first and last points and, from each
+bucket in between, the point forming the largest triangle with its neighbours, so peaks
+and troughs survive. Aggregates (averages, ratios) are computed before downsampling.
+"""
+
+from datetime import date
+from functools import wraps
+
+import numpy as np
+from rest_framework import status
+from rest_framework.response import Response
+
+# LTTB needs the two end points plus at least one bucket
+MIN_MAX_POINTS = 3
+
+
+def parse_max_points(request):
+    """
+    The request's max_points as an int, or None when absent.
+
+    Raises ValueError with a client-facing message when it is not an integer >= 3.
+    """
+    raw = request.GET.get('max_points')
+    if raw in (None, ''):
+        return None
+    try:
+        max_points = int(raw)
+    except ValueError:
+        max_points = None
+    if max_points is None or max_points < MIN_MAX_POINTS:
+        raise ValueError(f'max_points must be an integer >= {MIN_MAX_POINTS}')
+    return max_points
+
+
+def with_max_points(view):
+    """
+    Decorate a function view to receive the parsed max_points keyword argument; an invalid
+    max_points is answered with a 400 before the view runs. Goes below @permission_classes.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            max_points = parse_max_points(request)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': {'message': str(e)}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return view(request, *args, max_points=max_points, **kwargs)
+    return wrapper
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps from (x, y).
+
+    x must be non-decreasing. Returns every index when there are threshold or fewer points;
+    a threshold below 3 keeps just the end points.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < MIN_MAX_POINTS:
+        return np.array([0, n - 1][:max(threshold, 0)], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # threshold - 2 buckets over the points between the two ends
+    edges = (np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)) + 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # The next bucket is represented by its average point (the last point for the final bucket)
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def _date_ordinal(value):
+    """x position of a point's 'date' (ISO date or datetime string)."""
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+def _lttb_positions(points, max_points, value_key):
+    """Positions in points that LTTB keeps; points without a value are left out."""
+    valued = [position for position, point in enumerate(points) if point.get(value_key) is not None]
+    if len(valued) <= max_points:
+        return valued
+    keep = lttb_indices(
+        [_date_ordinal(points[position]['date']) for position in valued],
+        [points[position][value_key] for position in valued],
+        max_points,
+    )
+    return [valued[i] for i in keep]
+
+
+def downsample_points(points, max_points, value_key, group_key=None):
+    """
+    Reduce chronological chart points to at most max_points, shaped on value_key.
+
+    group_key: points sharing this key's value form separate series (e.g. with and
+    without attributes); each gets a share of max_points proportional to its size and the
+    kept points are returned in their original order.
+    Returns points unchanged when max_points is None or not exceeded.
+    """
+    if max_points is None or len(points) <= max_points:
+        return points
+    if group_key is None:
+        return [points[position] for position in _lttb_positions(points, max_points, value_key)]
+
+    groups = {}
+    for position, point in enumerate(points):
+        groups.setdefault(point.get(group_key), []).append(position)
+    kept = []
+    for members in groups.values():
+        share = max(1, max_points * len(members) // len(points))
+        group_points = [points[position] for position in members]
+        kept.extend(members[i] for i in _lttb_positions(group_points, share, value_key))
+    return [points[position] for position in sorted(kept)]
@@ -0,0 +1,49 @@
+"""
+Goal timeline - "which UserGoal was in effect on day D" without a query per day.
+
+Charts that draw a goal line walk a date range and need the most recent goal created on or
+before each day. GoalTimeline loads the user's goal history once, sorted by created_at, and
+answers each lookup with a binary search.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, time
+
+from django.utils import timezone
+
+from apps.users.models import UserGoal
+
+
+class GoalTimeline:
+    """A user's UserGoal history in creation order."""
+
+    def __init__(self, goals):
+        self.goals = sorted(goals, key=lambda goal: (goal.created_at, goal.pk))
+        self._created = [goal.created_at for goal in self.goals]
+
+    @classmethod
+    def for_user(cls, user, until=None):
+        """
+        Load the user's goals in one query.
+
+        until: optional date; goals created after its midnight can never be in effect
+        for it or any earlier day, so they are not loaded.
+        """
+        goals = UserGoal.objects.filter(user=user)
+        if until is not None:
+            goals = goals.filter(created_at__lte=_day_start(until))
+        return cls(goals)
+
+    def goal_on(self, on_date):
+        """
+        Most recent goal created on or before on_date's midnight, or None.
+
+        Matches the created_at__lte=<date> filter the charts used per day before.
+        """
+        index = bisect_right(self._created, _day_start(on_date))
+        return self.goals[index - 1] if index else None
+
+
+def _day_start(on_date):
+    """Midnight starting on_date in the current time zone."""
+    return timezone.make_aware(datetime.combine(on_date, time.min))
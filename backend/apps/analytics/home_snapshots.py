@@ -0,0 +1,345 @@
+"""
+Home dashboard snapshots - cached per (user, local calendar day), rebuilt by section.
+
+The home dashboard is split into independent sections, each built by one function below
+and stored as a JSON column on HomeDashboardSnapshot:
+
+    goals      latest UserGoal values
+    nutrition  FoodLog nutrient vector for the day (one aggregate, apps.analytics.rollups)
+    activity   cardio calories and steps for the day
+    body       height and latest weight (used for the steps calorie estimate)
+    split      current split day and activation targets vs done
+    trackers   which trackers have an entry for the day (apps.analytics.activity_bitmaps)
+
+apps.analytics.signals clears exactly the sections a write can affect (for that user, and
+for that day where the write is tied to one), so a dashboard request only rebuilds the
+sections that were cleared and serves the rest from the snapshot. Only days next to the
+user's local today are cached; other dates are built on each request.
+Derived numbers (remaining macros, calorie budget, missing-tracker list) are recomputed from
+the sections on every request; they need no queries.
+"""
+
+from django.db.models import F, Sum
+
+from apps.logging.models import CardioLog, FoodLog, StepsLog, WeightLog
+from apps.users.models import UserGoal
+from apps.users.timezones import day_bounds, local_today, user_timezone
+from apps.workouts.split_calendar import SplitCalendar, activation_by_muscle
+from .activity_bitmaps import trackers_logged_on
+from .metrics import NUTRIENT_METRICS
+from .models import HomeDashboardSnapshot
+from .rollups import NUTRIENT_VECTOR_INDEX, food_log_nutrient_vector
+from .weight_trend import weight_in_kg
+
+_MACRO_KEYS = ('calories', 'protein', 'carbohydrates', 'fat')
+
+# Food-log field → UserGoal attribute → display label, unit (home extended nutrients).
+_HOME_EXTENDED_NUTRIENT_SPECS = tuple(
+    (metric.field, metric.goal_field, metric.label, metric.unit)
+    for metric in NUTRIENT_METRICS
+    if metric.field not in _MACRO_KEYS
+)
+
+_TRACKER_LABELS = {
+    'weight': 'Weight',
+    'water': 'Water',
+    'body_measurement': 'Body measurements',
+    'steps': 'Steps',
+    'cardio': 'Cardio',
+    'sleep': 'Sleep',
+    'health_metrics': 'Health metrics',
+}
+
+
+def home_dashboard_today_date(user):
+    """Today in the user's timezone; the dashboard's default day."""
+    return local_today(user)
+
+
+def latest_user_goal(user):
+    return UserGoal.objects.filter(user=user).order_by('-updated_at', '-created_at').first()
+
+
+def weight_kg_latest(user):
+    """Most recent weight log in kilograms, or None."""
+    wl = WeightLog.objects.filter(user=user).order_by('-date_time', '-created_at').first()
+    if not wl or wl.weight is None:
+        return None
+    return round(weight_in_kg(wl.weight, wl.weight_unit), 2)
+
+
+def steps_to_walking_kcal(steps, height_cm, weight_kg):
+    """
+    Approximate walking kcal from steps using stride length from height (m) and body mass.
+    stride ≈ 0.414 × height_m; energy ≈ 0.7 kcal/kg/km (walking).
+    """
+    if not steps or steps <= 0 or not height_cm or not weight_kg:
+        return 0.0
+    height_m = float(height_cm) / 100.0
+    stride_m = height_m * 0.414
+    distance_km = (steps * stride_m) / 1000.0
+    return round(distance_km * float(weight_kg) * 0.7, 1)
+
+
+# ========== SECTION BUILDERS ==========
+# Each takes (user, target_date, day_start, day_end) and returns a JSON-serialisable dict.
+
+
+def _build_goals(user, target_date, day_start, day_end):
+    goals = latest_user_goal(user)
+    if not goals:
+        return {'exists': False, 'macros': dict.fromkeys(_MACRO_KEYS)}
+    return {
+        'exists': True,
+        'macros': {
+            'calories': int(goals.calories_goal) if goals.calories_goal is not None else None,
+            'protein': float(goals.protein_goal) if goals.protein_goal is not None else None,
+            'carbohydrates': float(goals.carbohydrates_goal) if goals.carbohydrates_goal is not None else None,
+            'fat': float(goals.fat_goal) if goals.fat_goal is not None else None,
+        },
+        'extended': {
+            field_key: float(getattr(goals, attr_goal))
+            for field_key, attr_goal, _, _ in _HOME_EXTENDED_NUTRIENT_SPECS
+            if getattr(goals, attr_goal, None) is not None
+        },
+        'cost': float(goals.cost_goal) if goals.cost_goal is not None else None,
+        'tokens': int(goals.tokens_goal) if goals.tokens_goal is not None else None,
+    }
+
+
+def _build_nutrition(user, target_date, day_start, day_end):
+    totals = food_log_nutrient_vector(FoodLog.objects.filter(
+        user=user, date_time__gte=day_start, date_time__lt=day_end
+    ))
+    nutrient_keys = _MACRO_KEYS + tuple(spec[0] for spec in _HOME_EXTENDED_NUTRIENT_SPECS)
+    return {
+        'consumed': {
+            key: round(float(totals[NUTRIENT_VECTOR_INDEX[key]]), 1) for key in nutrient_keys
+        },
+        'cost': round(float(totals[NUTRIENT_VECTOR_INDEX['cost']]), 1),
+        'tokens': int(totals[NUTRIENT_VECTOR_INDEX['tokens_used']]),
+    }
+
+
+def _build_activity(user, target_date, day_start, day_end):
+    cardio_sum = CardioLog.objects.filter(
+        user=user, date_time__gte=day_start, date_time__lt=day_end
+    ).aggregate(total=Sum('calories_burned'))
+    steps_sum = StepsLog.objects.filter(
+        user=user, date_time__gte=day_start, date_time__lt=day_end
+    ).aggregate(total=Sum('steps'))
+    return {
+        'cardio_calories': int(cardio_sum['total'] or 0),
+        'steps': int(steps_sum['total'] or 0),
+    }
+
+
+def _build_body(user, target_date, day_start, day_end):
+    return {
+        'height_cm': float(user.height) if user.height else None,
+        'weight_kg': weight_kg_latest(user),
+    }
+
+
+def _build_split(user, target_date, day_start, day_end):
+    split_section = {
+        'active_split': None,
+        'current_split_day': None,
+        'muscle_rows': [],
+    }
+    calendar = SplitCalendar.for_user(user, on_date=target_date)
+    current_day = calendar.day_for(target_date) if calendar else None
+    if not current_day:
+        return split_section
+
+    active_split = calendar.split
+    actual_map = activation_by_muscle(user, day_start, day_end)
+    rows = []
+    for t in calendar.targets(current_day):
+        mid = t.muscle.muscles_id
+        tgt = int(t.target_activation or 0)
+        act = int(actual_map.get(mid, 0))
+        rows.append({
+            'muscle_id': mid,
+            'muscle_name': t.muscle.muscle_name,
+            'target_activation': tgt,
+            'done_activation': act,
+            'remaining_activation': max(0, tgt - act),
+        })
+    return {
+        'active_split': {
+            'splits_id': active_split.splits_id,
+            'split_name': active_split.split_name,
+            'start_date': active_split.start_date.isoformat() if active_split.start_date else None,
+        },
+        'current_split_day': {
+            'split_days_id': current_day.split_days_id,
+            'day_name': current_day.day_name,
+            'day_order': current_day.day_order,
+        },
+        'muscle_rows': rows,
+    }
+
+
+def _build_trackers(user, target_date, day_start, day_end):
+    # One activity-bitmap row per tracker instead of a log-table probe each
+    return trackers_logged_on(user.pk, tuple(_TRACKER_LABELS), target_date)
+
+
+# Snapshots are kept for the user's local today and the days either side of it
+CACHED_DAYS_AROUND_TODAY = 1
+
+# Snapshot column -> builder
+SECTION_BUILDERS = {
+    'goals': _build_goals,
+    'nutrition': _build_nutrition,
+    'activity': _build_activity,
+    'body': _build_body,
+    'split': _build_split,
+    'trackers': _build_trackers,
+}
+
+
+# ========== SNAPSHOTS ==========
+
+
+def invalidate_home_sections(user_id, sections, dates=None):
+    """
+    Clear cached sections so the next dashboard request rebuilds them.
+
+    dates: the user's local calendar days to clear; None clears every cached day for the user
+    (for writes such as goal, split or profile edits that are not tied to one day).
+    """
+    snapshots = HomeDashboardSnapshot.objects.filter(user_id=user_id)
+    if dates is not None:
+        snapshots = snapshots.filter(date__in=list(dates))
+    snapshots.update(version=F('version') + 1, **dict.fromkeys(sections))
+
+
+def home_dashboard_sections(user, target_date):
+    """
+    Sections for one user and local day (User.timezone), rebuilding only those missing from the snapshot.
+
+    Only days within CACHED_DAYS_AROUND_TODAY of the user's local today are cached; other
+    dates are built in full and not stored, so arbitrary ?date= values cannot grow the table.
+    Rebuilt sections are written back only if no invalidation landed while they were being
+    computed (the version check); otherwise they are served once and rebuilt next time.
+    """
+    day_start, day_end = day_bounds(target_date, user_timezone(user))
+    if abs((target_date - local_today(user)).days) > CACHED_DAYS_AROUND_TODAY:
+        return {
+            name: builder(user, target_date, day_start, day_end)
+            for name, builder in SECTION_BUILDERS.items()
+        }
+
+    snapshot, _ = HomeDashboardSnapshot.objects.get_or_create(user=user, date=target_date)
+    missing = [name for name in SECTION_BUILDERS if getattr(snapshot, name) is None]
+    if not missing:
+        return {name: getattr(snapshot, name) for name in SECTION_BUILDERS}
+
+    built = {
+        name: SECTION_BUILDERS[name](user, target_date, day_start, day_end)
+        for name in missing
+    }
+    HomeDashboardSnapshot.objects.filter(
+        pk=snapshot.pk, version=snapshot.version
+    ).update(**built)
+    for name, value in built.items():
+        setattr(snapshot, name, value)
+    return {name: getattr(snapshot, name) for name in SECTION_BUILDERS}
+
+
+def home_dashboard_payload(user, target_date):
+    """Assemble the home dashboard response data from the (cached) sections."""
+    sections = home_dashboard_sections(user, target_date)
+    goals = sections['goals']
+    nutrition = sections['nutrition']
+    activity = sections['activity']
+    body = sections['body']
+
+    goal_macros = goals['macros']
+    consumed = {key: nutrition['consumed'][key] for key in _MACRO_KEYS}
+
+    extended_nutrients = []
+    if goals['exists']:
+        for field_key, _, label, unit in _HOME_EXTENDED_NUTRIENT_SPECS:
+            goal_f = goals['extended'].get(field_key)
+            if goal_f is None:
+                continue
+            consumed_f = nutrition['consumed'][field_key]
+            extended_nutrients.append({
+                'key': field_key,
+                'label': label,
+                'goal': round(goal_f, 1),
+                'consumed': consumed_f,
+                'remaining': round(goal_f - consumed_f, 1),
+                'unit': unit,
+            })
+        if goals['cost'] is not None:
+            cg = goals['cost']
+            cc = nutrition['cost']
+            extended_nutrients.append({
+                'key': 'cost',
+                'label': 'Cost',
+                'goal': round(cg, 1),
+                'consumed': cc,
+                'remaining': round(cg - cc, 1),
+                'unit': '$',
+            })
+        if goals['tokens'] is not None:
+            tg = goals['tokens']
+            tu = nutrition['tokens']
+            extended_nutrients.append({
+                'key': 'tokens',
+                'label': 'Tokens',
+                'goal': float(tg),
+                'consumed': float(tu),
+                'remaining': float(tg - tu),
+                'unit': '',
+            })
+
+    macro_remaining = {}
+    for key in ('protein', 'carbohydrates', 'fat'):
+        g = goal_macros.get(key)
+        if g is not None:
+            macro_remaining[key] = round(g - consumed[key], 1)
+        else:
+            macro_remaining[key] = None
+
+    cardio_calories = activity['cardio_calories']
+    steps_today = activity['steps']
+    height_cm = body['height_cm']
+    weight_kg = body['weight_kg']
+    steps_calories = steps_to_walking_kcal(steps_today, height_cm, weight_kg)
+
+    calorie_remaining = None
+    if goal_macros['calories'] is not None:
+        calorie_remaining = round(
+            goal_macros['calories']
+            - consumed['calories']
+            + cardio_calories
+            + steps_calories,
+            1,
+        )
+
+    # Iterate the labels, not the stored dict: JSON columns need not keep key order
+    trackers_not_logged = [
+        {'id': k, 'label': label}
+        for k, label in _TRACKER_LABELS.items() if not sections['trackers'].get(k)
+    ]
+
+    return {
+        'date': target_date.isoformat(),
+        'goals': goal_macros,
+        'consumed': consumed,
+        'macro_remaining': macro_remaining,
+        'cardio_calories_burned': cardio_calories,
+        'steps_today': steps_today,
+        'steps_calories_estimate': steps_calories,
+        'calorie_remaining': calorie_remaining,
+        'split': sections['split'],
+        'trackers_not_logged': trackers_not_logged,
+        'weight_kg_used_for_steps': weight_kg,
+        'height_cm': height_cm,
+        'extended_nutrients': extended_nutrients,
+    }
@@ -0,0 +1,126 @@
+"""
+Django Management Command: rebuild_rollups
+
+Rebuilds the analytics rollup tables from the raw log tables. Run once after deploying
+the rollup migrations, and any time rollups are suspected to have drifted.
+
+Usage:
+    python manage.py rebuild_rollups --nutrition             # Rebuild DailyNutritionRollup
+    python manage.py rebuild_rollups --workouts              # Rebuild WorkoutDayRollup
+    python manage.py rebuild_rollups --weight-trend          # Rebuild WeightTrend
+    python manage.py rebuild_rollups --muscle-fatigue        # Rebuild MuscleFatigue
+    python manage.py rebuild_rollups --streaks               # Rebuild TrackerStreak
+    python manage.py rebuild_rollups --bitmaps               # Rebuild ActivityBitmap
+    python manage.py rebuild_rollups --all                   # Rebuild every rollup
+    python manage.py rebuild_rollups --all --user 12 --user 15
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.activity_bitmaps import rebuild_activity_bitmaps
+from apps.analytics.rollups import backfill_daily_nutrition, backfill_workout_days
+from apps.analytics.muscle_fatigue import rebuild_muscle_fatigue
+from apps.analytics.series_cache import invalidate_user_series
+from apps.analytics.streaks import backfill_streaks
+from apps.analytics.weight_trend import backfill_weight_trends
+
+
+class Command(BaseCommand):
+    help = 'Rebuild analytics rollup tables from raw logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--nutrition',
+            action='store_true',
+            help='Rebuild daily nutrition rollups from food logs',
+        )
+        parser.add_argument(
+            '--workouts',
+            action='store_true',
+            help='Rebuild per-day workout rollups from workout logs',
+        )
+        parser.add_argument(
+            '--weight-trend',
+            action='store_true',
+            help="Rebuild per-user weight trends (Holt's smoothing) from weight logs",
+        )
+        parser.add_argument(
+            '--muscle-fatigue',
+            action='store_true',
+            help='Rebuild per-muscle fatigue from recent workout logs',
+        )
+        parser.add_argument(
+            '--streaks',
+            action='store_true',
+            help='Rebuild per-tracker logging streaks from log dates',
+        )
+        parser.add_argument(
+            '--bitmaps',
+            action='store_true',
+            help='Rebuild per-tracker activity-day bitmaps from log dates',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild every rollup table',
+        )
+        parser.add_argument(
+            '--user',
+            action='append',
+            type=int,
+            dest='user_ids',
+            help='Restrict the rebuild to this user_id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the requested rebuilds."""
+        rebuild_all = options['all']
+        user_ids = options['user_ids']
+
+        if not (rebuild_all or options['nutrition'] or options['workouts']
+                or options['weight_trend'] or options['muscle_fatigue'] or options['streaks']
+                or options['bitmaps']):
+            self.stdout.write(self.style.WARNING(
+                'Please specify an option. Use --help for available options.'
+            ))
+            return
+
+        if rebuild_all or options['nutrition']:
+            written = backfill_daily_nutrition(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] Daily nutrition rollups rebuilt ({written} rows)'
+            ))
+
+
+        if rebuild_all or options['workouts']:
+            written = backfill_workout_days(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] Workout day rollups rebuilt ({written} rows)'
+            ))
+
+        if rebuild_all or options['weight_trend']:
+            written = backfill_weight_trends(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] Weight trends rebuilt ({written} users)'
+            ))
+
+        if rebuild_all or options['muscle_fatigue']:
+            written = rebuild_muscle_fatigue(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] Muscle fatigue rebuilt ({written} rows)'
+            ))
+
+        if rebuild_all or options['streaks']:
+            written = backfill_streaks(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] Tracker streaks rebuilt ({written} rows)'
+            ))
+
+        if rebuild_all or options['bitmaps']:
+            written = rebuild_activity_bitmaps(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'[OK] Activity bitmaps rebuilt ({written} rows)'
+            ))
+
+        # Cached analytics series are built from the rollups
+        invalidate_user_series(user_ids)
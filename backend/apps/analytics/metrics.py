@@ -0,0 +1,252 @@
+"""
+Metric registry - one declaration per daily metric, and the engine that loads them.
+
+A Source names a table, the field its rows are bucketed into days by (the user's local
+days, see apps.users.timezones), and how a day's rows become one value: SQL aggregates per
+metric (pick=None), or a single row per day ('first' by pk, or the 'latest' by timestamp)
+read in Python. A Metric declares its source, the
+field it reads (an expression on aggregate sources, or a compute function over several fields
+on row-pick sources), its aggregate, and how it is presented: label, unit, the value type,
+and the value shown on days with nothing logged.
+
+load_metric_days() compiles any set of metric keys over a date range into at most one
+grouped query per source table. The series cache, the workout progression overlays, the
+generic /api/analytics/series/ endpoint and the nutrient lists used by the food charts and
+the home dashboard all read their definitions from here.
+
+Keys are "<source>__<name>", matching the overlay keys the client already sends.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db.models import Avg, Count, DecimalField, ExpressionWrapper, F, Max, Sum
+
+from apps.health.models import HealthMetricsLog, SleepLog
+from apps.logging.models import CardioLog, StepsLog, WaterLog, WeightLog
+from apps.users.timezones import LocalDate, day_range, user_timezone
+from apps.workouts.models import WorkoutLog
+from .models import DailyNutritionRollup
+
+_AGGREGATES = {'sum': Sum, 'avg': Avg, 'count': Count, 'max': Max}
+
+
+def sleep_minutes(on_date, went_to_bed, got_out_of_bed):
+    """Minutes in bed for a sleep log; getting up before bedtime means the night crossed midnight."""
+    out = datetime.combine(on_date, got_out_of_bed)
+    bed = datetime.combine(on_date, went_to_bed)
+    if out < bed:
+        out += timedelta(days=1)
+    return (out - bed).total_seconds() / 60.0
+
+
+class Source:
+    """A table metrics are read from, bucketed into days by date_field."""
+
+    def __init__(self, name, model, date_field='date_time', pick=None):
+        self.name = name
+        self.model = model
+        self.date_field = date_field
+        # None: SQL aggregates per day; 'first': first row by pk; 'latest': last row by date_field
+        self.pick = pick
+        self.is_datetime = model._meta.get_field(date_field).get_internal_type() == 'DateTimeField'
+
+    def day_expression(self, zone):
+        """The row's calendar day: local day in zone for timestamps, the stored date otherwise."""
+        return LocalDate(self.date_field, zone) if self.is_datetime else F(self.date_field)
+
+    def rows(self, user_id, zone, date_from=None, date_to=None):
+        """The user's rows on days date_from..date_to (inclusive; either bound optional)."""
+        if self.is_datetime:
+            bounds = day_range(self.date_field, zone, date_from, date_to)
+        else:
+            bounds = {}
+            if date_from is not None:
+                bounds[f'{self.date_field}__gte'] = date_from
+            if date_to is not None:
+                bounds[f'{self.date_field}__lte'] = date_to
+        return self.model.objects.filter(user_id=user_id, **bounds)
+
+
+class Metric:
+    """One daily metric. value_type/decimals/default shape the value returned by present()."""
+
+    def __init__(self, key, source, field, aggregate='sum', label='', unit='',
+                 value_type=float, decimals=None, default=None, fields=None, compute=None,
+                 goal_field=None):
+        self.key = key
+        self.source = source
+        self.field = field
+        self.aggregate = aggregate
+        self.label = label
+        self.unit = unit
+        self.value_type = value_type
+        self.decimals = decimals
+        self.default = default
+        # Row-pick sources only: compute(day, *fields) derives the value from several fields
+        self.fields = fields or (field,)
+        self.compute = compute
+        self.goal_field = goal_field
+
+    def present(self, value):
+        """A loaded raw value (None when nothing was logged) as the API reports it."""
+        if value is None:
+            return self.default
+        value = self.value_type(value)
+        return round(value, self.decimals) if self.decimals is not None else value
+
+
+FOOD = Source('food', DailyNutritionRollup, date_field='date')
+WORKOUT_LOG = Source('workout_log', WorkoutLog)
+WEIGHT = Source('weight', WeightLog, pick='latest')
+STEPS = Source('steps', StepsLog)
+WATER = Source('water', WaterLog)
+CARDIO = Source('cardio', CardioLog)
+SLEEP = Source('sleep', SleepLog, pick='first')
+HEALTH = Source('health', HealthMetricsLog, pick='first')
+
+# (field, label, unit, UserGoal field); DailyNutritionRollup columns, in rollup order
+_NUTRIENTS = (
+    ('calories', 'Calories', 'kcal', 'calories_goal'),
+    ('protein', 'Protein', 'g', 'protein_goal'),
+    ('fat', 'Fat', 'g', 'fat_goal'),
+    ('carbohydrates', 'Carbohydrates', 'g', 'carbohydrates_goal'),
+    ('fiber', 'Fiber', 'g', 'fiber_goal'),
+    ('sodium', 'Sodium', 'mg', 'sodium_goal'),
+    ('sugar', 'Sugar', 'g', 'sugar_goal'),
+    ('saturated_fat', 'Sat. fat', 'g', 'saturated_fat_goal'),
+    ('trans_fat', 'Trans fat', 'g', 'trans_fat_goal'),
+    ('calcium', 'Calcium', 'mg', 'calcium_goal'),
+    ('iron', 'Iron', 'mg', 'iron_goal'),
+    ('magnesium', 'Magnesium', 'mg', 'magnesium_goal'),
+    ('cholesterol', 'Cholesterol', 'mg', 'cholesterol_goal'),
+    ('vitamin_a', 'Vitamin A', 'µg', 'vitamin_a_goal'),
+    ('vitamin_c', 'Vitamin C', 'mg', 'vitamin_c_goal'),
+    ('vitamin_d', 'Vitamin D', 'µg', 'vitamin_d_goal'),
+    ('caffeine', 'Caffeine', 'mg', 'caffeine_goal'),
+)
+
+_HEALTH = (
+    ('resting_heart_rate', 'Resting heart rate', 'bpm'),
+    ('blood_pressure_systolic', 'Blood pressure (systolic)', 'mmHg'),
+    ('blood_pressure_diastolic', 'Blood pressure (diastolic)', 'mmHg'),
+    ('morning_energy', 'Morning energy', ''),
+    ('stress_level', 'Stress level', ''),
+    ('mood', 'Mood', ''),
+    ('soreness', 'Soreness', ''),
+    ('illness_level', 'Illness level', ''),
+)
+
+_SLEEP = (
+    ('time_in_light_sleep', 'Light sleep', 'min'),
+    ('time_in_deep_sleep', 'Deep sleep', 'min'),
+    ('time_in_rem_sleep', 'REM sleep', 'min'),
+    ('number_of_times_woke_up', 'Times woke up', ''),
+    ('resting_heart_rate', 'Sleeping heart rate', 'bpm'),
+)
+
+METRICS = (
+    tuple(
+        Metric(f'food__total_{field}', FOOD, field, label=label, unit=unit,
+               decimals=2, default=0.0, goal_field=goal_field)
+        for field, label, unit, goal_field in _NUTRIENTS
+    )
+    + (
+        Metric('food__total_cost', FOOD, 'cost', label='Food cost', decimals=2, default=0.0,
+               goal_field='cost_goal'),
+        Metric('cardio__calories_burned', CARDIO, 'calories_burned', label='Cardio calories burned',
+               unit='kcal', value_type=int, default=0),
+        Metric('cardio__duration', CARDIO, 'duration', label='Cardio duration', unit='min', default=0.0),
+        Metric('cardio__distance', CARDIO, 'distance', label='Cardio distance', unit='mi', default=0.0),
+        Metric('steps__total_steps', STEPS, 'steps', label='Steps', value_type=int, default=0),
+        Metric('water__total_water', WATER, 'amount', label='Water', default=0.0),
+        Metric('weight__weight', WEIGHT, 'weight', label='Weight'),
+        Metric('sleep__total_sleep_time', SLEEP, None, label='Total sleep time', unit='min',
+               fields=('date_time', 'time_went_to_bed', 'time_got_out_of_bed'), compute=sleep_minutes),
+        Metric('workout_log__total_sets', WORKOUT_LOG, 'workout_log_id', aggregate='count',
+               label='Total sets', value_type=int, default=0),
+        Metric('workout_log__total_reps', WORKOUT_LOG, 'reps', label='Total reps', value_type=int, default=0),
+        Metric('workout_log__total_volume', WORKOUT_LOG,
+               ExpressionWrapper(F('weight') * F('reps'), output_field=DecimalField(max_digits=16, decimal_places=2)),
+               label='Training volume', unit='weight x reps', decimals=2, default=0.0),
+        Metric('workout_log__avg_rest_time', WORKOUT_LOG, 'rest_time', aggregate='avg',
+               label='Avg rest time', unit='s', decimals=2, default=0.0),
+    )
+    + tuple(
+        Metric(f'sleep__{field}', SLEEP, field, label=label, unit=unit, value_type=int)
+        for field, label, unit in _SLEEP
+    )
+    + tuple(
+        Metric(f'health__{field}', HEALTH, field, label=label, unit=unit, value_type=int)
+        for field, label, unit in _HEALTH
+    )
+)
+
+METRIC_REGISTRY = {metric.key: metric for metric in METRICS}
+
+# Food nutrient metrics in DailyNutritionRollup column order
+NUTRIENT_METRICS = tuple(METRIC_REGISTRY[f'food__total_{field}'] for field, _, _, _ in _NUTRIENTS)
+
+
+def _load_grouped(source, metrics, user_id, zone, date_from, date_to):
+    """SQL aggregates per day for metrics on an aggregate source: {key: {date: value}}."""
+    aliases = {f'm{index}': metric for index, metric in enumerate(metrics)}
+    rows = source.rows(user_id, zone, date_from, date_to).annotate(
+        day=source.day_expression(zone)
+    ).values('day').annotate(**{
+        alias: _AGGREGATES[metric.aggregate](metric.field) for alias, metric in aliases.items()
+    }).order_by()
+
+    loaded = {metric.key: {} for metric in metrics}
+    for row in rows:
+        for alias, metric in aliases.items():
+            if row[alias] is not None:
+                loaded[metric.key][row['day']] = row[alias]
+    return loaded
+
+
+def _load_picked(source, metrics, user_id, zone, date_from, date_to):
+    """One row per day for metrics on a row-pick source: {key: {date: value}}."""
+    fields = sorted({field for metric in metrics for field in metric.fields})
+    ordering = ('pk',) if source.pick == 'first' else (source.date_field, 'pk')
+    rows = source.rows(user_id, zone, date_from, date_to).annotate(
+        day=source.day_expression(zone)
+    ).order_by(*ordering).values('day', *fields)
+
+    by_day = {}
+    for row in rows:
+        if source.pick == 'first':
+            by_day.setdefault(row['day'], row)
+        else:
+            by_day[row['day']] = row
+
+    loaded = {metric.key: {} for metric in metrics}
+    for day, row in by_day.items():
+        for metric in metrics:
+            if metric.compute is not None:
+                value = metric.compute(*(row[field] for field in metric.fields))
+            else:
+                value = row[metric.field]
+            if value is not None:
+                loaded[metric.key][day] = value
+    return loaded
+
+
+def load_metric_days(user_id, metric_keys, date_from=None, date_to=None, zone=None):
+    """
+    Raw daily values for metric_keys: {key: {date: value}}, days without data left out.
+
+    Metrics are grouped by source and each source is read with a single query; either
+    date bound may be None to load the whole history. Days are the user's local days;
+    pass zone when the caller has it, otherwise it is looked up. Unknown keys raise KeyError.
+    """
+    by_source = {}
+    for key in dict.fromkeys(metric_keys):
+        metric = METRIC_REGISTRY[key]
+        by_source.setdefault(metric.source, []).append(metric)
+
+    zone = zone or user_timezone(user_id)
+    loaded = {}
+    for source, metrics in by_source.items():
+        load = _load_grouped if source.pick is None else _load_picked
+        loaded.update(load(source, metrics, user_id, zone, date_from, date_to))
+    return loaded
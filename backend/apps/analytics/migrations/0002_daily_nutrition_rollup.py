@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutritionRollup',
+            fields=[
+                ('rollup_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('calories', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('protein', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('fat', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('carbohydrates', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('fiber', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('sodium', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('sugar', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('saturated_fat', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('trans_fat', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('calcium', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('iron', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('magnesium', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('cholesterol', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('vitamin_a', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('vitamin_c', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('vitamin_d', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('caffeine', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('tokens_used', models.IntegerField(default=0)),
+                ('log_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'daily_nutrition_rollup',
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0004_workoutlog_attribute_inputs_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0002_daily_nutrition_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutDayRollup',
+            fields=[
+                ('rollup_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('set_count', models.IntegerField(default=0)),
+                ('attribute_set_count', models.IntegerField(default=0)),
+                ('total_reps', models.IntegerField(default=0)),
+                ('total_rir', models.IntegerField(default=0)),
+                ('weighted_set_count', models.IntegerField(default=0)),
+                ('weighted_reps', models.IntegerField(default=0)),
+                ('weight_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('max_weight', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('avg_rest_time', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('best_e1rm', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('workout', models.ForeignKey(db_column='workout_id', on_delete=django.db.models.deletion.CASCADE, to='workouts.workout')),
+            ],
+            options={
+                'db_table': 'workout_day_rollup',
+                'unique_together': {('user', 'date', 'workout')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0003_workout_day_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeDashboardSnapshot',
+            fields=[
+                ('snapshot_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('goals', models.JSONField(blank=True, null=True)),
+                ('nutrition', models.JSONField(blank=True, null=True)),
+                ('activity', models.JSONField(blank=True, null=True)),
+                ('body', models.JSONField(blank=True, null=True)),
+                ('split', models.JSONField(blank=True, null=True)),
+                ('trackers', models.JSONField(blank=True, null=True)),
+                ('version', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'home_dashboard_snapshot',
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0004_home_dashboard_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSeriesStamp',
+            fields=[
+                ('stamp_id', models.AutoField(primary_key=True, serialize=False)),
+                ('stamp', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_series_stamp',
+            },
+        ),
+    ]
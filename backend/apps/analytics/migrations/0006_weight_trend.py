@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0005_user_series_stamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeightTrend',
+            fields=[
+                ('trend_id', models.AutoField(primary_key=True, serialize=False)),
+                ('level', models.FloatField()),
+                ('slope', models.FloatField(default=0)),
+                ('last_date_time', models.DateTimeField()),
+                ('weigh_in_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'weight_trend',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('workouts', '0004_workoutlog_attribute_inputs_and_more'),
+        ('analytics', '0006_weight_trend'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MuscleFatigue',
+            fields=[
+                ('fatigue_id', models.AutoField(primary_key=True, serialize=False)),
+                ('fatigue', models.FloatField(default=0)),
+                ('as_of', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('muscle', models.ForeignKey(db_column='muscle_id', on_delete=django.db.models.deletion.CASCADE, to='workouts.muscle')),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'muscle_fatigue',
+                'unique_together': {('user', 'muscle')},
+            },
+        ),
+    ]
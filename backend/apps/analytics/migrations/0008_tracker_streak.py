@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0007_muscle_fatigue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackerStreak',
+            fields=[
+                ('streak_id', models.AutoField(primary_key=True, serialize=False)),
+                ('tracker', models.CharField(max_length=32)),
+                ('run_start', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('current', models.IntegerField(default=0)),
+                ('longest', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'tracker_streak',
+                'unique_together': {('user', 'tracker')},
+            },
+        ),
+    ]
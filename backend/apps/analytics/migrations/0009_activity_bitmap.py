@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0008_tracker_streak'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityBitmap',
+            fields=[
+                ('bitmap_id', models.AutoField(primary_key=True, serialize=False)),
+                ('tracker', models.CharField(max_length=32)),
+                ('year', models.IntegerField()),
+                ('bits', models.BinaryField(max_length=46)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'activity_bitmap',
+                'unique_together': {('user', 'tracker', 'year')},
+            },
+        ),
+    ]
@@ -37,3 +37,174 @@ class ErrorLog(models.Model):
 
     def __str__(self):
         return f"Error Log - {self.error_type} ({self.created_at})"
+
+
+class DailyNutritionRollup(models.Model):
+    """Per-user daily nutrient totals maintained from FoodLog writes (see apps.analytics.rollups)"""
+    rollup_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    date = models.DateField()
+    calories = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    protein = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    fat = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    carbohydrates = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    fiber = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    sodium = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    sugar = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    saturated_fat = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    trans_fat = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    calcium = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    iron = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    magnesium = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    cholesterol = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    vitamin_a = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    vitamin_c = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    vitamin_d = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    caffeine = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    tokens_used = models.IntegerField(default=0)
+    log_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_nutrition_rollup'
+        unique_together = ('user', 'date')
+
+    def __str__(self):
+        return f"{self.user.username} - Nutrition ({self.date})"
+
+
+class WorkoutDayRollup(models.Model):
+    """Per-user, per-day, per-workout set totals maintained from WorkoutLog writes (see apps.analytics.rollups)"""
+    rollup_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    workout = models.ForeignKey('workouts.Workout', on_delete=models.CASCADE, db_column='workout_id')
+    date = models.DateField()
+    set_count = models.IntegerField(default=0)
+    attribute_set_count = models.IntegerField(default=0)  # Sets with at least one attribute
+    total_reps = models.IntegerField(default=0)
+    total_rir = models.IntegerField(default=0)
+    # Sets with a recorded weight; progression charts only consider these
+    weighted_set_count = models.IntegerField(default=0)
+    weighted_reps = models.IntegerField(default=0)
+    weight_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    max_weight = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    avg_rest_time = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # seconds
+    best_e1rm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # Epley
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'workout_day_rollup'
+        unique_together = ('user', 'date', 'workout')
+
+    def __str__(self):
+        return f"{self.user.username} - Workout {self.workout_id} ({self.date})"
+
+
+class HomeDashboardSnapshot(models.Model):
+    """Cached home dashboard sections per user and local calendar day (see apps.analytics.home_snapshots)"""
+    snapshot_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    date = models.DateField()
+    # One JSON column per section; NULL means invalidated and rebuilt on next request
+    goals = models.JSONField(null=True, blank=True)
+    nutrition = models.JSONField(null=True, blank=True)
+    activity = models.JSONField(null=True, blank=True)
+    body = models.JSONField(null=True, blank=True)
+    split = models.JSONField(null=True, blank=True)
+    trackers = models.JSONField(null=True, blank=True)
+    version = models.IntegerField(default=0)  # Bumped by every invalidation
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'home_dashboard_snapshot'
+        unique_together = ('user', 'date')
+
+    def __str__(self):
+        return f"{self.user.username} - Home dashboard ({self.date})"
+
+
+class UserSeriesStamp(models.Model):
+    """Per-user token for the in-process analytics series cache (see apps.analytics.series_cache)"""
+    stamp_id = models.AutoField(primary_key=True)
+    user = models.OneToOneField('users.User', on_delete=models.CASCADE, db_column='user_id')
+    stamp = models.CharField(max_length=32)  # Replaced on every write to a cached source
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_series_stamp'
+
+    def __str__(self):
+        return f"{self.user.username} - Series stamp ({self.stamp})"
+
+
+class WeightTrend(models.Model):
+    """Per-user Holt's trend over weigh-ins, advanced on each new WeightLog (see apps.analytics.weight_trend)"""
+    trend_id = models.AutoField(primary_key=True)
+    user = models.OneToOneField('users.User', on_delete=models.CASCADE, db_column='user_id')
+    level = models.FloatField()  # Smoothed weight in kg as of last_date_time
+    slope = models.FloatField(default=0)  # kg per day
+    last_date_time = models.DateTimeField()  # Newest weigh-in folded into the state
+    weigh_in_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'weight_trend'
+
+    def __str__(self):
+        return f"{self.user.username} - Weight trend ({self.level:.2f} kg)"
+
+
+class MuscleFatigue(models.Model):
+    """Per-user, per-muscle decaying training load maintained from WorkoutLog writes (see apps.analytics.muscle_fatigue)"""
+    fatigue_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    muscle = models.ForeignKey('workouts.Muscle', on_delete=models.CASCADE, db_column='muscle_id')
+    fatigue = models.FloatField(default=0)  # Full-activation sets, decayed to as_of
+    as_of = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'muscle_fatigue'
+        unique_together = ('user', 'muscle')
+
+    def __str__(self):
+        return f"{self.user.username} - Muscle {self.muscle_id} fatigue ({self.fatigue:.2f})"
+
+
+class TrackerStreak(models.Model):
+    """Per-user, per-tracker logging streak counters maintained from log writes (see apps.analytics.streaks)"""
+    streak_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    tracker = models.CharField(max_length=32)  # Key of apps.analytics.streaks.TRACKER_MODELS
+    # Latest run of consecutive logged days: run_start..last_date, `current` days long
+    run_start = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    current = models.IntegerField(default=0)
+    longest = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tracker_streak'
+        unique_together = ('user', 'tracker')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.tracker} streak ({self.current})"
+
+
+class ActivityBitmap(models.Model):
+    """Per-user, per-tracker days logged in one calendar year, one bit per day (see apps.analytics.activity_bitmaps)"""
+    bitmap_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    tracker = models.CharField(max_length=32)  # Key of apps.analytics.activity_bitmaps.ACTIVITY_MODELS
+    year = models.IntegerField()
+    # Bit n (byte n // 8, bit n % 8) is set when the user logged on day n + 1 of the year
+    bits = models.BinaryField(max_length=46)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'activity_bitmap'
+        unique_together = ('user', 'tracker', 'year')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.tracker} {self.year}"
@@ -0,0 +1,128 @@
+"""
+Muscle fatigue - per-user, per-muscle training load that decays exponentially over time.
+
+Every logged set adds activation_rating / 100 to each muscle its workout rates (one set at
+full activation adds 1.0), and load halves every HALF_LIFE_HOURS. MuscleFatigue stores one
+row per (user, muscle): the load decayed to its as_of timestamp. Reading current fatigue is
+that row times the decay since as_of, so the recovery map never replays workout history.
+
+Because decay is linear in the load, any set can be added or removed exactly in O(1), not
+only the newest: a set at time t contributes weight * decay(as_of - t) to a row stated at
+as_of. apps.analytics.signals applies each WorkoutLog insert, edit and delete that way. A
+change to a workout's activation ratings alters the weight of every past set, so it rebuilds
+the affected users from their recent sets instead (rebuild_muscle_fatigue).
+"""
+
+import math
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.workouts.models import WorkoutLog, WorkoutMuscle
+from .models import MuscleFatigue
+
+HALF_LIFE_HOURS = 48.0
+# Load (full-activation sets) at which a muscle reads 0% ready
+FATIGUED_SETS = 10.0
+# Sets older than this contribute under 0.1% of their load and are left out of rebuilds
+_REBUILD_DAYS = math.ceil(10 * HALF_LIFE_HOURS / 24)
+_DECAY_PER_HOUR = math.log(2) / HALF_LIFE_HOURS
+
+
+def decay(elapsed):
+    """Fraction of load left after a timedelta."""
+    return math.exp(-_DECAY_PER_HOUR * elapsed.total_seconds() / 3600)
+
+
+def fatigue_at(row, at):
+    """A MuscleFatigue row's load at timestamp at (not before as_of)."""
+    return row.fatigue * decay(at - row.as_of) if at > row.as_of else row.fatigue
+
+
+def readiness(fatigue):
+    """Percent recovered for a load: 100 when fresh, 0 at FATIGUED_SETS or more."""
+    return round(100 * max(0.0, 1 - fatigue / FATIGUED_SETS), 1)
+
+
+def _aware(at):
+    return timezone.make_aware(at) if timezone.is_naive(at) else at
+
+
+def _fold(row, load, at):
+    """Add load at timestamp at to row in place (negative load removes a set)."""
+    if at >= row.as_of:
+        row.fatigue = row.fatigue * decay(at - row.as_of) + load
+        row.as_of = at
+    else:
+        row.fatigue += load * decay(row.as_of - at)
+    # Removing a set can leave rounding noise below zero
+    row.fatigue = max(row.fatigue, 0.0)
+
+
+def apply_set(user_id, workout_id, at, sign=1):
+    """Add (sign=1) or remove (sign=-1) one set of workout_id logged at `at` for user_id."""
+    loads = dict(WorkoutMuscle.objects.filter(
+        workout_id=workout_id
+    ).values_list('muscle_id', 'activation_rating'))
+    if not loads:
+        return
+    at = _aware(at)
+    with transaction.atomic():
+        rows = {
+            row.muscle_id: row
+            for row in MuscleFatigue.objects.select_for_update().filter(user_id=user_id, muscle_id__in=loads)
+        }
+        created = []
+        for muscle_id, rating in loads.items():
+            row = rows.get(muscle_id)
+            if row is None:
+                if sign < 0:
+                    continue
+                row = MuscleFatigue(user_id=user_id, muscle_id=muscle_id, fatigue=0.0, as_of=at)
+                created.append(row)
+            _fold(row, sign * rating / 100, at)
+        if rows:
+            # bulk_update skips auto_now
+            for row in rows.values():
+                row.updated_at = timezone.now()
+            MuscleFatigue.objects.bulk_update(list(rows.values()), ['fatigue', 'as_of', 'updated_at'])
+        if created:
+            MuscleFatigue.objects.bulk_create(created)
+
+
+def rebuild_muscle_fatigue(user_ids=None):
+    """
+    Rebuild MuscleFatigue from sets logged in the last _REBUILD_DAYS, with one query joining
+    WorkoutLog to the current activation ratings.
+
+    user_ids: optional iterable restricting the rebuild to those users.
+    Returns the number of rows written.
+    """
+    now = timezone.now()
+    rows = MuscleFatigue.objects.all()
+    sets = WorkoutLog.objects.filter(date_time__gte=now - timedelta(days=_REBUILD_DAYS))
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        rows = rows.filter(user_id__in=user_ids)
+        sets = sets.filter(user_id__in=user_ids)
+    sets = sets.values_list(
+        'user_id', 'workout__workoutmuscle__muscle_id', 'workout__workoutmuscle__activation_rating', 'date_time'
+    )
+
+    built = {}
+    for user_id, muscle_id, rating, at in sets.iterator():
+        if muscle_id is None:
+            # Workout without activation ratings
+            continue
+        row = built.get((user_id, muscle_id))
+        if row is None:
+            row = built[(user_id, muscle_id)] = MuscleFatigue(
+                user_id=user_id, muscle_id=muscle_id, fatigue=0.0, as_of=now
+            )
+        _fold(row, rating / 100, at)
+
+    with transaction.atomic():
+        rows.delete()
+        MuscleFatigue.objects.bulk_create(built.values())
+    return len(built)
@@ -0,0 +1,68 @@
+"""
+Rolling statistics - moving sums and averages over daily series, built on cumulative sums.
+
+The sum of a trailing w-day window ending on day t is cumsum[t] - cumsum[t - w], so every
+window size costs one vectorised pass over the series instead of re-summing w days per point.
+Days without data are handled by a gap policy applied before the sums:
+- skip: left out; a window's average is over the days it has data for
+- zero: counted as 0 (no steps logged means no steps)
+- carry: the last logged value carries forward (body weight between weigh-ins)
+"""
+
+import numpy as np
+
+GAP_POLICIES = ('skip', 'zero', 'carry')
+DEFAULT_WINDOWS = (7, 14, 30)
+MAX_WINDOW_DAYS = 90
+# Week-over-week deltas compare the 7-day average with the one a week earlier
+WEEK_DAYS = 7
+
+
+def fill_gaps(values, policy):
+    """values (NaN on days without data) with the gap policy applied."""
+    if policy == 'zero':
+        return np.nan_to_num(values, nan=0.0)
+    if policy == 'carry':
+        # Index of the latest logged day at or before each day; leading gaps stay NaN
+        latest = np.where(~np.isnan(values), np.arange(len(values)), 0)
+        np.maximum.accumulate(latest, out=latest)
+        return values[latest]
+    return values
+
+
+def trailing_sums(values, window):
+    """
+    (sums, counts) of the trailing window ending on each day, NaN days left out.
+
+    Entry t covers values[t - window + 1 .. t], truncated at the start of the series.
+    """
+    present = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return sums[end] - sums[start], counts[end] - counts[start]
+
+
+def rolling_stats(values, windows=DEFAULT_WINDOWS, policy='skip'):
+    """
+    Per-day rolling statistics for a daily series: {name: array}, each len(values) long.
+
+    Names are 'value' (after the gap policy), 'sum_<w>' and 'avg_<w>' for each window w, and
+    'week_over_week' (7-day average minus the 7-day average a week earlier). Windows with no
+    data are NaN.
+    """
+    values = fill_gaps(np.asarray(values, dtype=np.float64), policy)
+    stats = {'value': values}
+    for window in sorted(set(windows) | {WEEK_DAYS}):
+        sums, counts = trailing_sums(values, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averages = sums / counts
+        if window in windows:
+            stats[f'sum_{window}'] = np.where(counts > 0, sums, np.nan)
+            stats[f'avg_{window}'] = averages
+        if window == WEEK_DAYS:
+            week_over_week = np.full(len(values), np.nan)
+            week_over_week[WEEK_DAYS:] = averages[WEEK_DAYS:] - averages[:-WEEK_DAYS]
+            stats['week_over_week'] = week_over_week
+    return stats
@@ -0,0 +1,418 @@
+"""
+Analytics rollups - per-user daily aggregates maintained on write.
+
+DailyNutritionRollup stores one row per (user, day) with every Food nutrient summed over
+that day's FoodLog entries (food value * servings), plus cost and tokens. WorkoutDayRollup
+stores one row per (user, day, workout) with that day's set, rep, weight and rest totals.
+Days are the user's local calendar days (User.timezone, see apps.users.timezones).
+The handlers in apps.analytics.signals call the refresh helpers below on every FoodLog,
+Food and WorkoutLog write, so chart endpoints read a few rollup rows instead of scanning
+the raw log tables per request.
+
+Refreshes recompute the whole day from FoodLog rather than applying deltas, which keeps
+them idempotent: calling one twice, or after a missed write, always converges.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek, TruncYear
+
+from apps.logging.models import FoodLog
+from apps.users.timezones import (
+    LocalDate, day_range, group_by_timezone, local_date, user_timezone, user_timezones, zone_named,
+)
+from apps.workouts.models import WorkoutLog
+from .models import DailyNutritionRollup, WorkoutDayRollup
+
+
+# Food nutrient columns summed into DailyNutritionRollup (same names on both models).
+NUTRIENT_FIELDS = (
+    'calories', 'protein', 'fat', 'carbohydrates', 'fiber', 'sodium',
+    'sugar', 'saturated_fat', 'trans_fat', 'calcium', 'iron', 'magnesium',
+    'cholesterol', 'vitamin_a', 'vitamin_c', 'vitamin_d', 'caffeine',
+)
+
+# Order of nutrient vectors: every Food nutrient, then cost and tokens
+NUTRIENT_VECTOR_FIELDS = NUTRIENT_FIELDS + ('cost', 'tokens_used')
+NUTRIENT_VECTOR_INDEX = {field: index for index, field in enumerate(NUTRIENT_VECTOR_FIELDS)}
+
+_ROLLUP_DECIMAL = DecimalField(max_digits=14, decimal_places=4)
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def _nutrition_aggregates():
+    """Aggregate expressions over FoodLog producing every rollup column."""
+    aggregates = {
+        field: Coalesce(
+            Sum(F(f'food__{field}') * F('servings'), output_field=_ROLLUP_DECIMAL),
+            Value(Decimal('0')),
+            output_field=_ROLLUP_DECIMAL,
+        )
+        for field in NUTRIENT_FIELDS
+    }
+    aggregates['cost'] = Coalesce(
+        Sum(F('servings') * Coalesce(F('food__cost'), Value(Decimal('0'))), output_field=_ROLLUP_DECIMAL),
+        Value(Decimal('0')),
+        output_field=_ROLLUP_DECIMAL,
+    )
+    aggregates['tokens_used'] = Coalesce(Sum('tokens_used'), Value(0))
+    aggregates['log_count'] = Count('macro_log_id')
+    return aggregates
+
+
+def _vector(totals):
+    return np.array([float(totals[field] or 0) for field in NUTRIENT_VECTOR_FIELDS], dtype=np.float64)
+
+
+def food_log_nutrient_vector(queryset):
+    """
+    Totals over a FoodLog queryset as a float64 array in NUTRIENT_VECTOR_FIELDS order.
+
+    One aggregate query; for windows that do not line up with rollup days.
+    """
+    aggregates = _nutrition_aggregates()
+    del aggregates['log_count']
+    return _vector(queryset.aggregate(**aggregates))
+
+
+def rollup_nutrient_vector(user_id, date_from, date_to):
+    """
+    A user's totals for the days date_from..date_to (inclusive) as a float64 array in
+    NUTRIENT_VECTOR_FIELDS order, summed over DailyNutritionRollup in one aggregate query.
+    """
+    return _vector(DailyNutritionRollup.objects.filter(
+        user_id=user_id, date__gte=date_from, date__lte=date_to
+    ).aggregate(**{field: Sum(field) for field in NUTRIENT_VECTOR_FIELDS}))
+
+
+# Calendar buckets for rollup ranges; weeks are ISO weeks (Monday to Sunday)
+CALENDAR_PERIODS = ('day', 'week', 'month', 'year')
+_PERIOD_TRUNCATIONS = {'week': TruncWeek, 'month': TruncMonth, 'year': TruncYear}
+
+
+def period_start(day, period):
+    """First day of the calendar period containing day."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    if period == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def _next_period_start(start, period):
+    if period == 'week':
+        return start + timedelta(days=7)
+    if period == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    if period == 'year':
+        return date(start.year + 1, 1, 1)
+    return start + timedelta(days=1)
+
+
+def calendar_buckets(date_from, date_to, period):
+    """
+    [(start, end), ...] for every calendar period overlapping date_from..date_to, clipped
+    to the range (the first and last bucket may be partial).
+    """
+    buckets = []
+    start = period_start(date_from, period)
+    while start <= date_to:
+        following = _next_period_start(start, period)
+        buckets.append((max(start, date_from), min(following - timedelta(days=1), date_to)))
+        start = following
+    return buckets
+
+
+def rollup_calendar_totals(user_id, fields, date_from, date_to, period):
+    """
+    DailyNutritionRollup totals per calendar period in date_from..date_to, grouped in SQL.
+
+    fields: rollup columns to sum (nutrients, cost, tokens_used).
+    Returns {period start: {field: float total, 'days': days with food logs}}, periods
+    without logs left out; keys match period_start() / calendar_buckets() starts.
+    """
+    truncate = _PERIOD_TRUNCATIONS.get(period)
+    rows = DailyNutritionRollup.objects.filter(
+        user_id=user_id, date__gte=date_from, date__lte=date_to
+    ).annotate(
+        bucket=truncate('date') if truncate else F('date')
+    ).values('bucket').annotate(
+        days=Count('rollup_id'), **{field: Sum(field) for field in fields}
+    ).order_by()
+
+    totals = {}
+    for row in rows:
+        bucket = row.pop('bucket')
+        # Some backends return the truncation as a datetime
+        bucket = bucket.date() if hasattr(bucket, 'date') else bucket
+        totals[bucket] = {key: float(value or 0) if key != 'days' else value for key, value in row.items()}
+    return totals
+
+
+def rollup_day(dt, zone):
+    """Calendar day a log timestamp is bucketed under: its local day in the owner's zone."""
+    return local_date(dt, zone)
+
+
+def rollup_user_days(user_times):
+    """(user_id, local day) pairs for (user_id, timestamp) pairs, with one timezone lookup."""
+    user_times = set(user_times)
+    zones = user_timezones({user_id for user_id, _ in user_times})
+    return {
+        (user_id, rollup_day(dt, zones.get(user_id, zone_named(None))))
+        for user_id, dt in user_times
+    }
+
+
+def refresh_daily_nutrition(user_id, day, zone=None):
+    """
+    Recompute the rollup row for one user and day from FoodLog.
+
+    zone: the user's timezone when the caller already has it (looked up otherwise).
+    Deletes the row when no logs remain for that day.
+    """
+    zone = zone or user_timezone(user_id)
+    totals = FoodLog.objects.filter(
+        user_id=user_id, **day_range('date_time', zone, day, day)
+    ).aggregate(**_nutrition_aggregates())
+
+    if not totals['log_count']:
+        DailyNutritionRollup.objects.filter(user_id=user_id, date=day).delete()
+        return None
+
+    rollup, _ = DailyNutritionRollup.objects.update_or_create(
+        user_id=user_id, date=day, defaults=totals
+    )
+    return rollup
+
+
+def refresh_daily_nutrition_days(user_days):
+    """Recompute every distinct (user_id, day) pair in user_days."""
+    user_days = set(user_days)
+    zones = user_timezones({user_id for user_id, _ in user_days})
+    for user_id, day in user_days:
+        if user_id in zones:
+            refresh_daily_nutrition(user_id, day, zones[user_id])
+
+
+def refresh_daily_nutrition_for_log(log, previous_date_time=None):
+    """
+    Refresh the day a FoodLog belongs to after create/update/delete.
+
+    previous_date_time: the log's timestamp before an update, so a log moved to
+    another day is removed from its old day's totals too.
+    """
+    zone = user_timezone(log.user_id)
+    days = {rollup_day(log.date_time, zone)}
+    if previous_date_time is not None:
+        days.add(rollup_day(previous_date_time, zone))
+    for day in days:
+        refresh_daily_nutrition(log.user_id, day, zone)
+
+
+def food_log_user_days(queryset):
+    """Distinct (user_id, local day) pairs covered by a FoodLog queryset, grouped in SQL per zone."""
+    user_ids = set(queryset.values_list('user_id', flat=True).distinct())
+    user_days = set()
+    for zone, zone_user_ids in group_by_timezone(user_timezones(user_ids)).items():
+        user_days.update(
+            queryset.filter(user_id__in=zone_user_ids)
+            .annotate(day=LocalDate('date_time', zone))
+            .values_list('user_id', 'day')
+            .distinct()
+        )
+    return user_days
+
+
+def refresh_daily_nutrition_for_food(food_id):
+    """Recompute every (user, day) that logged a food, e.g. after its nutrients change."""
+    refresh_daily_nutrition_days(food_log_user_days(FoodLog.objects.filter(food_id=food_id)))
+
+
+def backfill_daily_nutrition(user_ids=None):
+    """
+    Rebuild DailyNutritionRollup from scratch with one grouped query over FoodLog per
+    distinct user timezone.
+
+    user_ids: optional iterable restricting the rebuild to those users.
+    Returns the number of rollup rows written.
+    """
+    rollups = DailyNutritionRollup.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for zone, zone_user_ids in group_by_timezone(user_timezones(user_ids)).items():
+            grouped = FoodLog.objects.filter(user_id__in=zone_user_ids).annotate(
+                day=LocalDate('date_time', zone)
+            ).values('user_id', 'day').annotate(
+                **_nutrition_aggregates()
+            ).order_by('user_id', 'day')
+            for row in grouped.iterator():
+                user_id = row.pop('user_id')
+                day = row.pop('day')
+                batch.append(DailyNutritionRollup(user_id=user_id, date=day, **row))
+                if len(batch) >= _BACKFILL_BATCH_SIZE:
+                    DailyNutritionRollup.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+        if batch:
+            DailyNutritionRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
+
+
+# ========== WORKOUT ROLLUPS ==========
+
+_WORKOUT_LOG_ROLLUP_FIELDS = ('weight', 'reps', 'rir', 'rest_time', 'attributes')
+_TWO_PLACES = Decimal('0.01')
+
+
+def epley_e1rm(weight, reps):
+    """Estimated one-rep max (Epley): weight * (1 + reps / 30)."""
+    return Decimal(weight) * (1 + Decimal(reps) / 30)
+
+
+def _workout_set_totals(sets):
+    """
+    Fold WorkoutLog value dicts (see _WORKOUT_LOG_ROLLUP_FIELDS) into WorkoutDayRollup columns.
+
+    Done in Python rather than SQL because "has attributes" is a JSON-length test that
+    differs between MySQL and SQLite; a (user, day, workout) bucket is only a handful of sets.
+    """
+    totals = {
+        'set_count': 0,
+        'attribute_set_count': 0,
+        'total_reps': 0,
+        'total_rir': 0,
+        'weighted_set_count': 0,
+        'weighted_reps': 0,
+        'weight_sum': Decimal('0'),
+        'max_weight': None,
+        'avg_rest_time': None,
+        'best_e1rm': None,
+    }
+    rest_times = []
+    for s in sets:
+        totals['set_count'] += 1
+        if s['attributes']:
+            totals['attribute_set_count'] += 1
+        totals['total_reps'] += s['reps'] or 0
+        totals['total_rir'] += s['rir'] or 0
+        if s['rest_time'] is not None:
+            rest_times.append(s['rest_time'])
+
+        weight = s['weight']
+        if weight is None:
+            continue
+        totals['weighted_set_count'] += 1
+        totals['weighted_reps'] += s['reps'] or 0
+        totals['weight_sum'] += weight
+        if totals['max_weight'] is None or weight > totals['max_weight']:
+            totals['max_weight'] = weight
+        if s['reps'] is not None:
+            e1rm = epley_e1rm(weight, s['reps']).quantize(_TWO_PLACES)
+            if totals['best_e1rm'] is None or e1rm > totals['best_e1rm']:
+                totals['best_e1rm'] = e1rm
+
+    if rest_times:
+        totals['avg_rest_time'] = (Decimal(sum(rest_times)) / len(rest_times)).quantize(_TWO_PLACES)
+    return totals
+
+
+def refresh_workout_day(user_id, day, workout_id, zone=None):
+    """
+    Recompute the rollup row for one user, day and workout from WorkoutLog.
+
+    zone: the user's timezone when the caller already has it (looked up otherwise).
+    Deletes the row when no sets remain.
+    """
+    zone = zone or user_timezone(user_id)
+    sets = WorkoutLog.objects.filter(
+        user_id=user_id, workout_id=workout_id, **day_range('date_time', zone, day, day)
+    ).values(*_WORKOUT_LOG_ROLLUP_FIELDS)
+    totals = _workout_set_totals(sets)
+
+    if not totals['set_count']:
+        WorkoutDayRollup.objects.filter(user_id=user_id, date=day, workout_id=workout_id).delete()
+        return None
+
+    rollup, _ = WorkoutDayRollup.objects.update_or_create(
+        user_id=user_id, date=day, workout_id=workout_id, defaults=totals
+    )
+    return rollup
+
+
+def refresh_workout_days(user_day_workouts):
+    """Recompute every distinct (user_id, day, workout_id) triple."""
+    user_day_workouts = set(user_day_workouts)
+    zones = user_timezones({user_id for user_id, _, _ in user_day_workouts})
+    for user_id, day, workout_id in user_day_workouts:
+        if user_id in zones:
+            refresh_workout_day(user_id, day, workout_id, zones[user_id])
+
+
+def refresh_workout_day_for_log(log, previous=None):
+    """
+    Refresh the bucket a WorkoutLog belongs to after create/update/delete.
+
+    previous: (date_time, workout_id) stored before an update, so a set moved to another
+    day or workout is removed from its old bucket too.
+    """
+    zone = user_timezone(log.user_id)
+    buckets = {(rollup_day(log.date_time, zone), log.workout_id)}
+    if previous is not None:
+        previous_date_time, previous_workout_id = previous
+        buckets.add((rollup_day(previous_date_time, zone), previous_workout_id))
+    for day, workout_id in buckets:
+        refresh_workout_day(log.user_id, day, workout_id, zone)
+
+
+def backfill_workout_days(user_ids=None):
+    """
+    Rebuild WorkoutDayRollup from scratch with one ordered pass over WorkoutLog per distinct
+    user timezone.
+
+    user_ids: optional iterable restricting the rebuild to those users.
+    Returns the number of rollup rows written.
+    """
+    rollups = WorkoutDayRollup.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for zone, zone_user_ids in group_by_timezone(user_timezones(user_ids)).items():
+            rows = WorkoutLog.objects.filter(user_id__in=zone_user_ids).annotate(
+                day=LocalDate('date_time', zone)
+            ).values(
+                'user_id', 'day', 'workout_id', *_WORKOUT_LOG_ROLLUP_FIELDS
+            ).order_by('user_id', 'day', 'workout_id')
+            buckets = groupby(rows.iterator(), key=itemgetter('user_id', 'day', 'workout_id'))
+            for (user_id, day, workout_id), sets in buckets:
+                batch.append(WorkoutDayRollup(
+                    user_id=user_id, date=day, workout_id=workout_id, **_workout_set_totals(sets)
+                ))
+                if len(batch) >= _BACKFILL_BATCH_SIZE:
+                    WorkoutDayRollup.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+        if batch:
+            WorkoutDayRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
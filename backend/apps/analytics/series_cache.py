@@ -0,0 +1,202 @@
+"""
+Analytics series cache - a user's daily metrics as NumPy columns, kept in process memory.
+
+Chart endpoints used to re-read raw rows on every request and convert each Decimal to a
+float one field at a time. UserSeries loads a user's whole history once: a dense daily index
+from their first to last logged day plus one float64 column per metric, NaN on days without
+data. Columns are registry metrics (apps.analytics.metrics), loaded with one query per
+source table. Endpoints slice a date window out of the columns and reduce it with NumPy.
+
+Series live in an LRU (SeriesCache) capped at settings.ANALYTICS_SERIES_CACHE_MAX_BYTES.
+Each process has its own cache, so freshness is checked against UserSeriesStamp: every write
+to a source table replaces the user's stamp (apps.analytics.signals), and a cached series is
+only served while its stamp still matches, at the cost of one indexed lookup per request.
+"""
+
+import threading
+from collections import OrderedDict
+from uuid import uuid4
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from apps.users.timezones import user_timezone
+from .metrics import load_metric_days
+from .models import UserSeriesStamp
+from .rollups import NUTRIENT_FIELDS
+
+# HealthMetricsLog columns cached under the same names
+HEALTH_FIELDS = (
+    'resting_heart_rate', 'blood_pressure_systolic', 'blood_pressure_diastolic',
+    'morning_energy', 'stress_level', 'mood', 'soreness', 'illness_level',
+)
+
+# Series column -> registry metric it is loaded from (apps.analytics.metrics)
+SERIES_METRICS = {
+    **{field: f'food__total_{field}' for field in NUTRIENT_FIELDS},
+    'cost': 'food__total_cost',
+    'weight': 'weight__weight',
+    'steps': 'steps__total_steps',
+    'water': 'water__total_water',
+    'cardio_calories': 'cardio__calories_burned',
+    'cardio_duration': 'cardio__duration',
+    'cardio_distance': 'cardio__distance',
+    'sleep_minutes': 'sleep__total_sleep_time',
+    **{field: f'health__{field}' for field in HEALTH_FIELDS},
+    'workout_sets': 'workout_log__total_sets',
+    'workout_reps': 'workout_log__total_reps',
+    'workout_volume': 'workout_log__total_volume',
+}
+
+# Every column a UserSeries carries
+SERIES_COLUMNS = tuple(SERIES_METRICS)
+
+
+def _load_source_values(user_id, zone=None):
+    """{column: {date: value}} for every cached column over the user's whole history."""
+    loaded = load_metric_days(user_id, SERIES_METRICS.values(), zone=zone)
+    return {column: loaded[key] for column, key in SERIES_METRICS.items()}
+
+
+class UserSeries:
+    """One user's daily metrics: column[i] is the value on start + i days, NaN when not logged."""
+
+    def __init__(self, start, columns, stamp=None):
+        self.start = start
+        self.columns = columns
+        self.stamp = stamp
+        self.length = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def load(cls, user_id, stamp=None, zone=None):
+        """Build the series from the rollup and log tables, by the user's local days."""
+        values = _load_source_values(user_id, zone)
+        days = {day for by_day in values.values() for day in by_day}
+        if not days:
+            return cls(None, {column: np.empty(0) for column in SERIES_COLUMNS}, stamp)
+
+        start = min(days)
+        length = (max(days) - start).days + 1
+        columns = {}
+        for column, by_day in values.items():
+            array = np.full(length, np.nan)
+            if by_day:
+                index = np.fromiter(((day - start).days for day in by_day), dtype=np.int64, count=len(by_day))
+                array[index] = np.array(
+                    [np.nan if value is None else float(value) for value in by_day.values()], dtype=np.float64
+                )
+            columns[column] = array
+        return cls(start, columns, stamp)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.columns.values())
+
+    def window(self, column, date_from, date_to):
+        """
+        Values of column for every day in date_from..date_to (inclusive).
+
+        Always date_to - date_from + 1 long; days outside the loaded history are NaN.
+        """
+        length = (date_to - date_from).days + 1
+        out = np.full(max(length, 0), np.nan)
+        if self.start is None or length <= 0:
+            return out
+        first = (date_from - self.start).days
+        lo, hi = max(first, 0), min(first + length, self.length)
+        if lo < hi:
+            out[lo - first:hi - first] = self.columns[column][lo:hi]
+        return out
+
+
+class SeriesCache:
+    """Process-local LRU of UserSeries by user_id, bounded by total array bytes."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, user):
+        """The user's series, reloaded when their stamp has changed since it was cached."""
+        stamp = _current_stamp(user.pk)
+        with self._lock:
+            series = self._entries.get(user.pk)
+            if series is not None and series.stamp == stamp:
+                self._entries.move_to_end(user.pk)
+                return series
+
+        series = UserSeries.load(user.pk, stamp, user_timezone(user))
+        self._store(user.pk, series)
+        return series
+
+    def _store(self, user_id, series):
+        max_bytes = settings.ANALYTICS_SERIES_CACHE_MAX_BYTES
+        with self._lock:
+            self._drop(user_id)
+            if series.nbytes > max_bytes:
+                return
+            self._entries[user_id] = series
+            self._bytes += series.nbytes
+            while self._bytes > max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, user_id):
+        series = self._entries.pop(user_id, None)
+        if series is not None:
+            self._bytes -= series.nbytes
+
+    def discard(self, user_id):
+        """Forget this process's copy of a user's series."""
+        with self._lock:
+            self._drop(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, user_id):
+        return user_id in self._entries
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+series_cache = SeriesCache()
+
+
+def _current_stamp(user_id):
+    """The user's stamp, created on first use so every cached series has one to match."""
+    stamp = UserSeriesStamp.objects.filter(user_id=user_id).values_list('stamp', flat=True).first()
+    if stamp is None:
+        stamp = UserSeriesStamp.objects.get_or_create(
+            user_id=user_id, defaults={'stamp': uuid4().hex}
+        )[0].stamp
+    return stamp
+
+
+def user_series(user):
+    """Cached UserSeries for a user."""
+    return series_cache.get(user)
+
+
+def invalidate_user_series(user_ids=None):
+    """
+    Mark cached series stale in every process after their source rows changed.
+
+    user_ids: a user_id, an iterable of them, or None for every user.
+    """
+    stamps = UserSeriesStamp.objects.all()
+    if user_ids is None:
+        series_cache.clear()
+    else:
+        if isinstance(user_ids, int):
+            user_ids = [user_ids]
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            series_cache.discard(user_id)
+        stamps = stamps.filter(user_id__in=user_ids)
+    stamps.update(stamp=uuid4().hex, updated_at=timezone.now())
@@ -0,0 +1,455 @@
+"""
+Signal handlers keeping analytics rollups, weight trends, muscle fatigue, streaks, activity
+bitmaps, home dashboard snapshots and cached series in sync with the raw log tables.
+
+Connected in AnalyticsConfig.ready(). Handlers fire for every ORM write path (API views,
+FoodParserService, MealCreateSerializer, admin, setup scripts), so rollups never depend on
+a caller remembering to refresh them.
+"""
+
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.foods.models import Food, Meal
+from apps.health.models import HealthMetricsLog, SleepLog
+from apps.logging.models import (
+    BodyMeasurementLog, CardioLog, FoodLog, StepsLog, WaterLog, WeightLog
+)
+from apps.users.models import User, UserGoal
+from apps.workouts.models import (
+    Split, SplitDay, SplitDayTarget, Workout, WorkoutLog, WorkoutMuscle
+)
+from apps.users.timezones import local_date, user_timezone
+from .activity_bitmaps import mark_day, mark_days, rebuild_activity_bitmaps, unmark_day, unmark_day_if_empty
+from .home_snapshots import SECTION_BUILDERS, invalidate_home_sections
+from .rollups import (
+    NUTRIENT_FIELDS,
+    backfill_daily_nutrition,
+    backfill_workout_days,
+    refresh_daily_nutrition_days,
+    refresh_daily_nutrition_for_food,
+    refresh_daily_nutrition_for_log,
+    refresh_workout_day_for_log,
+    rollup_user_days,
+)
+from .muscle_fatigue import apply_set, rebuild_muscle_fatigue
+from .series_cache import invalidate_user_series
+from .streaks import (
+    TRACKER_BY_MODEL, backfill_streaks, log_day, record_log_day, record_log_days, remove_log_day,
+)
+from .weight_trend import rebuild_weight_trend, record_weigh_in, record_weigh_ins
+
+# Food columns that feed DailyNutritionRollup; edits to anything else skip the recompute.
+_FOOD_ROLLUP_FIELDS = NUTRIENT_FIELDS + ('cost',)
+
+
+@receiver(pre_save, sender=FoodLog)
+def remember_food_log_date_time(sender, instance, raw=False, **kwargs):
+    """Stash the stored timestamp so an update that changes the day refreshes both days."""
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous_date_time = FoodLog.objects.filter(
+        pk=instance.pk
+    ).values_list('date_time', flat=True).first()
+
+
+@receiver(post_save, sender=FoodLog)
+def food_log_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_daily_nutrition_for_log(
+        instance,
+        previous_date_time=getattr(instance, '_rollup_previous_date_time', None),
+    )
+
+
+@receiver(post_delete, sender=FoodLog)
+def food_log_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Refresh the log's day. Deletes cascading from a Food or Meal collect their days on the
+    origin and refresh once in food_or_meal_deleted; user deletes cascade the rollup too.
+    """
+    if isinstance(origin, User):
+        return
+    if isinstance(origin, (Food, Meal)):
+        pending = origin.__dict__.setdefault('_rollup_user_times', set())
+        pending.add((instance.user_id, instance.date_time))
+        return
+    refresh_daily_nutrition_for_log(instance)
+
+
+@receiver(post_delete, sender=Food)
+@receiver(post_delete, sender=Meal)
+def food_or_meal_deleted(sender, instance, origin=None, **kwargs):
+    user_days = rollup_user_days(getattr(origin, '_rollup_user_times', ()))
+    refresh_daily_nutrition_days(user_days)
+    user_ids = {user_id for user_id, _ in user_days}
+    for user_id in user_ids:
+        invalidate_home_sections(user_id, ('nutrition',))
+    if user_ids:
+        invalidate_user_series(user_ids)
+
+
+@receiver(pre_save, sender=Food)
+def remember_food_nutrients(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous_values = Food.objects.filter(
+        pk=instance.pk
+    ).values(*_FOOD_ROLLUP_FIELDS).first()
+
+
+@receiver(post_save, sender=Food)
+def food_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Nutrient or cost edits change the totals of every day the food was logged."""
+    if raw or created:
+        return
+    previous = getattr(instance, '_rollup_previous_values', None)
+    if previous is not None and all(
+        previous[field] == getattr(instance, field) for field in _FOOD_ROLLUP_FIELDS
+    ):
+        return
+    refresh_daily_nutrition_for_food(instance.food_id)
+    user_ids = set(FoodLog.objects.filter(food_id=instance.food_id).values_list('user_id', flat=True).distinct())
+    for user_id in user_ids:
+        invalidate_home_sections(user_id, ('nutrition',))
+    if user_ids:
+        invalidate_user_series(user_ids)
+
+
+@receiver(pre_save, sender=WorkoutLog)
+def remember_workout_log_bucket(sender, instance, raw=False, **kwargs):
+    """Stash the stored day and workout so an update that moves the set refreshes both buckets."""
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous_bucket = WorkoutLog.objects.filter(
+        pk=instance.pk
+    ).values_list('date_time', 'workout_id').first()
+
+
+@receiver(post_save, sender=WorkoutLog)
+def workout_log_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous_bucket', None)
+    refresh_workout_day_for_log(instance, previous=previous)
+    # Muscle fatigue: add the set, or move it when its time or workout changed
+    if created or previous is None:
+        apply_set(instance.user_id, instance.workout_id, instance.date_time)
+    elif previous != (instance.date_time, instance.workout_id):
+        apply_set(instance.user_id, previous[1], previous[0], sign=-1)
+        apply_set(instance.user_id, instance.workout_id, instance.date_time)
+    # Activity bitmap: mark the set's day, and unmark a day the set left empty
+    zone = user_timezone(instance.user)
+    day = local_date(instance.date_time, zone)
+    if not created and previous is not None:
+        previous_day = local_date(previous[0], zone)
+        if previous_day == day:
+            return
+        unmark_day_if_empty(instance.user_id, 'workout', previous_day, zone)
+    mark_day(instance.user_id, 'workout', day)
+
+
+@receiver(post_delete, sender=WorkoutLog)
+def workout_log_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Refresh the set's bucket, remove it from muscle fatigue and unmark its day if emptied.
+    User deletes cascade to the rollup, fatigue and bitmap rows; Workout deletes to the
+    rollup rows, and workout_deleted rebuilds fatigue and bitmaps.
+    """
+    if isinstance(origin, (User, Workout)):
+        return
+    refresh_workout_day_for_log(instance)
+    apply_set(instance.user_id, instance.workout_id, instance.date_time, sign=-1)
+    zone = user_timezone(instance.user)
+    unmark_day_if_empty(instance.user_id, 'workout', local_date(instance.date_time, zone), zone)
+
+
+# ========== WEIGHT TREND ==========
+
+_WEIGHT_TREND_FIELDS = ('weight', 'weight_unit', 'date_time')
+
+
+@receiver(pre_save, sender=WeightLog)
+def remember_weigh_in(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._trend_previous_values = WeightLog.objects.filter(
+        pk=instance.pk
+    ).values_list(*_WEIGHT_TREND_FIELDS).first()
+
+
+@receiver(post_save, sender=WeightLog)
+def weight_log_saved(sender, instance, created=False, raw=False, **kwargs):
+    """New weigh-ins advance the trend; edits that change the weigh-in rebuild it."""
+    if raw:
+        return
+    if created:
+        record_weigh_in(instance)
+        return
+    previous = getattr(instance, '_trend_previous_values', None)
+    if previous == tuple(getattr(instance, field) for field in _WEIGHT_TREND_FIELDS):
+        return
+    rebuild_weight_trend(instance.user_id)
+
+
+@receiver(post_delete, sender=WeightLog)
+def weight_log_deleted(sender, instance, origin=None, **kwargs):
+    """User deletes cascade to the trend row itself."""
+    if isinstance(origin, User):
+        return
+    rebuild_weight_trend(instance.user_id)
+
+
+# ========== TRACKER STREAKS AND ACTIVITY BITMAPS ==========
+
+
+def remember_streak_date_time(sender, instance, raw=False, **kwargs):
+    """Stash the stored timestamp so an update that moves the log re-counts both days."""
+    if raw or instance.pk is None:
+        return
+    instance._streak_previous_date_time = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('date_time', flat=True).first()
+
+
+def streak_log_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Update the tracker's streak and activity bitmap for the log's day (and the day it left)."""
+    if raw:
+        return
+    tracker = TRACKER_BY_MODEL[sender]
+    zone = user_timezone(instance.user)
+    day = log_day(sender, instance.date_time, zone)
+    previous = getattr(instance, '_streak_previous_date_time', None)
+    if not created and previous is not None:
+        previous_day = log_day(sender, previous, zone)
+        if previous_day == day:
+            return
+        if remove_log_day(instance.user_id, tracker, previous_day, zone):
+            unmark_day(instance.user_id, tracker, previous_day)
+    record_log_day(instance.user_id, tracker, day, zone)
+    mark_day(instance.user_id, tracker, day)
+
+
+def streak_log_deleted(sender, instance, origin=None, **kwargs):
+    """User deletes cascade to the streak and bitmap rows."""
+    if isinstance(origin, User):
+        return
+    tracker = TRACKER_BY_MODEL[sender]
+    zone = user_timezone(instance.user)
+    day = log_day(sender, instance.date_time, zone)
+    if remove_log_day(instance.user_id, tracker, day, zone):
+        unmark_day(instance.user_id, tracker, day)
+
+
+for _log_model in TRACKER_BY_MODEL:
+    pre_save.connect(remember_streak_date_time, sender=_log_model, dispatch_uid=f'streak_log_pre_save_{_log_model.__name__}')
+    post_save.connect(streak_log_saved, sender=_log_model, dispatch_uid=f'streak_log_saved_{_log_model.__name__}')
+    post_delete.connect(streak_log_deleted, sender=_log_model, dispatch_uid=f'streak_log_deleted_{_log_model.__name__}')
+
+
+# ========== HOME DASHBOARD SNAPSHOTS ==========
+
+# Log model -> home dashboard sections a write can change for the log's day
+_HOME_LOG_SECTIONS = {
+    FoodLog: ('nutrition',),
+    WeightLog: ('trackers',),
+    WaterLog: ('trackers',),
+    BodyMeasurementLog: ('trackers',),
+    StepsLog: ('activity', 'trackers'),
+    CardioLog: ('activity', 'trackers'),
+    SleepLog: ('trackers',),
+    HealthMetricsLog: ('trackers',),
+    WorkoutLog: ('split',),
+}
+
+
+def _home_log_date(log):
+    """Local day of a log in its owner's timezone; sleep and health logs carry a plain date."""
+    if isinstance(log.date_time, datetime):
+        return local_date(log.date_time, user_timezone(log.user))
+    return log.date_time
+
+
+def home_log_saved(sender, instance, created=False, raw=False, **kwargs):
+    """A new log touches its own day; an edit may have moved it, so clear every day."""
+    if raw:
+        return
+    dates = [_home_log_date(instance)] if created else None
+    invalidate_home_sections(instance.user_id, _HOME_LOG_SECTIONS[sender], dates)
+    if sender is WeightLog:
+        # The latest weight feeds the steps calorie estimate on every day
+        invalidate_home_sections(instance.user_id, ('body',))
+
+
+def home_log_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Clear the log's day. Cascades from a Food or Meal are handled once in
+    food_or_meal_deleted, from a Workout in workout_deleted; user deletes drop the snapshots.
+    """
+    if isinstance(origin, (User, Food, Meal)):
+        return
+    if isinstance(origin, Workout):
+        origin.__dict__.setdefault('_home_user_ids', set()).add(instance.user_id)
+        return
+    invalidate_home_sections(instance.user_id, _HOME_LOG_SECTIONS[sender], [_home_log_date(instance)])
+    if sender is WeightLog:
+        invalidate_home_sections(instance.user_id, ('body',))
+
+
+for _log_model in _HOME_LOG_SECTIONS:
+    post_save.connect(home_log_saved, sender=_log_model, dispatch_uid=f'home_log_saved_{_log_model.__name__}')
+    post_delete.connect(home_log_deleted, sender=_log_model, dispatch_uid=f'home_log_deleted_{_log_model.__name__}')
+
+
+@receiver(post_delete, sender=Workout)
+def workout_deleted(sender, instance, origin=None, **kwargs):
+    user_ids = getattr(origin, '_home_user_ids', ())
+    for user_id in user_ids:
+        invalidate_home_sections(user_id, ('split',))
+    if user_ids:
+        invalidate_user_series(user_ids)
+        rebuild_muscle_fatigue(user_ids)
+        rebuild_activity_bitmaps(user_ids, trackers=('workout',))
+
+
+@receiver(post_save, sender=UserGoal)
+@receiver(post_delete, sender=UserGoal)
+def user_goal_changed(sender, instance, raw=False, origin=None, **kwargs):
+    """The dashboard shows the latest goal on every day."""
+    if raw or isinstance(origin, User):
+        return
+    invalidate_home_sections(instance.user_id, ('goals',))
+
+
+@receiver(pre_save, sender=User)
+def remember_user_timezone(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Stash the stored timezone so a change can re-bucket the user's days."""
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'timezone' not in update_fields:
+        return
+    instance._previous_timezone = User.objects.filter(
+        pk=instance.pk
+    ).values_list('timezone', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def user_profile_saved(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """
+    A timezone change moves every log to a possibly different local day, so the nutrition,
+    workout-day, streak and activity-bitmap tables are rebuilt for the user and all cached
+    snapshots and series dropped. The rebuild runs synchronously inside the profile PUT.
+    Otherwise only height matters (it feeds the steps calorie estimate); saves that cannot
+    touch it (e.g. last_login) are skipped.
+    """
+    if raw or created:
+        return
+    previous_timezone = instance.__dict__.pop('_previous_timezone', None)
+    if previous_timezone is not None and previous_timezone != instance.timezone:
+        # Every log may now fall on a different local day
+        backfill_daily_nutrition([instance.pk])
+        backfill_workout_days([instance.pk])
+        backfill_streaks([instance.pk])
+        rebuild_activity_bitmaps([instance.pk])
+        invalidate_home_sections(instance.pk, SECTION_BUILDERS)
+        invalidate_user_series(instance.pk)
+        return
+    if update_fields is not None and 'height' not in update_fields:
+        return
+    invalidate_home_sections(instance.pk, ('body',))
+
+
+@receiver(post_save, sender=Split)
+@receiver(post_delete, sender=Split)
+def split_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, User):
+        return
+    invalidate_home_sections(instance.user_id, ('split',))
+
+
+@receiver(post_save, sender=SplitDay)
+@receiver(post_delete, sender=SplitDay)
+def split_day_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, (User, Split)):
+        return
+    invalidate_home_sections(instance.split.user_id, ('split',))
+
+
+@receiver(post_save, sender=SplitDayTarget)
+@receiver(post_delete, sender=SplitDayTarget)
+def split_day_target_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, (User, Split, SplitDay)):
+        return
+    invalidate_home_sections(instance.split_day.split.user_id, ('split',))
+
+
+@receiver(post_save, sender=WorkoutMuscle)
+@receiver(post_delete, sender=WorkoutMuscle)
+def workout_muscle_changed(sender, instance, raw=False, origin=None, **kwargs):
+    """
+    Activation ratings feed done activation and muscle fatigue for everyone who logged the
+    workout; a rating change reweights every past set, so their fatigue is rebuilt.
+    """
+    if raw or isinstance(origin, (User, Workout)):
+        return
+    user_ids = list(WorkoutLog.objects.filter(
+        workout_id=instance.workout_id
+    ).values_list('user_id', flat=True).distinct())
+    for user_id in user_ids:
+        invalidate_home_sections(user_id, ('split',))
+    if user_ids:
+        rebuild_muscle_fatigue(user_ids)
+
+
+# ========== ANALYTICS SERIES CACHE ==========
+
+# Tables feeding UserSeries columns (directly or through the rollups)
+_SERIES_LOG_MODELS = (
+    FoodLog, WeightLog, WaterLog, StepsLog, CardioLog, SleepLog, HealthMetricsLog, WorkoutLog,
+)
+
+
+def series_log_changed(sender, instance, raw=False, origin=None, **kwargs):
+    """
+    Any write to a source log makes the user's cached series stale. Cascades from a Food or
+    Meal are handled in food_or_meal_deleted, from a Workout in workout_deleted.
+    """
+    if raw or isinstance(origin, (User, Food, Meal, Workout)):
+        return
+    invalidate_user_series(instance.user_id)
+
+
+for _log_model in _SERIES_LOG_MODELS:
+    post_save.connect(series_log_changed, sender=_log_model, dispatch_uid=f'series_log_saved_{_log_model.__name__}')
+    post_delete.connect(series_log_changed, sender=_log_model, dispatch_uid=f'series_log_deleted_{_log_model.__name__}')
+
+
+# ========== BULK INSERTS ==========
+
+
+def tracker_logs_bulk_created(model, user, logs):
+    """
+    Do the post_save work for tracker logs inserted with bulk_create, which sends no signals:
+    weight trend, streak, activity bitmap, home snapshot days and cached series, once per
+    model and user instead of once per log.
+    """
+    if not logs:
+        return
+    tracker = TRACKER_BY_MODEL[model]
+    zone = user_timezone(user)
+    days = {log_day(model, log.date_time, zone) for log in logs}
+    # One transaction for the whole call (no savepoint inside the caller's): the streak row
+    # lock is taken once and held until commit
+    with transaction.atomic(savepoint=False):
+        if model is WeightLog:
+            record_weigh_ins(user.pk, logs)
+            invalidate_home_sections(user.pk, ('body',))
+        record_log_days(user.pk, tracker, days, zone)
+        mark_days(user.pk, tracker, days)
+        invalidate_home_sections(user.pk, _HOME_LOG_SECTIONS[model], days)
+        if model in _SERIES_LOG_MODELS:
+            invalidate_user_series(user.pk)
@@ -0,0 +1,202 @@
+"""
+Streak engine - consecutive days with at least one log, per user and tracker.
+
+TrackerStreak stores each (user, tracker)'s latest run of logged days (run_start..last_date)
+and the longest run ever, so streak endpoints read one row instead of probing a day at a
+time. apps.analytics.signals keeps the rows current on every log write:
+- a log on a day inside the latest run, the day after it, or any later day updates the row
+  in O(1) (nothing / extend the run / start a new run); a bulk insert folds its days in order;
+- back-dated logs, edits that move a log, and deletes that empty a day can merge or split
+  runs anywhere in history, so those recompute the row from the tracker's distinct logged
+  days, fetched in one query.
+Days are the user's local days for timestamped logs; sleep and health logs carry a date.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+
+from apps.health.models import HealthMetricsLog, SleepLog
+from apps.logging.models import BodyMeasurementLog, CardioLog, StepsLog, WaterLog, WeightLog
+from apps.users.timezones import LocalDate, day_range, local_date, local_today, user_timezone, user_timezones
+from .models import TrackerStreak
+
+TRACKER_MODELS = {
+    'weight': WeightLog,
+    'body_measurement': BodyMeasurementLog,
+    'water': WaterLog,
+    'steps': StepsLog,
+    'cardio': CardioLog,
+    'sleep': SleepLog,
+    'health_metrics': HealthMetricsLog,
+}
+TRACKERS = tuple(TRACKER_MODELS)
+TRACKER_BY_MODEL = {model: tracker for tracker, model in TRACKER_MODELS.items()}
+
+# Current streaks are reported up to a year, as the streak endpoints always have
+MAX_STREAK_DAYS = 365
+
+
+def _is_datetime(model):
+    return model._meta.get_field('date_time').get_internal_type() == 'DateTimeField'
+
+
+def log_day(model, date_time, zone):
+    """The calendar day a tracker log with this date_time value counts for."""
+    return local_date(date_time, zone) if _is_datetime(model) else date_time
+
+
+def logs_on(model, user_id, day, zone):
+    """The user's logs of model that count for day."""
+    if _is_datetime(model):
+        return model.objects.filter(user_id=user_id, **day_range('date_time', zone, day, day))
+    return model.objects.filter(user_id=user_id, date_time=day)
+
+
+def distinct_log_days(model, user_id, zone):
+    """Sorted distinct days the user has logs of model on, in one query."""
+    day = LocalDate('date_time', zone) if _is_datetime(model) else F('date_time')
+    logs = model.objects.filter(user_id=user_id).annotate(day=day)
+    return list(logs.values_list('day', flat=True).distinct().order_by('day'))
+
+
+def logged_days(user_id, tracker, zone):
+    """Sorted distinct days the user logged tracker on, in one query."""
+    return distinct_log_days(TRACKER_MODELS[tracker], user_id, zone)
+
+
+def runs(days):
+    """(run_start, last_date, current, longest) for sorted distinct days; the latest run is current."""
+    run_start = last_date = None
+    current = longest = 0
+    for day in days:
+        if last_date is not None and day == last_date + timedelta(days=1):
+            current += 1
+        else:
+            run_start, current = day, 1
+        last_date = day
+        longest = max(longest, current)
+    return run_start, last_date, current, longest
+
+
+def _streak_fields(user_id, tracker, zone):
+    run_start, last_date, current, longest = runs(logged_days(user_id, tracker, zone))
+    return {'run_start': run_start, 'last_date': last_date, 'current': current, 'longest': longest}
+
+
+def recompute_streak(user_id, tracker, zone=None):
+    """Rebuild one TrackerStreak row from the tracker's logged days (one query)."""
+    zone = zone or user_timezone(user_id)
+    state, _ = TrackerStreak.objects.update_or_create(
+        user_id=user_id, tracker=tracker, defaults=_streak_fields(user_id, tracker, zone),
+    )
+    return state
+
+
+def record_log_day(user_id, tracker, day, zone=None):
+    """Account for a new log on day: O(1) unless it lands before the latest run."""
+    with transaction.atomic():
+        return record_log_days(user_id, tracker, [day], zone)
+
+
+def record_log_days(user_id, tracker, days, zone=None):
+    """
+    Account for new logs on days (e.g. a bulk insert, which sends no signals): folded in
+    order in O(len(days)) unless one lands before the latest run, then one recompute.
+
+    Call inside transaction.atomic(): the row stays locked until the caller commits, so
+    concurrent writers (a bulk ingest beside a POST) fold their days in turn.
+    """
+    days = sorted(set(days))
+    state = TrackerStreak.objects.select_for_update().filter(user_id=user_id, tracker=tracker).first()
+    if not days:
+        return state
+    if state is None or (state.last_date is not None and days[0] < state.run_start):
+        # No row yet, or a day that may join the latest run to an earlier one
+        fields = _streak_fields(user_id, tracker, zone or user_timezone(user_id))
+        if state is None:
+            return TrackerStreak.objects.create(user_id=user_id, tracker=tracker, **fields)
+        for field, value in fields.items():
+            setattr(state, field, value)
+        state.save()
+        return state
+    changed = False
+    for day in days:
+        if state.last_date is not None and day <= state.last_date:
+            continue
+        if state.last_date is not None and day == state.last_date + timedelta(days=1):
+            state.current += 1
+        else:
+            state.run_start, state.current = day, 1
+        state.last_date = day
+        state.longest = max(state.longest, state.current)
+        changed = True
+    if changed:
+        state.save()
+    return state
+
+
+def remove_log_day(user_id, tracker, day, zone=None):
+    """
+    Account for a log removed from day; only a day left with no logs changes streaks.
+    Returns True when day has no logs left.
+    """
+    zone = zone or user_timezone(user_id)
+    if logs_on(TRACKER_MODELS[tracker], user_id, day, zone).exists():
+        return False
+    recompute_streak(user_id, tracker, zone)
+    return True
+
+
+def current_streak(state, today, zone=None):
+    """
+    Days in a row up to and including today, at most MAX_STREAK_DAYS; 0 when nothing was
+    logged today. Logged days after today do not count.
+    """
+    run_start, last_date = state.run_start, state.last_date
+    if run_start is not None and today < run_start:
+        # The latest run is future-dated (e.g. an import from another zone): find the run
+        # through today from the logged days instead
+        zone = zone or user_timezone(state.user_id)
+        days = [day for day in logged_days(state.user_id, state.tracker, zone) if day <= today]
+        run_start, last_date, _, _ = runs(days)
+    if last_date is None or not run_start <= today <= last_date:
+        return 0
+    return min((today - run_start).days + 1, MAX_STREAK_DAYS)
+
+
+def tracker_streaks(user, trackers=TRACKERS):
+    """
+    {tracker: TrackerStreak} for the user, read in one query; trackers without a row yet
+    (logged before streaks were stored) are computed once and saved.
+    """
+    states = {
+        state.tracker: state
+        for state in TrackerStreak.objects.filter(user=user, tracker__in=trackers)
+    }
+    for tracker in trackers:
+        if tracker not in states:
+            states[tracker] = recompute_streak(user.pk, tracker, user_timezone(user))
+    return states
+
+
+def backfill_streaks(user_ids=None):
+    """
+    Recompute every TrackerStreak row, one distinct-day query per (user, tracker).
+
+    user_ids: optional iterable restricting the rebuild to those users.
+    Returns the number of rows written.
+    """
+    written = 0
+    for user_id, zone in user_timezones(user_ids).items():
+        for tracker in TRACKERS:
+            recompute_streak(user_id, tracker, zone)
+            written += 1
+    return written
+
+
+def streak_payload(user, tracker):
+    """The single-tracker streak response body: {'streak': current, 'longest': longest}."""
+    state = tracker_streaks(user, (tracker,))[tracker]
+    return {'streak': current_streak(state, local_today(user)), 'longest': state.longest}
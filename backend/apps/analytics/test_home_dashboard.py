@@ -1,8 +1,11 @@
 """Tests for GET /api/analytics/home/dashboard/."""
 from decimal import Decimal
 from datetime import datetime, date, timedelta
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -10,11 +13,18 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from apps.users.models import AccessLevel, UserGoal
 from apps.logging.models import FoodLog, WeightLog, StepsLog, WaterLog
 from apps.foods.models import Food, Meal
-from apps.analytics.views import _eastern_day_datetime_bounds
+from apps.analytics.models import HomeDashboardSnapshot
+from apps.users.timezones import DEFAULT_TIMEZONE, day_bounds, zone_named
 
 User = get_user_model()
 
-# Fixed calendar day so tests match home dashboard Eastern-day windowing.
+
+def _eastern_day_datetime_bounds(day):
+    # Test users keep the default timezone (US Eastern)
+    return day_bounds(day, zone_named(DEFAULT_TIMEZONE))
+
+
+# Fixed calendar day so tests match home dashboard local-day windowing.
 DASH_DATE = date(2030, 6, 15)
 DASH_DATE_QUERY = DASH_DATE.isoformat()
 
@@ -31,6 +41,10 @@ class HomeDashboardTests(APITestCase):
         )
         refresh = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+        # Snapshots are only cached next to the user's today; make DASH_DATE today
+        patcher = mock.patch('apps.analytics.home_snapshots.local_today', return_value=DASH_DATE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.food = Food.objects.create(
             food_name='Test Dash Food',
             serving_size=Decimal('100'),
@@ -123,3 +137,73 @@ class HomeDashboardTests(APITestCase):
         r = self.client.get('/api/analytics/home/dashboard/', {'date': DASH_DATE_QUERY})
         ids = {t['id'] for t in r.json()['data']['trackers_not_logged']}
         self.assertNotIn('water', ids)
+
+    # Snapshot caching: sections are cached per day and rebuilt only after a relevant write.
+
+    url = '/api/analytics/home/dashboard/'
+
+    def _get(self):
+        r = self.client.get(self.url, {'date': DASH_DATE_QUERY})
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        return r.json()['data']
+
+    def test_cached_day_served_without_rebuild(self):
+        first = self._get()
+        with CaptureQueriesContext(connection) as cached:
+            second = self._get()
+        self.assertEqual(second, first)
+        # Served from the snapshot row: no log or goal table is read. The rest of the queries
+        # are per-request overhead (middleware and DRF user lookups, the api_usage_log insert).
+        sql = [q['sql'] for q in cached.captured_queries]
+        source_tables = [m._meta.db_table for m in (FoodLog, WeightLog, StepsLog, WaterLog, UserGoal)]
+        self.assertFalse([q for q in sql if any(table in q for table in source_tables)])
+        self.assertEqual(len([q for q in sql if HomeDashboardSnapshot._meta.db_table in q]), 1)
+
+    def test_log_write_clears_only_its_sections_and_day(self):
+        self._get()
+        other_day = DASH_DATE - timedelta(days=1)
+        self.client.get(self.url, {'date': other_day.isoformat()})
+        day_start, _ = _eastern_day_datetime_bounds(DASH_DATE)
+        WaterLog.objects.create(
+            user=self.user, amount=Decimal('1'), unit='L', date_time=day_start + timedelta(hours=10),
+        )
+        snapshot = HomeDashboardSnapshot.objects.get(user=self.user, date=DASH_DATE)
+        self.assertIsNone(snapshot.trackers)
+        self.assertIsNotNone(snapshot.nutrition)
+        self.assertIsNotNone(
+            HomeDashboardSnapshot.objects.get(user=self.user, date=other_day).trackers
+        )
+        ids = {t['id'] for t in self._get()['trackers_not_logged']}
+        self.assertNotIn('water', ids)
+
+    def test_food_log_and_goal_edits_refresh_cached_day(self):
+        self._get()
+        day_start, _ = _eastern_day_datetime_bounds(DASH_DATE)
+        FoodLog.objects.create(
+            user=self.user, food=self.food, servings=Decimal('1'), measurement='g',
+            date_time=day_start + timedelta(hours=18),
+        )
+        UserGoal.objects.create(
+            user=self.user, calories_goal=2500, protein_goal=Decimal('160'),
+        )
+        d = self._get()
+        self.assertEqual(d['consumed']['calories'], 300.0)
+        self.assertEqual(d['goals']['calories'], 2500)
+        self.assertEqual(d['macro_remaining']['protein'], 130.0)
+
+    def test_weight_change_refreshes_other_days(self):
+        self._get()
+        WeightLog.objects.create(
+            user=self.user, weight=Decimal('176'), weight_unit='lb',
+            date_time=_eastern_day_datetime_bounds(DASH_DATE + timedelta(days=1))[0],
+        )
+        self.assertEqual(self._get()['weight_kg_used_for_steps'], 79.83)
+
+    def test_dates_away_from_today_are_not_cached(self):
+        far_day = DASH_DATE - timedelta(days=30)
+        r = self.client.get(self.url, {'date': far_day.isoformat()})
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(r.json()['data']['date'], far_day.isoformat())
+        self.assertFalse(HomeDashboardSnapshot.objects.filter(user=self.user, date=far_day).exists())
+        self._get()
+        self.assertTrue(HomeDashboardSnapshot.objects.filter(user=self.user, date=DASH_DATE).exists())
@@ -1,17 +1,44 @@
 """
 Tests for analytics app. Verify API responses match database data.
 """
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 
-from apps.workouts.models import Workout, WorkoutLog
-from apps.logging.models import FoodLog
+import numpy as np
+
+from apps.workouts.models import (
+    Muscle, Split, SplitDay, SplitDayTarget, Workout, WorkoutLog, WorkoutMuscle,
+)
+from apps.logging.models import FoodLog, StepsLog, WaterLog, WeightLog
+from apps.health.models import HealthMetricsLog, SleepLog
+from apps.users.models import UserGoal
+from apps.users.timezones import day_bounds, day_range, local_date, user_timezone, zone_named
 from apps.foods.models import Food, Meal
+from apps.analytics.correlations import average_ranks, correlation_matrix
+from apps.analytics.distributions import distribution
+from apps.analytics.downsampling import downsample_points, lttb_indices
+from apps.analytics import rolling
+from apps.analytics.goal_timeline import GoalTimeline
+from apps.analytics.metrics import load_metric_days
+from apps.analytics.models import (
+    ActivityBitmap, DailyNutritionRollup, MuscleFatigue, TrackerStreak, UserSeriesStamp, WeightTrend,
+    WorkoutDayRollup,
+)
+from apps.analytics.rollups import (
+    NUTRIENT_VECTOR_FIELDS, NUTRIENT_VECTOR_INDEX, backfill_daily_nutrition, backfill_workout_days,
+    calendar_buckets, food_log_nutrient_vector, period_start, rollup_nutrient_vector,
+)
+from apps.analytics.series_cache import UserSeries, series_cache, user_series
+from apps.analytics.streaks import MAX_STREAK_DAYS, current_streak
+from apps.analytics import activity_bitmaps, muscle_fatigue, weight_trend
 
 User = get_user_model()
 
@@ -52,7 +79,8 @@ class AnalyticsDateBoundsTest(APITestCase):
         self.user = User.objects.create_user(
             username='boundsuser',
             email='b@example.com',
-            password='testpass123'
+            password='testpass123',
+            timezone='UTC',
         )
         refresh = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
@@ -115,7 +143,8 @@ class WorkoutProgressionTest(APITestCase):
         self.user = User.objects.create_user(
             username='proguser',
             email='p@example.com',
-            password='testpass123'
+            password='testpass123',
+            timezone='UTC',
         )
         refresh = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
@@ -207,6 +236,57 @@ class WorkoutProgressionTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['data']['points'][0]['progression'], 120)
 
+    def _log_sets(self, days):
+        for d in days:
+            WorkoutLog.objects.create(
+                user=self.user,
+                workout=self.workout,
+                weight=Decimal('100'),
+                reps=10,
+                rest_time=60,
+                date_time=datetime.combine(d, datetime.min.time())
+            )
+
+    def test_workout_progression_metric_overlays(self):
+        """Overlay values come from each source for the (offset) point date; empty days read 0."""
+        d1 = date.today() - timedelta(days=3)
+        d2 = date.today() - timedelta(days=1)
+        self._log_sets([d1, d2])
+        prior = d1 - timedelta(days=1)
+        StepsLog.objects.create(user=self.user, steps=8000, date_time=datetime.combine(prior, time(9)))
+        WeightLog.objects.create(user=self.user, weight=Decimal('80.5'), weight_unit='kg',
+                                 date_time=datetime.combine(prior, time(7)))
+        WeightLog.objects.create(user=self.user, weight=Decimal('80.1'), weight_unit='kg',
+                                 date_time=datetime.combine(prior, time(21)))
+        metrics = 'steps__total_steps,weight__weight,workout_log__total_sets,workout_log__avg_rest_time'
+        response = self.client.get(
+            f'/api/analytics/workouts/progression/?workout_id={self.workout.workouts_id}'
+            f'&range=2weeks&metrics={metrics}&metric_offset=1'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second = response.data['data']['points']
+        self.assertEqual(first['steps__total_steps'], 8000)
+        self.assertEqual(first['weight__weight'], 80.1)
+        self.assertEqual(first['workout_log__total_sets'], 0)
+        self.assertEqual(second['steps__total_steps'], 0)
+        self.assertNotIn('weight__weight', second)
+        self.assertEqual(second['workout_log__total_sets'], 0)
+        self.assertEqual(second['workout_log__avg_rest_time'], 0.0)
+
+    def test_workout_progression_metric_queries_do_not_scale_with_points(self):
+        """Overlay metrics cost one query per source regardless of how many points are charted."""
+        metrics = 'steps__total_steps,water__total_water,food__total_protein,sleep__total_sleep_time'
+        url = (f'/api/analytics/workouts/progression/?workout_id={self.workout.workouts_id}'
+               f'&range=1month&metrics={metrics}')
+        self._log_sets([date.today() - timedelta(days=1)])
+        with CaptureQueriesContext(connection) as few_points:
+            self.client.get(url)
+        self._log_sets([date.today() - timedelta(days=n) for n in range(2, 12)])
+        with CaptureQueriesContext(connection) as many_points:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['data']['points']), 11)
+        self.assertEqual(len(many_points), len(few_points))
+
     def test_workout_progression_404_other_user_workout(self):
         """Non-existent or other user's workout returns 404."""
         other = User.objects.create_user(username='other', email='o@x.com', password='x')
@@ -268,6 +348,53 @@ class ActivationProgressDateRangeTest(APITestCase):
             self.assertIn('points', response.data.get('data', {}))
 
 
+class ActivationProgressSplitCalendarTest(APITestCase):
+    """Activation progress maps dates onto the split cycle and sums logged activations."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='splituser', email='sp@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.chest = Muscle.objects.create(muscle_name='Chest', muscle_group='Push')
+        self.back = Muscle.objects.create(muscle_name='Back', muscle_group='Pull')
+        self.start = date.today() - timedelta(days=5)
+        split = Split.objects.create(user=self.user, split_name='PPL', start_date=self.start)
+        push = SplitDay.objects.create(split=split, day_name='Push', day_order=1)
+        pull = SplitDay.objects.create(split=split, day_name='Pull', day_order=2)
+        SplitDayTarget.objects.create(split_day=push, muscle=self.chest, target_activation=200)
+        SplitDayTarget.objects.create(split_day=pull, muscle=self.back, target_activation=100)
+        self.bench = Workout.objects.create(user=self.user, workout_name='Bench', type='barbell')
+        WorkoutMuscle.objects.create(workout=self.bench, muscle=self.chest, activation_rating=80)
+
+    def _url(self, days):
+        date_from = self.start - timedelta(days=2)
+        date_to = date_from + timedelta(days=days)
+        return (f'/api/analytics/workouts/activation-progress/'
+                f'?range=custom&date_from={date_from.isoformat()}&date_to={date_to.isoformat()}')
+
+    def test_dates_cycle_through_split_days(self):
+        for _ in range(2):
+            WorkoutLog.objects.create(user=self.user, workout=self.bench, weight=Decimal('60'), reps=8,
+                                      date_time=datetime.combine(self.start, time(18)))
+        response = self.client.get(self._url(5))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.data['data']['points']
+        # Days before the split start are skipped
+        self.assertEqual(points[0]['date'], self.start.isoformat())
+        self.assertEqual([p['split_day_name'] for p in points], ['Push', 'Pull', 'Push', 'Pull'])
+        self.assertEqual(points[0]['total_actual'], 160)
+        self.assertEqual(points[0]['percentage'], 80.0)
+        self.assertEqual(points[1]['total_expected'], 100)
+        self.assertEqual(points[1]['total_actual'], 0)
+
+    def test_query_count_independent_of_window(self):
+        with CaptureQueriesContext(connection) as short:
+            self.client.get(self._url(3))
+        with CaptureQueriesContext(connection) as long:
+            self.client.get(self._url(30))
+        self.assertEqual(len(long), len(short))
+
+
 class FoodAnalyticsDateRangeTest(APITestCase):
     """Test food analytics use shared date range and returned data matches DB."""
 
@@ -275,7 +402,8 @@ class FoodAnalyticsDateRangeTest(APITestCase):
         self.user = User.objects.create_user(
             username='fooduser',
             email='f@example.com',
-            password='testpass123'
+            password='testpass123',
+            timezone='UTC',
         )
         refresh = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
@@ -339,3 +467,1027 @@ class FoodAnalyticsDateRangeTest(APITestCase):
             self.assertIn('percentage', item)
             self.assertIn('name', item)
             self.assertIn('count', item)
+
+
+class WeightProgressionTest(APITestCase):
+    """Weight progression loads each source once for the whole window."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='weightuser', email='wt@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.date_to = date.today() - timedelta(days=1)
+
+    def _get(self, days):
+        date_from = self.date_to - timedelta(days=days)
+        return self.client.get(
+            f'/api/analytics/health/weight-progression/?include_metrics=true'
+            f'&date_from={date_from.isoformat()}&date_to={self.date_to.isoformat()}'
+        )
+
+    def test_points_use_latest_weight_and_day_totals(self):
+        WeightLog.objects.create(user=self.user, weight=Decimal('81.0'), weight_unit='kg',
+                                 date_time=datetime.combine(self.date_to, time(7)))
+        WeightLog.objects.create(user=self.user, weight=Decimal('80.4'), weight_unit='kg',
+                                 date_time=datetime.combine(self.date_to, time(20)))
+        WaterLog.objects.create(user=self.user, amount=Decimal('500'), unit='ml',
+                                date_time=datetime.combine(self.date_to, time(9)))
+        HealthMetricsLog.objects.create(user=self.user, mood=7, date_time=self.date_to)
+        UserGoal.objects.create(user=self.user, weight_goal=Decimal('78'))
+        response = self._get(7)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.data['data']['points']
+        self.assertEqual(len(points), 8)
+        last = points[-1]
+        self.assertEqual(last['weight'], 80.4)
+        self.assertEqual(last['water'], 500.0)
+        self.assertEqual(last['mood'], 7)
+        self.assertEqual(last['calories'], 0.0)
+        # Goal created today is not yet in effect for earlier days
+        self.assertIsNone(last['goal_weight'])
+        self.assertIsNone(points[0]['weight'])
+
+    def test_query_count_independent_of_window(self):
+        WeightLog.objects.create(user=self.user, weight=Decimal('80'), weight_unit='kg',
+                                 date_time=datetime.combine(self.date_to, time(7)))
+        UserGoal.objects.create(user=self.user, weight_goal=Decimal('78'))
+        # Compare cold series loads once the user's cache stamp exists
+        self._get(1)
+        series_cache.clear()
+        with CaptureQueriesContext(connection) as week:
+            self.assertEqual(self._get(7).status_code, status.HTTP_200_OK)
+        series_cache.clear()
+        with CaptureQueriesContext(connection) as quarter:
+            self.assertEqual(self._get(90).status_code, status.HTTP_200_OK)
+        self.assertEqual(len(quarter), len(week))
+
+
+class GoalTimelineTest(TestCase):
+    """GoalTimeline returns the goal created on or before each day's midnight."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='goaluser', email='g@x.com', password='testpass123')
+        self.day = date.today() - timedelta(days=10)
+        for offset, calories in ((0, 2000), (4, 2500)):
+            goal = UserGoal.objects.create(user=self.user, calories_goal=calories)
+            UserGoal.objects.filter(pk=goal.pk).update(
+                created_at=timezone.make_aware(datetime.combine(self.day + timedelta(days=offset), time(12)))
+            )
+
+    def test_goal_on(self):
+        timeline = GoalTimeline.for_user(self.user)
+        self.assertIsNone(timeline.goal_on(self.day))
+        self.assertEqual(timeline.goal_on(self.day + timedelta(days=1)).calories_goal, 2000)
+        self.assertEqual(timeline.goal_on(self.day + timedelta(days=4)).calories_goal, 2000)
+        self.assertEqual(timeline.goal_on(self.day + timedelta(days=5)).calories_goal, 2500)
+
+    def test_until_skips_later_goals(self):
+        timeline = GoalTimeline.for_user(self.user, until=self.day + timedelta(days=3))
+        self.assertEqual(len(timeline.goals), 1)
+
+    def test_metadata_progress_goal_line_follows_history(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        date_from = self.day + timedelta(days=3)
+        response = client.get(
+            '/api/analytics/foods/metadata-progress/?metadata_type=calories&range=custom'
+            f'&date_from={date_from.isoformat()}&date_to={(date_from + timedelta(days=3)).isoformat()}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        goals = [p['goal'] for p in response.data['data']['points']]
+        self.assertEqual(goals, [2000, 2000, 2500, 2500])
+
+
+class DailyNutritionRollupTest(APITestCase):
+    """Rollup rows track FoodLog create/update/delete and food edits; backfill matches."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rollupuser', email='r@x.com', password='testpass123', timezone='UTC')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.food = make_food(food_name='Rollup Food', created_by=self.user, cost=Decimal('1.50'))
+        self.day = date.today() - timedelta(days=2)
+
+    def _log(self, servings='1', day=None):
+        response = self.client.post('/api/foods/logs/', {
+            'food': self.food.food_id,
+            'servings': servings,
+            'measurement': 'g',
+            'date_time': datetime.combine(day or self.day, datetime.min.time()).isoformat() + 'Z',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['data']['macro_log_id']
+
+    def test_create_and_delete_keep_rollup_current(self):
+        log_id = self._log('2')
+        self._log('1')
+        rollup = DailyNutritionRollup.objects.get(user=self.user, date=self.day)
+        self.assertEqual(rollup.calories, Decimal('600'))
+        self.assertEqual(rollup.cost, Decimal('4.5'))
+        self.assertEqual(rollup.log_count, 2)
+
+        self.client.delete(f'/api/foods/logs/{log_id}/')
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.calories, Decimal('200'))
+
+    def test_update_moves_log_between_days(self):
+        log_id = self._log('1')
+        new_day = self.day - timedelta(days=1)
+        response = self.client.patch(f'/api/foods/logs/{log_id}/', {
+            'date_time': datetime.combine(new_day, datetime.min.time()).isoformat() + 'Z',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(DailyNutritionRollup.objects.filter(user=self.user, date=self.day).exists())
+        self.assertEqual(DailyNutritionRollup.objects.get(user=self.user, date=new_day).calories, Decimal('200'))
+
+    def test_food_edit_recomputes_logged_days(self):
+        self._log('2')
+        response = self.client.put(f'/api/foods/{self.food.food_id}/', {'calories': '300'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(DailyNutritionRollup.objects.get(user=self.user, date=self.day).calories, Decimal('600'))
+
+    def test_food_delete_cascade_clears_rollup(self):
+        self._log('1')
+        self.client.delete(f'/api/foods/{self.food.food_id}/')
+        self.assertFalse(DailyNutritionRollup.objects.filter(user=self.user).exists())
+
+    def test_backfill_matches_incremental(self):
+        self._log('2')
+        self._log('1', day=self.day - timedelta(days=3))
+        expected = {r.date: r.protein for r in DailyNutritionRollup.objects.filter(user=self.user)}
+        DailyNutritionRollup.objects.all().delete()
+        self.assertEqual(backfill_daily_nutrition(), 2)
+        actual = {r.date: r.protein for r in DailyNutritionRollup.objects.filter(user=self.user)}
+        self.assertEqual(actual, expected)
+
+    def test_metadata_progress_reads_rollup(self):
+        self._log('2')
+        response = self.client.get('/api/analytics/foods/metadata-progress/?metadata_type=protein&range=1week')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        point = next(p for p in response.data['data']['points'] if p['date'] == self.day.isoformat())
+        self.assertEqual(point['actual'], 20.0)
+
+    def test_nutrient_vectors_match(self):
+        self._log('2')
+        self._log('1', day=self.day - timedelta(days=1))
+        with CaptureQueriesContext(connection) as queries:
+            from_rollups = rollup_nutrient_vector(self.user.pk, self.day - timedelta(days=1), self.day)
+        self.assertEqual(len(queries), 1)
+        from_logs = food_log_nutrient_vector(FoodLog.objects.filter(user=self.user))
+        self.assertEqual(len(from_rollups), len(NUTRIENT_VECTOR_FIELDS))
+        np.testing.assert_allclose(from_rollups, from_logs)
+        self.assertEqual(from_rollups[NUTRIENT_VECTOR_INDEX['protein']], 30.0)
+        self.assertEqual(from_rollups[NUTRIENT_VECTOR_INDEX['cost']], 4.5)
+
+    def test_radar_chart_averages_rollup_days(self):
+        self._log('2')
+        response = self.client.get(
+            f'/api/analytics/foods/radar-chart/?date_from={self.day - timedelta(days=1)}&date_to={self.day}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['actual']['protein'], 10.0)
+        self.assertEqual(response.data['data']['actual']['calories'], 200.0)
+
+    def test_calendar_buckets_clip_to_range(self):
+        buckets = calendar_buckets(date(2024, 1, 30), date(2024, 3, 2), 'month')
+        self.assertEqual(buckets, [
+            (date(2024, 1, 30), date(2024, 1, 31)),
+            (date(2024, 2, 1), date(2024, 2, 29)),
+            (date(2024, 3, 1), date(2024, 3, 2)),
+        ])
+        # 2024-12-30 is the Monday of ISO week 2025-W01
+        self.assertEqual(period_start(date(2025, 1, 1), 'week'), date(2024, 12, 30))
+        self.assertEqual(len(calendar_buckets(date(2024, 12, 28), date(2025, 1, 12), 'week')), 3)
+
+    def test_cost_average_buckets_by_calendar_period(self):
+        self._log('2')
+        self._log('1', day=self.day - timedelta(days=7))
+        date_from = self.day - timedelta(days=13)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f'/api/analytics/foods/cost/?analysis_type=average&period=week'
+                f'&range=custom&date_from={date_from}&date_to={self.day}'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['num_periods'], len(data['buckets']))
+        self.assertEqual(data['total_cost'], 4.5)
+        costs = {bucket['period_start']: bucket['total_cost'] for bucket in data['buckets']}
+        self.assertEqual(costs[max(date_from, period_start(self.day, 'week')).isoformat()], 3.0)
+        self.assertEqual(sum(costs.values()), 4.5)
+        self.assertEqual(sum('GROUP BY' in q['sql'] for q in queries.captured_queries), 1)
+
+    def test_metadata_progress_by_month(self):
+        self._log('2')
+        self._log('1', day=self.day - timedelta(days=1))
+        response = self.client.get(
+            f'/api/analytics/foods/metadata-progress/?metadata_type=protein&period=month'
+            f'&range=custom&date_from={self.day - timedelta(days=1)}&date_to={self.day}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(sum(p['logged_days'] for p in data['points']), 2)
+        self.assertEqual(sum(p['total'] for p in data['points']), 30.0)
+        self.assertEqual(data['average'], 15.0)
+        response = self.client.get('/api/analytics/foods/metadata-progress/?period=fortnight')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class WorkoutDayRollupTest(APITestCase):
+    """Rollup rows track WorkoutLog create/delete through the API; backfill matches."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='wrollupuser', email='w@x.com', password='testpass123', timezone='UTC')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.workout = Workout.objects.create(user=self.user, workout_name='Squat', type='barbell')
+        self.day = date.today() - timedelta(days=2)
+
+    def _log(self, weight, reps, day=None, **extra):
+        response = self.client.post('/api/workouts/logs/', {
+            'workout': self.workout.workouts_id,
+            'weight': weight,
+            'reps': reps,
+            'date_time': datetime.combine(day or self.day, datetime.min.time()).isoformat() + 'Z',
+            **extra,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['data']['workout_log_id']
+
+    def test_create_and_delete_keep_rollup_current(self):
+        log_id = self._log('100', 5, rest_time=90, rir=2)
+        self._log('120', 3, rest_time=150, attributes=['belt'])
+        self._log(None, 12)
+        rollup = WorkoutDayRollup.objects.get(user=self.user, date=self.day, workout=self.workout)
+        self.assertEqual(rollup.set_count, 3)
+        self.assertEqual(rollup.attribute_set_count, 1)
+        self.assertEqual(rollup.total_reps, 20)
+        self.assertEqual(rollup.total_rir, 2)
+        self.assertEqual(rollup.weighted_set_count, 2)
+        self.assertEqual(rollup.weighted_reps, 8)
+        self.assertEqual(rollup.weight_sum, Decimal('220'))
+        self.assertEqual(rollup.max_weight, Decimal('120'))
+        self.assertEqual(rollup.avg_rest_time, Decimal('120'))
+        self.assertEqual(rollup.best_e1rm, Decimal('132.00'))
+
+        self.client.delete(f'/api/workouts/logs/{log_id}/')
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.set_count, 2)
+        self.assertEqual(rollup.weight_sum, Decimal('120'))
+        self.assertEqual(rollup.avg_rest_time, Decimal('150'))
+
+    def test_workout_delete_cascades_rollup(self):
+        self._log('100', 5)
+        self.client.delete(f'/api/workouts/{self.workout.workouts_id}/')
+        self.assertFalse(WorkoutDayRollup.objects.filter(user=self.user).exists())
+
+    def test_backfill_matches_incremental(self):
+        self._log('100', 5, attributes=['pause'])
+        self._log('110', 4, day=self.day - timedelta(days=1))
+        fields = ('date', 'set_count', 'attribute_set_count', 'weight_sum', 'max_weight', 'best_e1rm')
+        expected = list(WorkoutDayRollup.objects.filter(user=self.user).order_by('date').values(*fields))
+        WorkoutDayRollup.objects.all().delete()
+        self.assertEqual(backfill_workout_days(), 2)
+        actual = list(WorkoutDayRollup.objects.filter(user=self.user).order_by('date').values(*fields))
+        self.assertEqual(actual, expected)
+
+    def test_stats_and_heatmap_read_rollup(self):
+        self._log('100', 5)
+        self._log('100', 5)
+        stats = self.client.get('/api/workouts/stats/').data['data']
+        self.assertEqual(stats['total_sets'], 2)
+        self.assertEqual(stats['total_reps'], 10)
+        self.assertEqual(stats['total_weight_lifted'], 200)
+        response = self.client.get(f'/api/analytics/foods/workout-tracking-heatmap/?date_to={date.today().isoformat()}')
+        self.assertEqual(response.data['data']['heatmap'], {self.day.isoformat(): 2})
+
+
+class UserSeriesCacheTest(APITestCase):
+    """Cached daily series match the logs and are reloaded after writes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='seriesuser', email='s@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.day = date.today() - timedelta(days=3)
+        series_cache.clear()
+
+    def _at(self, day, hour):
+        return timezone.make_aware(datetime.combine(day, time(hour)))
+
+    def test_columns_hold_daily_values(self):
+        StepsLog.objects.create(user=self.user, steps=4000, date_time=self._at(self.day, 9))
+        StepsLog.objects.create(user=self.user, steps=2500, date_time=self._at(self.day, 18))
+        WeightLog.objects.create(user=self.user, weight=Decimal('80.5'), weight_unit='kg',
+                                 date_time=self._at(self.day + timedelta(days=2), 7))
+        SleepLog.objects.create(user=self.user, date_time=self.day,
+                                time_went_to_bed=time(23), time_got_out_of_bed=time(7))
+        FoodLog.objects.create(user=self.user, food=make_food(), servings=Decimal('1.5'),
+                               measurement='g', date_time=self._at(self.day, 12))
+
+        series = user_series(self.user)
+        self.assertEqual(series.start, self.day)
+        window = series.window('steps', self.day - timedelta(days=1), self.day + timedelta(days=3))
+        self.assertEqual(len(window), 5)
+        self.assertEqual(window[1], 6500)
+        self.assertTrue(all(v != v for v in (window[0], window[2], window[4])))
+        self.assertEqual(series.window('weight', self.day, self.day + timedelta(days=2))[2], 80.5)
+        self.assertEqual(series.window('sleep_minutes', self.day, self.day)[0], 480)
+        self.assertEqual(series.window('calories', self.day, self.day)[0], 300)
+
+    def test_cached_until_a_source_changes(self):
+        WaterLog.objects.create(user=self.user, amount=Decimal('500'), unit='ml', date_time=self._at(self.day, 9))
+        first = user_series(self.user)
+        with self.assertNumQueries(1):
+            self.assertIs(user_series(self.user), first)
+
+        WaterLog.objects.create(user=self.user, amount=Decimal('250'), unit='ml', date_time=self._at(self.day, 15))
+        second = user_series(self.user)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.window('water', self.day, self.day)[0], 750)
+
+    def test_stamp_change_from_another_process_reloads(self):
+        first = user_series(self.user)
+        # Another worker's write replaces the stamp without touching this process's cache
+        UserSeriesStamp.objects.filter(user=self.user).update(stamp='elsewhere')
+        self.assertIsNot(user_series(self.user), first)
+
+    def test_lru_evicts_past_memory_cap(self):
+        other = User.objects.create_user(username='seriesother', email='so@x.com', password='testpass123')
+        for user in (self.user, other):
+            StepsLog.objects.create(user=user, steps=1000, date_time=self._at(self.day, 9))
+        size = UserSeries.load(self.user.pk).nbytes
+        with override_settings(ANALYTICS_SERIES_CACHE_MAX_BYTES=size):
+            user_series(self.user)
+            user_series(other)
+        self.assertNotIn(self.user.pk, series_cache)
+        self.assertIn(other.pk, series_cache)
+        self.assertLessEqual(series_cache.nbytes, size)
+
+    def test_steps_cardio_distance_includes_date_to(self):
+        StepsLog.objects.create(user=self.user, steps=3000, date_time=self._at(self.day, 9))
+        StepsLog.objects.create(user=self.user, steps=5000, date_time=self._at(self.day + timedelta(days=1), 20))
+        response = self.client.get(
+            '/api/analytics/workouts/steps-cardio-distance/'
+            f'?date_from={self.day.isoformat()}&date_to={(self.day + timedelta(days=1)).isoformat()}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.data['data']['points']
+        self.assertEqual([p['steps'] for p in points], [3000, 5000])
+        self.assertEqual(response.data['data']['average_steps_per_day'], 4000)
+
+
+class DownsamplingTest(APITestCase):
+    """LTTB keeps the series shape; point endpoints honour max_points."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='sampleuser', email='ds@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_lttb_keeps_ends_and_peaks(self):
+        y = [0.0] * 100
+        y[37], y[71] = 50.0, -40.0
+        keep = list(lttb_indices(list(range(100)), y, 10))
+        self.assertEqual(len(keep), 10)
+        self.assertEqual((keep[0], keep[-1]), (0, 99))
+        self.assertIn(37, keep)
+        self.assertIn(71, keep)
+        self.assertEqual(keep, sorted(keep))
+
+    def test_groups_share_the_budget(self):
+        start = date(2025, 1, 1)
+        points = [
+            {'date': (start + timedelta(days=i)).isoformat(), 'progression': float(i % 7), 'has_attributes': i % 4 == 0}
+            for i in range(200)
+        ]
+        kept = downsample_points(points, 20, 'progression', group_key='has_attributes')
+        self.assertLessEqual(len(kept), 20)
+        self.assertEqual(sum(p['has_attributes'] for p in kept), 5)
+        self.assertEqual(kept, sorted(kept, key=lambda p: p['date']))
+
+    def test_attributes_analysis_max_points(self):
+        workout = Workout.objects.create(user=self.user, workout_name='Bench', type='barbell')
+        start = timezone.now() - timedelta(days=60)
+        WorkoutLog.objects.bulk_create([
+            WorkoutLog(user=self.user, workout=workout, weight=Decimal(60 + i % 9), reps=5,
+                       date_time=start + timedelta(hours=6 * i))
+            for i in range(120)
+        ])
+        response = self.client.get('/api/analytics/workouts/attributes-analysis/?max_points=25')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['original_point_count'], 120)
+        self.assertEqual(len(response.data['data']['points']), 25)
+
+        full = self.client.get('/api/analytics/workouts/attributes-analysis/')
+        self.assertEqual(len(full.data['data']['points']), 120)
+
+    def test_invalid_max_points(self):
+        response = self.client.get('/api/analytics/workouts/rest-time-analysis/?max_points=2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+
+class RestTimeAnalysisTest(APITestCase):
+    """Rest-time pairs come from LAG() over each workout's sets per day."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='restuser', email='rt@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.squat = Workout.objects.create(user=self.user, workout_name='Squat', type='barbell')
+        self.bench = Workout.objects.create(user=self.user, workout_name='Bench', type='barbell')
+        self.day = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) - timedelta(days=2)
+
+    def _set(self, workout, minutes, weight, rest_time, day_offset=0):
+        WorkoutLog.objects.create(
+            user=self.user, workout=workout, weight=Decimal(weight), reps=5, rest_time=rest_time,
+            date_time=self.day + timedelta(days=day_offset, minutes=minutes),
+        )
+
+    def _get(self, query=''):
+        date_from = (self.day - timedelta(days=1)).date().isoformat()
+        date_to = (self.day + timedelta(days=2)).date().isoformat()
+        return self.client.get(
+            f'/api/analytics/workouts/rest-time-analysis/?date_from={date_from}&date_to={date_to}{query}'
+        )
+
+    def test_pairs_stay_within_workout_and_day(self):
+        self._set(self.squat, 0, '100', 90)
+        self._set(self.bench, 2, '60', 60)
+        self._set(self.squat, 4, '105', 120)
+        self._set(self.bench, 6, '57.5', 60)
+        self._set(self.squat, 0, '110', 100, day_offset=1)
+        response = self._get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.data['data']['points']
+        self.assertEqual(
+            [(p['previous_weight'], p['current_weight'], p['rest_time']) for p in points],
+            [(100.0, 105.0, 120), (60.0, 57.5, 60)],
+        )
+        self.assertEqual(points[1]['weight_change'], -2.5)
+
+    def test_buckets_report_mean_and_median(self):
+        for minutes, weight, rest in ((0, '100', 60), (3, '102.5', 65), (6, '110', 70), (9, '100', 80), (12, '95', 150)):
+            self._set(self.squat, minutes, weight, rest)
+        response = self._get('&mode=buckets&bucket_size=60')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['pair_count'], 4)
+        self.assertEqual(data['buckets'], [
+            {'rest_time_from': 60, 'rest_time_to': 120, 'count': 3,
+             'mean_weight_change': 0.0, 'median_weight_change': 2.5},
+            {'rest_time_from': 120, 'rest_time_to': 180, 'count': 1,
+             'mean_weight_change': -5.0, 'median_weight_change': -5.0},
+        ])
+
+    def test_invalid_mode(self):
+        self.assertEqual(self._get('&mode=raw').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CorrelationsTest(APITestCase):
+    """Pairwise-complete correlation matrices and the correlations endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='corruser', email='c@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_matches_corrcoef_on_complete_data(self):
+        values = np.random.default_rng(7).normal(size=(60, 4))
+        r, n = correlation_matrix(values)
+        np.testing.assert_allclose(r, np.corrcoef(values, rowvar=False), atol=1e-9)
+        self.assertTrue((n == 60).all())
+
+    def test_missing_days_and_lag(self):
+        x = np.arange(20, dtype=float)
+        y = np.roll(x, 2) * 3  # y on day t + 2 is 3 * x on day t
+        x[[4, 9]] = np.nan
+        r, n = correlation_matrix(np.column_stack([x, y]), lag=2)
+        self.assertAlmostEqual(r[0, 1], 1.0)
+        self.assertEqual(n[0, 1], 16)
+        constant = np.column_stack([x, np.ones(20)])
+        self.assertTrue(np.isnan(correlation_matrix(constant)[0][0, 1]))
+
+    def test_average_ranks_share_ties(self):
+        ranks = average_ranks(np.array([[10.0], [np.nan], [5.0], [10.0]]))
+        self.assertEqual(ranks[[0, 2, 3], 0].tolist(), [2.5, 1.0, 2.5])
+        self.assertTrue(np.isnan(ranks[1, 0]))
+
+    def test_endpoint_correlates_logged_metrics(self):
+        start = date.today() - timedelta(days=20)
+        for offset in range(14):
+            day = start + timedelta(days=offset)
+            at = timezone.make_aware(datetime.combine(day, time(12)))
+            StepsLog.objects.create(user=self.user, steps=1000 * (offset + 1), date_time=at)
+            WaterLog.objects.create(user=self.user, amount=Decimal(2000 - 100 * offset), unit='ml', date_time=at)
+        response = self.client.get('/api/analytics/correlations/?range=1month&method=spearman&max_lag=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['metrics'], ['steps', 'water'])
+        self.assertEqual([m['lag'] for m in data['matrices']], [0, 1])
+        lag0 = data['matrices'][0]
+        self.assertEqual(lag0['r'][0][1], -1.0)
+        self.assertEqual(lag0['n'][0][1], 14)
+        self.assertEqual(data['matrices'][1]['n'][0][1], 13)
+
+    def test_rejects_bad_parameters(self):
+        for query in ('max_lag=8', 'method=kendall', 'metrics=steps,bogus'):
+            response = self.client.get(f'/api/analytics/correlations/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class MetricRegistryTest(APITestCase):
+    """Registry-driven metric loading and the generic series endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='metricuser', email='m@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.day = date.today() - timedelta(days=3)
+        at = timezone.make_aware(datetime.combine(self.day, time(9)))
+        StepsLog.objects.create(user=self.user, steps=4000, date_time=at)
+        StepsLog.objects.create(user=self.user, steps=1500, date_time=at + timedelta(hours=6))
+        WeightLog.objects.create(user=self.user, weight=Decimal('180.0'), weight_unit='lbs', date_time=at)
+        WeightLog.objects.create(user=self.user, weight=Decimal('179.5'), weight_unit='lbs', date_time=at + timedelta(hours=2))
+
+    def test_loads_one_query_per_source(self):
+        keys = ['steps__total_steps', 'weight__weight', 'food__total_protein', 'food__total_cost']
+        with CaptureQueriesContext(connection) as queries:
+            loaded = load_metric_days(
+                self.user.pk, keys, self.day - timedelta(days=1), self.day, zone=user_timezone(self.user)
+            )
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(loaded['steps__total_steps'], {self.day: 5500})
+        self.assertEqual(loaded['weight__weight'], {self.day: Decimal('179.5')})
+        self.assertEqual(loaded['food__total_protein'], {})
+
+    def test_series_endpoint(self):
+        response = self.client.get(
+            f'/api/analytics/series/?metrics=steps__total_steps,weight__weight'
+            f'&range=custom&date_from={self.day - timedelta(days=1)}&date_to={self.day}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual([m['key'] for m in data['metrics']], ['steps__total_steps', 'weight__weight'])
+        self.assertEqual(data['points'], [
+            {'date': (self.day - timedelta(days=1)).isoformat(), 'steps__total_steps': 0, 'weight__weight': None},
+            {'date': self.day.isoformat(), 'steps__total_steps': 5500, 'weight__weight': 179.5},
+        ])
+
+    def test_series_rejects_unknown_metrics(self):
+        for query in ('', 'metrics=steps__total_steps,bogus'):
+            response = self.client.get(f'/api/analytics/series/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class RollingStatisticsTest(APITestCase):
+    """Prefix-sum rolling windows, gap policies and the rolling endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rolluser', email='r@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_trailing_sums_match_naive_windows(self):
+        values = np.random.default_rng(3).normal(size=50)
+        values[[2, 17, 18, 40]] = np.nan
+        sums, counts = rolling.trailing_sums(values, 7)
+        for t in range(len(values)):
+            window = values[max(0, t - 6):t + 1]
+            self.assertAlmostEqual(sums[t], np.nansum(window))
+            self.assertEqual(counts[t], np.count_nonzero(~np.isnan(window)))
+
+    def test_gap_policies(self):
+        values = np.array([np.nan, 2.0, np.nan, np.nan, 6.0])
+        self.assertEqual(rolling.fill_gaps(values, 'zero').tolist(), [0.0, 2.0, 0.0, 0.0, 6.0])
+        carried = rolling.fill_gaps(values, 'carry')
+        self.assertTrue(np.isnan(carried[0]))
+        self.assertEqual(carried[1:].tolist(), [2.0, 2.0, 2.0, 6.0])
+        skip = rolling.rolling_stats(values, windows=(3,), policy='skip')
+        self.assertEqual(skip['avg_3'][4], 6.0)
+        zero = rolling.rolling_stats(values, windows=(3,), policy='zero')
+        self.assertEqual(zero['avg_3'][4], 2.0)
+
+    def test_week_over_week(self):
+        stats = rolling.rolling_stats(np.arange(21, dtype=float), windows=(7,))
+        self.assertTrue(np.isnan(stats['week_over_week'][6]))
+        self.assertEqual(stats['week_over_week'][13:].tolist(), [7.0] * 8)
+
+    def test_endpoint_uses_history_before_range(self):
+        today = date.today()
+        for offset in range(10):
+            at = timezone.make_aware(datetime.combine(today - timedelta(days=offset), time(12)))
+            StepsLog.objects.create(user=self.user, steps=1000, date_time=at)
+        date_from = today - timedelta(days=1)
+        response = self.client.get(
+            f'/api/analytics/rolling/?metrics=steps&windows=7&gaps=zero'
+            f'&range=custom&date_from={date_from}&date_to={today}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.data['data']['series']
+        self.assertEqual([s['metric'] for s in series], ['steps'])
+        first = series[0]['points'][0]
+        self.assertEqual(first['date'], date_from.isoformat())
+        self.assertEqual(first['sum_7'], 7000.0)
+        self.assertEqual(first['avg_7'], 1000.0)
+        # Only two days logged in the week before: 2000 / 7 against 1000
+        self.assertAlmostEqual(first['week_over_week'], 1000 - 2000 / 7, places=3)
+
+    def test_rejects_bad_parameters(self):
+        for query in ('gaps=interpolate', 'windows=0', 'windows=7,abc', 'metrics=steps,bogus'):
+            response = self.client.get(f'/api/analytics/rolling/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class LocalDayBucketingTest(APITestCase):
+    """Logs bucket into the owner's local calendar days, in filters, rollups and series alike."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tzuser', email='tz@x.com', password='testpass123', timezone='America/Los_Angeles'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.food = make_food(food_name='Late Food', created_by=self.user)
+        self.day = date.today() - timedelta(days=5)
+        # 21:00 in Los Angeles is already the next day in UTC
+        self.at = datetime.combine(self.day, time(21), tzinfo=zone_named('America/Los_Angeles'))
+        FoodLog.objects.create(
+            user=self.user, food=self.food, servings=Decimal('1'), measurement='g', date_time=self.at,
+        )
+
+    def test_helpers(self):
+        zone = zone_named('America/Los_Angeles')
+        self.assertEqual(local_date(self.at, zone), self.day)
+        self.assertEqual(local_date(self.at, zone_named('UTC')), self.day + timedelta(days=1))
+        self.assertEqual(zone_named('Not/AZone'), zone_named('America/New_York'))
+        # DST starts 2030-03-10 in the US: a 23-hour day
+        start, end = day_bounds(date(2030, 3, 10), zone)
+        self.assertEqual(end.timestamp() - start.timestamp(), 23 * 3600)
+        bounds = day_range('date_time', zone, self.day, self.day)
+        self.assertEqual(set(bounds), {'date_time__gte', 'date_time__lt'})
+        self.assertEqual(FoodLog.objects.filter(user=self.user, **bounds).count(), 1)
+
+    def test_rollup_and_series_use_local_day(self):
+        self.assertEqual(DailyNutritionRollup.objects.get(user=self.user).date, self.day)
+        loaded = load_metric_days(self.user.pk, ['food__total_calories'])
+        self.assertEqual(list(loaded['food__total_calories']), [self.day])
+
+    def test_cost_vs_metadata_groups_by_local_day(self):
+        Food.objects.filter(pk=self.food.pk).update(cost=Decimal('2.50'))
+        response = self.client.get('/api/analytics/foods/cost/', {
+            'analysis_type': 'cost_vs_metadata', 'range': 'custom',
+            'date_from': self.day.isoformat(), 'date_to': self.day.isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.data['data']['points']
+        self.assertEqual([(p['date'], p['cost']) for p in points], [(self.day.isoformat(), 2.5)])
+
+    def test_timezone_change_rebuckets_rollups(self):
+        response = self.client.put('/api/users/profile/', {'timezone': 'UTC'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(DailyNutritionRollup.objects.filter(user=self.user).values_list('date', flat=True)),
+            [self.day + timedelta(days=1)],
+        )
+
+
+class DistributionTest(APITestCase):
+    """Histograms and percentiles from distributions.py and /api/analytics/distribution/."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='distuser', email='d@x.com', password='testpass123', timezone='UTC'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.workout = Workout.objects.create(user=self.user, workout_name='Bench', type='barbell')
+        self.day = date.today() - timedelta(days=3)
+
+    def test_distribution(self):
+        result = distribution(list(range(1, 11)) + [None], bins=3)
+        self.assertEqual(result['count'], 10)
+        self.assertEqual(result['counts'], [3, 3, 4])
+        self.assertEqual(result['bin_edges'], [1.0, 4.0, 7.0, 10.0])
+        self.assertEqual(result['percentiles'], {'p10': 1.9, 'p50': 5.5, 'p90': 9.1})
+        self.assertEqual(result['mean'], 5.5)
+        empty = distribution([], bins=3)
+        self.assertEqual((empty['count'], empty['counts'], empty['percentiles']['p50']), (0, [], None))
+
+    def test_set_weight_reads_one_workout(self):
+        at = timezone.make_aware(datetime.combine(self.day, time(18)))
+        for weight in (100, 120, 140):
+            WorkoutLog.objects.create(user=self.user, workout=self.workout, weight=Decimal(weight),
+                                      reps=5, rest_time=90, date_time=at)
+        other = Workout.objects.create(user=self.user, workout_name='Row', type='barbell')
+        WorkoutLog.objects.create(user=self.user, workout=other, weight=Decimal('500'), reps=5, date_time=at)
+        response = self.client.get(
+            f'/api/analytics/distribution/?metric=set_weight&workout_id={self.workout.pk}&bins=2'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual((data['count'], data['max'], data['counts']), (3, 140.0, [1, 2]))
+        self.assertEqual(data['percentiles']['p50'], 120.0)
+
+    def test_meal_time_uses_local_hour(self):
+        food = make_food(food_name='Dist Food', created_by=self.user)
+        at = timezone.make_aware(datetime.combine(self.day, time(12, 30)))
+        FoodLog.objects.create(user=self.user, food=food, servings=Decimal('1'), measurement='g', date_time=at)
+        data = self.client.get('/api/analytics/distribution/?metric=meal_time').data['data']
+        self.assertEqual((data['count'], data['min']), (1, 12.5))
+
+    def test_rejects_bad_parameters(self):
+        for query in ('metric=bogus', 'metric=steps&bins=0', 'metric=steps&bins=x', 'metric=set_weight'):
+            response = self.client.get(f'/api/analytics/distribution/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class WeightTrendTest(APITestCase):
+    """Holt's weight trend state: O(1) appends, rebuilds on history edits, and the forecast."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='trenduser', email='tr@x.com', password='testpass123', timezone='UTC'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.start = timezone.now() - timedelta(days=30)
+
+    def _weigh(self, day, kg, unit='kg'):
+        return WeightLog.objects.create(
+            user=self.user, weight=Decimal(str(kg)), weight_unit=unit,
+            date_time=self.start + timedelta(days=day),
+        )
+
+    def _state(self):
+        trend = WeightTrend.objects.get(user=self.user)
+        return trend.level, trend.slope, trend.weigh_in_count
+
+    def test_appends_match_rebuild(self):
+        for day in range(0, 28, 2):
+            self._weigh(day, 90 - day * 0.1)
+        self._weigh(28, 197.5, unit='lbs')
+        incremental = self._state()
+        weight_trend.rebuild_weight_trend(self.user.pk)
+        for value, expected in zip(self._state(), incremental):
+            self.assertAlmostEqual(value, expected, places=9)
+        level, slope, count = incremental
+        self.assertEqual(count, 15)
+        self.assertLess(slope, 0)
+        self.assertAlmostEqual(level, 88.2, delta=1.0)
+
+    def test_history_edits_rebuild(self):
+        self._weigh(0, 90)
+        latest = self._weigh(10, 88)
+        self._weigh(5, 95)  # back-dated
+        self.assertEqual(self._state()[2], 3)
+        backdated = self._state()
+        latest.weight = Decimal('80')
+        latest.save()
+        self.assertNotEqual(self._state(), backdated)
+        latest.delete()
+        self.assertEqual(self._state()[2], 2)
+        WeightLog.objects.filter(user=self.user).delete()
+        self.assertFalse(WeightTrend.objects.filter(user=self.user).exists())
+
+    def test_backfill_matches_incremental(self):
+        for day in range(10):
+            self._weigh(day * 3, 80 + day % 3)
+        incremental = self._state()
+        WeightTrend.objects.all().delete()
+        self.assertEqual(weight_trend.backfill_weight_trends(), 1)
+        for value, expected in zip(self._state(), incremental):
+            self.assertAlmostEqual(value, expected, places=9)
+
+    def test_forecast_projects_goal_date(self):
+        for day in range(0, 30, 2):
+            self._weigh(day, 90 - day * 0.1)  # -0.7 kg a week
+        UserGoal.objects.create(user=self.user, weight_goal=Decimal('80'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/analytics/health/weight-forecast/?horizon=28')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('weight_log', ' '.join(q['sql'] for q in queries.captured_queries))
+        data = response.data['data']
+        self.assertEqual(data['goal_status'], 'on_track')
+        self.assertLess(data['trend']['weekly_change'], 0)
+        self.assertEqual(len(data['projection']), 4)
+        self.assertGreater(data['days_to_goal'], 0)
+        self.assertEqual(
+            data['goal_date'], (date.today() + timedelta(days=data['days_to_goal'])).isoformat()
+        )
+
+    def test_forecast_without_data(self):
+        data = self.client.get('/api/analytics/health/weight-forecast/').data['data']
+        self.assertEqual((data['goal_status'], data['trend'], data['projection']), ('no_data', None, []))
+        response = self.client.get('/api/analytics/health/weight-forecast/?horizon=0')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MuscleFatigueTest(APITestCase):
+    """Per-muscle fatigue follows WorkoutLog writes exactly and the recovery map reads it."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='fatigueuser', email='fa@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.chest = Muscle.objects.create(muscle_name='Fatigue Chest', muscle_group='Chest')
+        self.triceps = Muscle.objects.create(muscle_name='Fatigue Triceps', muscle_group='Arms')
+        self.bench = Workout.objects.create(user=self.user, workout_name='Bench', type='barbell')
+        WorkoutMuscle.objects.create(workout=self.bench, muscle=self.chest, activation_rating=100)
+        WorkoutMuscle.objects.create(workout=self.bench, muscle=self.triceps, activation_rating=50)
+        self.now = timezone.now()
+
+    def _set(self, hours_ago, workout=None):
+        return WorkoutLog.objects.create(
+            user=self.user, workout=workout or self.bench, weight=Decimal('100'), reps=5,
+            date_time=self.now - timedelta(hours=hours_ago),
+        )
+
+    def _fatigue(self, muscle):
+        row = MuscleFatigue.objects.get(user=self.user, muscle=muscle)
+        return muscle_fatigue.fatigue_at(row, self.now)
+
+    def test_sets_accumulate_and_decay(self):
+        self._set(48)
+        self._set(0)
+        # One set a half-life ago counts half
+        self.assertAlmostEqual(self._fatigue(self.chest), 1.5)
+        self.assertAlmostEqual(self._fatigue(self.triceps), 0.75)
+
+    def test_backdated_edit_and_delete_are_exact(self):
+        latest = self._set(0)
+        backdated = self._set(96)
+        self.assertAlmostEqual(self._fatigue(self.chest), 1.25)
+        backdated.date_time = self.now - timedelta(hours=48)
+        backdated.save()
+        self.assertAlmostEqual(self._fatigue(self.chest), 1.5)
+        latest.delete()
+        self.assertAlmostEqual(self._fatigue(self.chest), 0.5)
+
+    def test_rating_change_rebuilds(self):
+        self._set(0)
+        WorkoutMuscle.objects.filter(muscle=self.triceps).update(activation_rating=80)
+        self.assertEqual(muscle_fatigue.rebuild_muscle_fatigue([self.user.pk]), 2)
+        self.assertAlmostEqual(self._fatigue(self.triceps), 0.8)
+        WorkoutMuscle.objects.get(muscle=self.chest).delete()
+        self.assertFalse(MuscleFatigue.objects.filter(muscle=self.chest).exists())
+
+    def test_recovery_map(self):
+        for hours in (0, 0, 0, 0):
+            self._set(hours)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/analytics/workouts/recovery-map/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('workout_log', ' '.join(q['sql'] for q in queries.captured_queries))
+        by_name = {m['muscle_name']: m for m in response.data['data']['muscles']}
+        self.assertAlmostEqual(by_name['Fatigue Chest']['readiness'], 60.0, delta=0.1)
+        self.assertAlmostEqual(by_name['Fatigue Triceps']['readiness'], 80.0, delta=0.1)
+
+
+class TrackerStreakTest(APITestCase):
+    """Stored streak counters follow log writes; streak endpoints read them."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='streakuser', email='st@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.zone = user_timezone(self.user)
+        self.today = timezone.now().astimezone(self.zone).date()
+
+    def _water(self, days_ago):
+        at = datetime.combine(self.today - timedelta(days=days_ago), time(12), tzinfo=self.zone)
+        return WaterLog.objects.create(user=self.user, amount=Decimal('500'), unit='ml', date_time=at)
+
+    def _state(self, tracker='water'):
+        state = TrackerStreak.objects.get(user=self.user, tracker=tracker)
+        return state.current, state.longest
+
+    def test_appends_extend_and_restart_runs(self):
+        for days_ago in (6, 5, 4):
+            self._water(days_ago)
+        self.assertEqual(self._state(), (3, 3))
+        self._water(4)  # same day again
+        self._water(1)
+        self._water(0)
+        self.assertEqual(self._state(), (2, 3))
+        response = self.client.get('/api/logging/water/streak/')
+        self.assertEqual(response.data, {'streak': 2, 'longest': 3})
+
+    def test_future_log_keeps_todays_streak_and_cap(self):
+        for days_ago in (2, 1, 0, -3):
+            self._water(days_ago)
+        response = self.client.get('/api/logging/water/streak/')
+        self.assertEqual(response.data, {'streak': 3, 'longest': 3})
+        state = TrackerStreak.objects.get(user=self.user, tracker='water')
+        state.run_start, state.last_date = self.today - timedelta(days=500), self.today
+        self.assertEqual(current_streak(state, self.today), MAX_STREAK_DAYS)
+
+    def test_backdated_log_and_delete_recompute(self):
+        for days_ago in (5, 4, 2, 1, 0):
+            self._water(days_ago)
+        gap = self._water(3)
+        self.assertEqual(self._state(), (6, 6))
+        gap.delete()
+        self.assertEqual(self._state(), (3, 3))
+        moved = WaterLog.objects.filter(user=self.user).order_by('date_time').first()
+        moved.date_time += timedelta(days=2)  # fills the gap again
+        moved.save()
+        self.assertEqual(self._state(), (5, 5))
+
+    def test_all_streaks_read_stored_rows(self):
+        self._water(0)
+        SleepLog.objects.create(user=self.user, date_time=self.today, time_went_to_bed=time(23),
+                                time_got_out_of_bed=time(7))
+        self.client.get('/api/logging/streaks/')  # creates rows for trackers never logged
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/logging/streaks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['water'], 1)
+        self.assertEqual(response.data['sleep'], 1)
+        self.assertEqual(response.data['weight'], 0)
+        streak_queries = [q for q in queries.captured_queries if 'tracker_streak' in q['sql']]
+        self.assertEqual(len(streak_queries), 1)
+
+
+class ActivityBitmapTest(APITestCase):
+    """Per-year day bitmaps follow log writes and answer presence, range and streak queries."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bitmapuser', email='bm@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.zone = user_timezone(self.user)
+        self.today = timezone.now().astimezone(self.zone).date()
+
+    def _water(self, day, hour=12):
+        at = datetime.combine(day, time(hour), tzinfo=self.zone)
+        return WaterLog.objects.create(user=self.user, amount=Decimal('500'), unit='ml', date_time=at)
+
+    def _bits(self, tracker='water'):
+        return {
+            row.year: bytes(row.bits)
+            for row in ActivityBitmap.objects.filter(user=self.user, tracker=tracker)
+        }
+
+    def test_bits_follow_log_writes(self):
+        day = self.today - timedelta(days=3)
+        first, second = self._water(day, 8), self._water(day, 20)
+        self.assertTrue(activity_bitmaps.logged_on(self.user.pk, 'water', day))
+        self.assertFalse(activity_bitmaps.logged_on(self.user.pk, 'water', day - timedelta(days=1)))
+        self.assertEqual(len(self._bits()[day.year]), activity_bitmaps.BYTES_PER_YEAR)
+        first.delete()  # the day still has a log
+        self.assertTrue(activity_bitmaps.logged_on(self.user.pk, 'water', day))
+        second.date_time += timedelta(days=1)
+        second.save()
+        self.assertFalse(activity_bitmaps.logged_on(self.user.pk, 'water', day))
+        self.assertTrue(activity_bitmaps.logged_on(self.user.pk, 'water', day + timedelta(days=1)))
+        second.delete()
+        self.assertEqual(activity_bitmaps.days_logged(self.user.pk, 'water', day, self.today), 0)
+
+    def test_range_and_streak_across_years(self):
+        days = [date(2023, 12, 30), date(2023, 12, 31), date(2024, 1, 1), date(2024, 1, 2), date(2024, 3, 1)]
+        for day in days:
+            activity_bitmaps.mark_day(self.user.pk, 'steps', day)
+        self.assertEqual(activity_bitmaps.days_logged(self.user.pk, 'steps', date(2023, 12, 31), date(2024, 3, 1)), 4)
+        self.assertEqual(activity_bitmaps.logged_dates(self.user.pk, 'steps', date(2023, 1, 1), date(2024, 12, 31)), days)
+        self.assertEqual(activity_bitmaps.streak_length(self.user.pk, 'steps', date(2024, 1, 2)), 4)
+        self.assertEqual(activity_bitmaps.streak_length(self.user.pk, 'steps', date(2024, 3, 1)), 1)
+        self.assertEqual(activity_bitmaps.streak_length(self.user.pk, 'steps', date(2024, 1, 3)), 0)
+        # Leap day sits at bit 59 of 2024
+        activity_bitmaps.mark_day(self.user.pk, 'steps', date(2024, 2, 29))
+        self.assertEqual(activity_bitmaps.streak_length(self.user.pk, 'steps', date(2024, 3, 1)), 2)
+
+    def test_rebuild_matches_signal_updates(self):
+        for days_ago in (400, 10, 9, 0):
+            self._water(self.today - timedelta(days=days_ago))
+        SleepLog.objects.create(user=self.user, date_time=self.today, time_went_to_bed=time(23),
+                                time_got_out_of_bed=time(7))
+        workout = Workout.objects.create(user=self.user, workout_name='Squat', type='barbell')
+        WorkoutLog.objects.create(user=self.user, workout=workout, weight=Decimal('100'), reps=5,
+                                  date_time=datetime.combine(self.today, time(18), tzinfo=self.zone))
+        expected = {tracker: self._bits(tracker) for tracker in ('water', 'sleep', 'workout')}
+        ActivityBitmap.objects.all().delete()
+        activity_bitmaps.rebuild_activity_bitmaps([self.user.pk])
+        self.assertEqual({tracker: self._bits(tracker) for tracker in expected}, expected)
+        workout.delete()
+        self.assertEqual(self._bits('workout'), {})
+
+    def test_home_trackers_and_heatmap_read_bitmaps(self):
+        self._water(self.today)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/analytics/home/dashboard/')
+        missing = {t['id'] for t in response.data['data']['trackers_not_logged']}
+        self.assertNotIn('water', missing)
+        self.assertIn('steps', missing)
+        sql = [q['sql'] for q in queries.captured_queries]
+        self.assertFalse([q for q in sql if 'water_log' in q])
+        self.assertEqual(len([q for q in sql if 'activity_bitmap' in q]), 1)
+
+        workout = Workout.objects.create(user=self.user, workout_name='Row', type='machine')
+        for days_ago in (2, 2, 1):
+            WorkoutLog.objects.create(user=self.user, workout=workout, weight=Decimal('50'), reps=8,
+                                      date_time=datetime.combine(self.today - timedelta(days=days_ago), time(18), tzinfo=self.zone))
+        response = self.client.get(f'/api/analytics/foods/workout-tracking-heatmap/?date_to={self.today.isoformat()}')
+        self.assertEqual(response.data['data']['days_tracked'], 2)
+        self.assertEqual(sum(response.data['data']['heatmap'].values()), 3)
@@ -16,6 +16,7 @@ urlpatterns = [
     path('workouts/attributes-analysis/', views.workout_attributes_analysis, name='workout_attributes_analysis'),
     path('workouts/steps-cardio-distance/', views.steps_cardio_distance, name='steps_cardio_distance'),
     path('workouts/activation-progress/', views.activation_progress, name='activation_progress'),
+    path('workouts/recovery-map/', views.muscle_recovery_map, name='muscle_recovery_map'),
     
     # Food Analytics
     path('foods/metadata-progress/', views.food_metadata_progress, name='food_metadata_progress'),
@@ -28,5 +29,12 @@ urlpatterns = [
     
     # Health Analytics
     path('health/weight-progression/', views.weight_progression, name='weight_progression'),
+    path('health/weight-forecast/', views.weight_forecast, name='weight_forecast'),
     path('health/metrics-radial/', views.health_metrics_radial, name='health_metrics_radial'),
+    
+    # Cross-tracker Analytics
+    path('correlations/', views.correlations, name='analytics_correlations'),
+    path('series/', views.metric_series, name='analytics_series'),
+    path('rolling/', views.rolling_statistics, name='analytics_rolling'),
+    path('distribution/', views.value_distribution, name='analytics_distribution'),
 ]
@@ -6,23 +6,40 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q, Count, Sum, Avg, Max, Min, F, DecimalField, Value
-from django.db.models.functions import TruncDate, ExtractHour, Extract, Coalesce
+from django.db.models import Q, Count, Sum, Avg, Max, Min, F, DecimalField, Window
+from django.db.models.functions import ExtractHour, ExtractMinute, Extract, Lag
 from django.utils import timezone
-from datetime import datetime, timedelta, date, time
+from datetime import datetime, timedelta, date
 from decimal import Decimal
-from zoneinfo import ZoneInfo
 import json
 
-from apps.logging.models import (
-    FoodLog, WeightLog, BodyMeasurementLog, WaterLog, StepsLog, CardioLog
-)
-from apps.health.models import SleepLog, HealthMetricsLog
-from apps.workouts.models import (
-    Workout, WorkoutLog, Split, SplitDay, SplitDayTarget,
-)
+import numpy as np
+
+from apps.logging.models import FoodLog, BodyMeasurementLog
+from apps.health.models import HealthMetricsLog
+from apps.workouts.models import Muscle, Workout, WorkoutLog
+from apps.workouts.split_calendar import SplitCalendar, activation_by_day
 from apps.foods.models import Food
 from apps.users.models import UserGoal
+from apps.users.timezones import LocalDate, day_bounds, day_range, local_date, local_today, user_timezone
+from .activity_bitmaps import days_logged
+from .correlations import (
+    CORRELATION_METHODS, MAX_LAG_DAYS, MIN_PAIRED_DAYS, correlations as compute_correlations,
+)
+from .distributions import DEFAULT_BINS, MAX_BINS, distribution
+from .downsampling import downsample_points, with_max_points
+from .goal_timeline import GoalTimeline
+from .home_snapshots import home_dashboard_payload, home_dashboard_today_date, latest_user_goal
+from .metrics import METRIC_REGISTRY, NUTRIENT_METRICS, load_metric_days
+from .muscle_fatigue import FATIGUED_SETS, HALF_LIFE_HOURS, fatigue_at, readiness
+from .models import MuscleFatigue, WeightTrend, WorkoutDayRollup
+from .rolling import DEFAULT_WINDOWS, GAP_POLICIES, MAX_WINDOW_DAYS, WEEK_DAYS, rolling_stats
+from .rollups import (
+    CALENDAR_PERIODS, NUTRIENT_VECTOR_INDEX, calendar_buckets, period_start, rollup_calendar_totals,
+    rollup_nutrient_vector,
+)
+from .series_cache import SERIES_COLUMNS, user_series
+from .weight_trend import STABLE_KG_PER_WEEK, projected_weight
 
 
 def parse_analytics_date_range(request, default_preset='2weeks'):
@@ -32,7 +49,7 @@ def parse_analytics_date_range(request, default_preset='2weeks'):
     For custom, date_from and date_to must be provided (or use first_date/today from caller).
     Returns (date_from, date_to) as date objects.
     """
-    today = timezone.now().date()
+    today = local_today(request.user)
     preset = request.GET.get('range', default_preset).lower()
     date_from_param = request.GET.get('date_from')
     date_to_param = request.GET.get('date_to')
@@ -61,6 +78,14 @@ def parse_analytics_date_range(request, default_preset='2weeks'):
     return (date_from, today)
 
 
+def _point_series(points, max_points, value_key, group_key=None):
+    """Response fields for a chart's points, downsampled to max_points (see downsampling.py)."""
+    return {
+        'original_point_count': len(points),
+        'points': downsample_points(points, max_points, value_key, group_key=group_key),
+    }
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def analytics_date_bounds(request):
@@ -69,7 +94,7 @@ def analytics_date_bounds(request):
     Used to default custom date range: first_date to today.
     """
     section = request.GET.get('section', 'workouts')
-    today = timezone.now().date()
+    today = local_today(request.user)
 
     if section == 'workouts':
         first = WorkoutLog.objects.filter(user=request.user).order_by('date_time').values_list('date_time', flat=True).first()
@@ -78,7 +103,7 @@ def analytics_date_bounds(request):
     else:
         return Response({'success': False, 'error': {'message': 'section must be workouts or foods'}}, status=status.HTTP_400_BAD_REQUEST)
 
-    first_date = first.date() if first else today
+    first_date = local_date(first, user_timezone(request.user)) if first else today
     return Response({
         'success': True,
         'data': {
@@ -90,7 +115,8 @@ def analytics_date_bounds(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def body_measurement_progression(request):
+@with_max_points
+def body_measurement_progression(request, max_points):
     """
     Body Measurement Progression Chart
     - Selectable body measurement dropdown
@@ -110,7 +136,7 @@ def body_measurement_progression(request):
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now().date()
+        date_to = local_today(request.user)
     else:
         date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
@@ -122,8 +148,7 @@ def body_measurement_progression(request):
     # Query body measurements with filtering
     measurements = BodyMeasurementLog.objects.filter(
         user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to,
+        **day_range('date_time', user_timezone(request.user), date_from, date_to),
         **{f'{measurement_type}__isnull': False}
     ).order_by('date_time')
     
@@ -143,99 +168,23 @@ def body_measurement_progression(request):
             'measurement_type': measurement_type,
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
-            'points': data
+            **_point_series(data, max_points, 'value')
         }
     })
 
 
-def _get_workout_progression_metric_value(user, metric_key, metric_date):
-    """Return a single metric value for a given date for comparison with workout progression."""
-    parts = metric_key.split('__')
-    if len(parts) != 2:
-        return None
-    source, field = parts[0], parts[1]
-
-    if source == 'cardio':
-        agg = CardioLog.objects.filter(user=user, date_time__date=metric_date).aggregate(
-            calories=Sum('calories_burned'),
-            duration=Sum('duration')
-        )
-        if field == 'calories_burned':
-            return int(agg['calories'] or 0)
-        if field == 'duration':
-            return float(agg['duration'] or 0)
-        return None
-
-    if source == 'food':
-        food_agg_fields = {
-            'total_calories': F('food__calories') * F('servings'),
-            'total_carbohydrates': F('food__carbohydrates') * F('servings'),
-            'total_sugar': F('food__sugar') * F('servings'),
-            'total_fat': F('food__fat') * F('servings'),
-            'total_protein': F('food__protein') * F('servings'),
-            'total_sodium': F('food__sodium') * F('servings'),
-        }
-        if field not in food_agg_fields:
-            return None
-        agg = FoodLog.objects.filter(user=user, date_time__date=metric_date).aggregate(
-            total=Sum(food_agg_fields[field], output_field=DecimalField(max_digits=12, decimal_places=2))
-        )
-        return round(float(agg['total'] or 0), 2)
-
-    if source == 'health':
-        health = HealthMetricsLog.objects.filter(user=user, date_time=metric_date).first()
-        if not health:
-            return None
-        return getattr(health, field, None)
-
-    if source == 'sleep':
-        sleep = SleepLog.objects.filter(user=user, date_time=metric_date).first()
-        if not sleep:
-            return None
-        if field == 'total_sleep_time':
-            if sleep.time_got_out_of_bed and sleep.time_went_to_bed:
-                from datetime import datetime as dt
-                out = dt.combine(metric_date, sleep.time_got_out_of_bed)
-                bed = dt.combine(metric_date, sleep.time_went_to_bed)
-                if out < bed:
-                    out = dt.combine(metric_date + timedelta(days=1), sleep.time_got_out_of_bed)
-                return (out - bed).total_seconds() / 60.0  # minutes
-            return None
-        return getattr(sleep, field, None)
-
-    if source == 'steps':
-        agg = StepsLog.objects.filter(user=user, date_time__date=metric_date).aggregate(total=Sum('steps'))
-        return int(agg['total'] or 0) if field == 'total_steps' else None
-
-    if source == 'weight':
-        w = WeightLog.objects.filter(user=user, date_time__date=metric_date).order_by('-date_time').first()
-        return float(w.weight) if w and field == 'weight' else None
-
-    if source == 'water':
-        agg = WaterLog.objects.filter(user=user, date_time__date=metric_date).aggregate(total=Sum('amount'))
-        return float(agg['total'] or 0) if field == 'total_water' else None
-
-    if source == 'workout_log':
-        logs = WorkoutLog.objects.filter(user=user, date_time__date=metric_date)
-        if field == 'avg_rest_time':
-            agg = logs.filter(rest_time__isnull=False).aggregate(avg=Avg('rest_time'))
-            return round(float(agg['avg'] or 0), 2)
-        if field == 'total_sets':
-            return logs.count()
-        return None
-
-    return None
+# Nutrient fields selectable as metadata_type on the food charts
+_NUTRIENT_METADATA = [metric.field for metric in NUTRIENT_METRICS]
 
 
 def _compute_progression_for_row(row, progression_type):
-    """Compute single progression value from a row (weights, reps, sets)."""
-    weights = row['weights']
-    if not weights:
+    """Compute single progression value from a WorkoutDayRollup row (weighted sets only)."""
+    total_sets = row['weighted_set_count']
+    if not total_sets:
         return None
-    avg_weight = sum(weights) / len(weights)
-    total_reps = sum(row['reps']) if row['reps'] else 0
-    total_sets = row['sets']
-    max_weight = max(weights)
+    avg_weight = float(row['weight_sum']) / total_sets
+    total_reps = row['weighted_reps']
+    max_weight = float(row['max_weight'])
     if progression_type == 'avg_weight_reps':
         return round(avg_weight * (1 + 0.333 * total_reps), 2)
     if progression_type == 'avg_weight_sets':
@@ -247,7 +196,8 @@ def _compute_progression_for_row(row, progression_type):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def workout_progression(request):
+@with_max_points
+def workout_progression(request, max_points):
     """
     Workout Progression Chart.
     - workout_id optional: when empty or "all", returns combined progression (sum of each workout's
@@ -279,32 +229,33 @@ def workout_progression(request):
                 'error': {'message': 'Workout not found'}
             }, status=status.HTTP_404_NOT_FOUND)
 
-    logs_query = WorkoutLog.objects.filter(
+    rollups = WorkoutDayRollup.objects.filter(
         user=request.user,
-        date_time__date__gte=date_from,
-        date_time__date__lte=date_to,
-        weight__isnull=False
-    ).order_by('date_time')
+        date__gte=date_from,
+        date__lte=date_to,
+        weighted_set_count__gt=0
+    )
     if not all_workouts:
-        logs_query = logs_query.filter(workout_id=workout_id)
+        rollups = rollups.filter(workout_id=workout_id)
 
-    # Group by date and (for all) by workout
+    # One rollup row per (date, workout); group by date
     by_date = {}
-    for log in logs_query:
-        d = log.date_time.date()
-        key = d.isoformat()
-        wkey = str(log.workout_id) if all_workouts else '_'
-        if key not in by_date:
-            by_date[key] = {}
-        if wkey not in by_date[key]:
-            by_date[key][wkey] = {'weights': [], 'reps': [], 'sets': 0, 'rest_times': []}
-        row = by_date[key][wkey]
-        row['weights'].append(float(log.weight))
-        if log.reps is not None:
-            row['reps'].append(log.reps)
-        row['sets'] += 1
-        if log.rest_time is not None:
-            row['rest_times'].append(log.rest_time)
+    for row in rollups.values(
+        'date', 'workout_id', 'weighted_set_count', 'weighted_reps', 'weight_sum', 'max_weight'
+    ):
+        by_date.setdefault(row['date'].isoformat(), []).append(row)
+
+    # Overlay metrics for every point come from one grouped query per source;
+    # keys missing from the registry are ignored
+    overlay_metrics = [METRIC_REGISTRY[mk] for mk in metric_keys if mk in METRIC_REGISTRY]
+    offset_days = timedelta(days=metric_offset)
+    overlay_values = {}
+    if overlay_metrics and by_date:
+        point_dates = [date.fromisoformat(key) for key in by_date]
+        overlay_values = load_metric_days(
+            request.user.pk, [metric.key for metric in overlay_metrics],
+            min(point_dates) - offset_days, max(point_dates) - offset_days, user_timezone(request.user)
+        )
 
     data = []
     for date_key in sorted(by_date.keys()):
@@ -312,23 +263,22 @@ def workout_progression(request):
         if all_workouts:
             progression = sum(
                 _compute_progression_for_row(row, progression_type)
-                for row in day_data.values()
+                for row in day_data
                 if _compute_progression_for_row(row, progression_type) is not None
             )
             progression = round(progression, 2)
         else:
-            row = next(iter(day_data.values()))
+            row = day_data[0]
             progression = _compute_progression_for_row(row, progression_type)
             if progression is None:
                 continue
 
         point_data = {'date': date_key, 'progression': progression}
-        date_obj = datetime.strptime(date_key, '%Y-%m-%d').date()
-        for mk in metric_keys:
-            metric_date = date_obj - timedelta(days=metric_offset) if metric_offset else date_obj
-            val = _get_workout_progression_metric_value(request.user, mk, metric_date)
+        metric_date = datetime.strptime(date_key, '%Y-%m-%d').date() - offset_days
+        for metric in overlay_metrics:
+            val = metric.present(overlay_values[metric.key].get(metric_date))
             if val is not None:
-                point_data[mk] = val
+                point_data[metric.key] = val
         data.append(point_data)
 
     payload = {
@@ -337,70 +287,88 @@ def workout_progression(request):
         'date_from': date_from.isoformat(),
         'date_to': date_to.isoformat(),
         'progression_type': progression_type,
-        'points': data
+        **_point_series(data, max_points, 'progression')
     }
     return Response({'success': True, 'data': payload})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def workout_sets_per_day(request):
+@with_max_points
+def workout_sets_per_day(request, max_points):
     """
     Layered bar chart: total sets logged per day and attribute sets (sets with attributes) per day.
     """
     date_from, date_to = parse_analytics_date_range(request)
-    logs = WorkoutLog.objects.filter(
+    by_date = WorkoutDayRollup.objects.filter(
         user=request.user,
-        date_time__date__gte=date_from,
-        date_time__date__lte=date_to
-    )
-    by_date = {}
-    for log in logs:
-        d = log.date_time.date().isoformat()
-        if d not in by_date:
-            by_date[d] = {'total_sets': 0, 'attribute_sets': 0}
-        by_date[d]['total_sets'] += 1
-        if log.attributes and len(log.attributes) > 0:
-            by_date[d]['attribute_sets'] += 1
-    data = [{'date': k, 'total_sets': v['total_sets'], 'attribute_sets': v['attribute_sets']}
-            for k, v in sorted(by_date.items())]
+        date__gte=date_from,
+        date__lte=date_to
+    ).values('date').annotate(
+        total_sets=Sum('set_count'),
+        attribute_sets=Sum('attribute_set_count')
+    ).order_by('date')
+    data = [{'date': row['date'].isoformat(), 'total_sets': row['total_sets'],
+             'attribute_sets': row['attribute_sets']}
+            for row in by_date]
     return Response({
         'success': True,
         'data': {
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
-            'points': data
+            **_point_series(data, max_points, 'total_sets')
         }
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def workout_rest_time_analysis(request):
+@with_max_points
+def workout_rest_time_analysis(request, max_points):
     """
     Rest time vs weight change analysis
     Shows how rest time affects weight lifted in next set
+    - mode=pairs (default): one point per consecutive pair of sets of a workout on a day
+    - mode=buckets: rest times grouped into bucket_size-second buckets (default 30) with the
+      mean and median weight change per bucket
     """
     workout_id = request.GET.get('workout_id')
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
+    mode = request.GET.get('mode', 'pairs')
+    
+    if mode not in ('pairs', 'buckets'):
+        return Response({
+            'success': False,
+            'error': {'message': "mode must be 'pairs' or 'buckets'"}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        bucket_size = int(request.GET.get('bucket_size', 30))
+    except ValueError:
+        bucket_size = 0
+    if bucket_size <= 0:
+        return Response({
+            'success': False,
+            'error': {'message': 'bucket_size must be a positive number of seconds'}
+        }, status=status.HTTP_400_BAD_REQUEST)
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now()
+        date_to = local_today(request.user)
     else:
-        date_to = datetime.strptime(date_to, '%Y-%m-%d')
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
     if not date_from:
         date_from = date_to - timedelta(days=90)
     else:
-        date_from = datetime.strptime(date_from, '%Y-%m-%d')
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
     
-    # Get workout logs grouped by date and workout
+    # Pair each set with the previous one of the same workout and local day in SQL
+    zone = user_timezone(request.user)
     logs_query = WorkoutLog.objects.filter(
         user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to,
+        **day_range('date_time', zone, date_from, date_to),
         weight__isnull=False,
         rest_time__isnull=False
     )
@@ -408,51 +376,74 @@ def workout_rest_time_analysis(request):
     if workout_id:
         logs_query = logs_query.filter(workout_id=workout_id)
     
-    logs = logs_query.order_by('date_time', 'workout_id', 'created_at')
-    
-    # Group by date and workout, then calculate rest time vs next set weight change
-    data = []
-    current_date = None
-    current_workout = None
-    previous_log = None
-    
-    for log in logs:
-        date_key = log.date_time.date()
-        workout_key = log.workout_id
-        
-        if (date_key != current_date or workout_key != current_workout) or previous_log is None:
-            previous_log = log
-            current_date = date_key
-            current_workout = workout_key
-            continue
+    pairs = logs_query.annotate(
+        day=LocalDate('date_time', zone),
+        previous_weight=Window(
+            expression=Lag('weight'),
+            partition_by=[F('user_id'), F('workout_id'), LocalDate('date_time', zone)],
+            order_by=[F('date_time').asc(), F('created_at').asc()],
+        ),
+    ).filter(previous_weight__isnull=False).order_by(
+        'date_time', 'workout_id', 'created_at'
+    ).values_list('day', 'rest_time', 'previous_weight', 'weight')
+    
+    if mode == 'buckets':
+        # Weight changes grouped by rest time, reduced per bucket
+        changes_by_bucket = {}
+        for _, rest_time, previous_weight, weight in pairs.iterator():
+            bucket = rest_time // bucket_size * bucket_size
+            changes_by_bucket.setdefault(bucket, []).append(float(weight - previous_weight))
         
-        # Calculate weight difference
-        weight_diff = float(log.weight) - float(previous_log.weight)
+        buckets = []
+        for bucket in sorted(changes_by_bucket):
+            changes = np.array(changes_by_bucket[bucket])
+            buckets.append({
+                'rest_time_from': bucket,
+                'rest_time_to': bucket + bucket_size,
+                'count': len(changes),
+                'mean_weight_change': round(float(changes.mean()), 2),
+                'median_weight_change': round(float(np.median(changes)), 2)
+            })
         
+        return Response({
+            'success': True,
+            'data': {
+                'workout_id': workout_id,
+                'date_from': date_from.isoformat(),
+                'date_to': date_to.isoformat(),
+                'mode': mode,
+                'bucket_size': bucket_size,
+                'pair_count': sum(bucket['count'] for bucket in buckets),
+                'buckets': buckets
+            }
+        })
+    
+    data = []
+    for day, rest_time, previous_weight, weight in pairs.iterator():
         data.append({
-            'date': date_key.isoformat(),
-            'rest_time': log.rest_time,
-            'weight_change': round(weight_diff, 2),
-            'previous_weight': float(previous_log.weight),
-            'current_weight': float(log.weight)
+            'date': day.isoformat(),
+            'rest_time': rest_time,
+            'weight_change': round(float(weight - previous_weight), 2),
+            'previous_weight': float(previous_weight),
+            'current_weight': float(weight)
         })
-        
-        previous_log = log
     
     return Response({
         'success': True,
         'data': {
             'workout_id': workout_id,
-            'date_from': date_from.date().isoformat(),
-            'date_to': date_to.date().isoformat(),
-            'points': data
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'mode': mode,
+            **_point_series(data, max_points, 'weight_change')
         }
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def workout_attributes_analysis(request):
+@with_max_points
+def workout_attributes_analysis(request, max_points):
     """
     Attributes vs progression analysis
     Compares progression when attributes were used vs not used
@@ -463,20 +454,20 @@ def workout_attributes_analysis(request):
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now()
+        date_to = local_today(request.user)
     else:
-        date_to = datetime.strptime(date_to, '%Y-%m-%d')
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
     if not date_from:
         date_from = date_to - timedelta(days=90)
     else:
-        date_from = datetime.strptime(date_from, '%Y-%m-%d')
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
     
     # Get workout logs
+    zone = user_timezone(request.user)
     logs_query = WorkoutLog.objects.filter(
         user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to,
+        **day_range('date_time', zone, date_from, date_to),
         weight__isnull=False,
         reps__isnull=False
     )
@@ -493,7 +484,7 @@ def workout_attributes_analysis(request):
         has_attributes = len(log.attributes) > 0 if log.attributes else False
         
         data.append({
-            'date': log.date_time.date().isoformat(),
+            'date': local_date(log.date_time, zone).isoformat(),
             'progression': round(progression, 2),
             'has_attributes': has_attributes,
             'attributes': log.attributes if log.attributes else []
@@ -503,16 +494,17 @@ def workout_attributes_analysis(request):
         'success': True,
         'data': {
             'workout_id': workout_id,
-            'date_from': date_from.date().isoformat(),
-            'date_to': date_to.date().isoformat(),
-            'points': data
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            **_point_series(data, max_points, 'progression', group_key='has_attributes')
         }
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def steps_cardio_distance(request):
+@with_max_points
+def steps_cardio_distance(request, max_points):
     """
     Steps distance + cardio distance comparison
     - Calculate distance from steps based on user height
@@ -524,7 +516,7 @@ def steps_cardio_distance(request):
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now().date()
+        date_to = local_today(request.user)
     else:
         date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
@@ -542,52 +534,28 @@ def steps_cardio_distance(request):
     step_length_meters = (height_inches * 0.0254) * 0.413  # Convert to meters and apply factor
     step_length_miles = step_length_meters * 0.000621371
     
-    # Get steps logs
-    steps_logs = StepsLog.objects.filter(
-        user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
-    ).values('date_time__date').annotate(
-        total_steps=Sum('steps')
-    ).order_by('date_time__date')
-    
-    # Get cardio logs
-    cardio_logs = CardioLog.objects.filter(
-        user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to,
-        distance__isnull=False
-    ).extra(select={'date': "DATE(date_time)"}).values('date').annotate(
-        total_distance=Sum('distance')
-    ).order_by('date')
+    # Daily step and cardio distance totals from the cached series
+    series = user_series(user)
+    daily_steps = series.window('steps', date_from, date_to)
+    # Cardio distance is assumed to be logged in miles
+    daily_cardio = np.nan_to_num(series.window('cardio_distance', date_from, date_to))
+    steps_distance = daily_steps * step_length_miles
     
-    # Convert cardio to miles (assuming input is in miles, adjust if needed)
-    cardio_dict = {item['date'].isoformat() if isinstance(item['date'], date) else item['date']: float(item['total_distance']) 
-                   for item in cardio_logs}
-    
-    # Build response data
+    # Build response data for days with steps logged
     data = []
-    total_steps = 0
-    total_steps_days = 0
-    
-    for step_log in steps_logs:
-        date_key = step_log['date_time__date'].isoformat()
-        steps = step_log['total_steps']
-        steps_distance_miles = steps * step_length_miles
-        cardio_distance = cardio_dict.get(date_key, 0)
+    for offset in np.flatnonzero(~np.isnan(daily_steps)):
+        steps_distance_miles = float(steps_distance[offset])
+        cardio_distance = float(daily_cardio[offset])
         
         data.append({
-            'date': date_key,
-            'steps': steps,
+            'date': (date_from + timedelta(days=int(offset))).isoformat(),
+            'steps': int(daily_steps[offset]),
             'steps_distance_miles': round(steps_distance_miles, 2),
             'cardio_distance_miles': round(cardio_distance, 2),
             'difference_miles': round(steps_distance_miles - cardio_distance, 2)
         })
-        
-        total_steps += steps
-        total_steps_days += 1
     
-    avg_steps_per_day = total_steps / total_steps_days if total_steps_days > 0 else 0
+    avg_steps_per_day = float(np.nanmean(daily_steps)) if data else 0
     
     return Response({
         'success': True,
@@ -595,74 +563,37 @@ def steps_cardio_distance(request):
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
             'average_steps_per_day': round(avg_steps_per_day, 0),
-            'points': data
+            **_point_series(data, max_points, 'steps')
         }
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def activation_progress(request):
+@with_max_points
+def activation_progress(request, max_points):
     """
     Progress of done activation ratings compared to expected during split day
     """
     date_from, date_to = parse_analytics_date_range(request)
     
-    # Get active split
-    active_split = Split.objects.filter(
-        user=request.user,
-        start_date__isnull=False
-    ).order_by('-start_date').first()
+    # Active split with its days and targets loaded once
+    calendar = SplitCalendar.for_user(request.user)
     
-    if not active_split:
+    if not calendar:
         return Response({
             'success': False,
             'error': {'message': 'No active split found'}
         }, status=status.HTTP_404_NOT_FOUND)
+    active_split = calendar.split
     
-    # Get split days
-    split_days = SplitDay.objects.filter(split=active_split).order_by('day_order')
+    # Actual activations for the whole range in one query
+    actual_by_day = activation_by_day(request.user, date_from, date_to)
     
-    # Calculate day of split for each date
     data = []
-    current_date = date_from
-    
-    while current_date <= date_to:
-        # Calculate which day of the split this is
-        days_since_start = (current_date - active_split.start_date).days
-        if days_since_start < 0:
-            current_date += timedelta(days=1)
-            continue
-        
-        split_day_index = days_since_start % split_days.count() if split_days.count() > 0 else 0
-        split_day = split_days[split_day_index] if split_days.count() > 0 else None
-        
-        if not split_day:
-            current_date += timedelta(days=1)
-            continue
-        
-        # Get expected activations for this split day
-        expected_activations = SplitDayTarget.objects.filter(split_day=split_day).select_related('muscle')
-        expected_dict = {target.muscle.muscles_id: target.target_activation for target in expected_activations}
-        
-        # Get actual activations from workout logs on this date
-        workout_logs = WorkoutLog.objects.filter(
-            user=request.user,
-            date_time__date=current_date
-        ).select_related('workout').prefetch_related('workout__workoutmuscle_set__muscle')
-        
-        actual_activations = {}
-        for log in workout_logs:
-            workout_muscles = log.workout.workoutmuscle_set.all()
-            for wm in workout_muscles:
-                muscle_id = wm.muscle.muscles_id
-                if muscle_id not in actual_activations:
-                    actual_activations[muscle_id] = 0
-                actual_activations[muscle_id] += wm.activation_rating
-        
-        # Calculate total expected and actual
-        total_expected = sum(expected_dict.values())
-        total_actual = sum(actual_activations.values())
+    for current_date, split_day in calendar.days_for_range(date_from, date_to):
+        total_expected = sum(t.target_activation for t in calendar.targets(split_day))
+        total_actual = sum(actual_by_day.get(current_date, {}).values())
         
         data.append({
             'date': current_date.isoformat(),
@@ -672,8 +603,6 @@ def activation_progress(request):
             'difference': total_actual - total_expected,
             'percentage': round((total_actual / total_expected * 100) if total_expected > 0 else 0, 2)
         })
-        
-        current_date += timedelta(days=1)
     
     return Response({
         'success': True,
@@ -681,7 +610,43 @@ def activation_progress(request):
             'split_name': active_split.split_name,
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
-            'points': data
+            **_point_series(data, max_points, 'total_actual')
+        }
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def muscle_recovery_map(request):
+    """
+    Current fatigue and readiness of every muscle, from the stored per-muscle state
+    (apps.analytics.muscle_fatigue) decayed to now - no workout history is read.
+    - fatigue: full-activation sets still "on" the muscle; each set adds
+      activation_rating / 100 and halves every HALF_LIFE_HOURS
+    - readiness: percent recovered, 0 at FATIGUED_SETS
+    """
+    now = timezone.now()
+    states = {row.muscle_id: row for row in MuscleFatigue.objects.filter(user=request.user)}
+
+    muscles = []
+    for muscle in Muscle.objects.order_by('muscle_group', 'muscle_name'):
+        state = states.get(muscle.muscles_id)
+        fatigue = fatigue_at(state, now) if state else 0.0
+        muscles.append({
+            'muscle_id': muscle.muscles_id,
+            'muscle_name': muscle.muscle_name,
+            'muscle_group': muscle.muscle_group,
+            'fatigue': round(fatigue, 3),
+            'readiness': readiness(fatigue)
+        })
+
+    return Response({
+        'success': True,
+        'data': {
+            'as_of': now.isoformat(),
+            'half_life_hours': HALF_LIFE_HOURS,
+            'fatigued_sets': FATIGUED_SETS,
+            'muscles': muscles
         }
     })
 
@@ -689,9 +654,54 @@ def activation_progress(request):
 # ========== FOOD ANALYTICS ==========
 
 
+def _goal_flags(actual_value, goal_value):
+    return {
+        'is_below_goal': goal_value and actual_value < goal_value,
+        'is_above_goal': goal_value and actual_value > goal_value,
+        'is_within_goal': goal_value and abs(actual_value - goal_value) / goal_value * 100 <= 8
+    }
+
+
+def _bucketed_metadata_progress(user, metadata_type, goals, date_from, date_to, period):
+    """
+    Metadata progress points per calendar period, summed in SQL over the rollup.
+
+    actual is the average per logged day in the period so it stays comparable with the daily
+    goal (the goal in effect on the period's last day). Returns (points, average per logged
+    day, percentage of logged periods within 8% of goal).
+    """
+    totals = rollup_calendar_totals(user.pk, [metadata_type], date_from, date_to, period)
+    goal_field = f'{metadata_type}_goal'
+    data = []
+    within = 0
+    for start, end in calendar_buckets(date_from, date_to, period):
+        bucket = totals.get(period_start(start, period))
+        goal_obj = goals.goal_on(end)
+        goal_value = float(getattr(goal_obj, goal_field, 0) or 0) if goal_obj else None
+        actual_value = bucket[metadata_type] / bucket['days'] if bucket else 0.0
+        flags = _goal_flags(actual_value, goal_value)
+        if bucket and flags['is_within_goal']:
+            within += 1
+        data.append({
+            'date': start.isoformat(),
+            'period_end': end.isoformat(),
+            'actual': round(actual_value, 2),
+            'total': round(bucket[metadata_type], 2) if bucket else 0.0,
+            'logged_days': bucket['days'] if bucket else 0,
+            'goal': round(goal_value, 2) if goal_value else None,
+            **flags
+        })
+
+    logged_days = sum(bucket['days'] for bucket in totals.values())
+    average = sum(bucket[metadata_type] for bucket in totals.values()) / logged_days if logged_days else 0.0
+    ratio = within / len(totals) * 100 if totals else 0.0
+    return data, average, ratio
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def food_metadata_progress(request):
+@with_max_points
+def food_metadata_progress(request, max_points):
     """
     Metadata progress vs goal
     - Selectable metadata
@@ -700,41 +710,51 @@ def food_metadata_progress(request):
     - Color coding (below/above goal)
     - Ratio of days within 8% of goal
     - Average metadata value
+    - period: day (default) | week | month | year; calendar periods (ISO weeks) give one
+      point per period with the average per logged day (ratio counts periods, not days)
     """
     metadata_type = request.GET.get('metadata_type', 'calories')
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     
     # Validate metadata type
-    valid_metadata = [
-        'calories', 'protein', 'fat', 'carbohydrates', 'fiber', 'sodium',
-        'sugar', 'saturated_fat', 'trans_fat', 'calcium', 'iron', 'magnesium',
-        'cholesterol', 'vitamin_a', 'vitamin_c', 'vitamin_d', 'caffeine'
-    ]
-    if metadata_type not in valid_metadata:
+    if metadata_type not in _NUTRIENT_METADATA:
+        return Response({
+            'success': False,
+            'error': {'message': f'Invalid metadata_type. Must be one of: {_NUTRIENT_METADATA}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    period = request.GET.get('period', 'day')
+    if period not in CALENDAR_PERIODS:
         return Response({
             'success': False,
-            'error': {'message': f'Invalid metadata_type. Must be one of: {valid_metadata}'}
+            'error': {'message': f'period must be one of: {list(CALENDAR_PERIODS)}'}
         }, status=status.HTTP_400_BAD_REQUEST)
     
     date_from, date_to = parse_analytics_date_range(request)
     
-    # Get food logs grouped by date
-    food_logs = FoodLog.objects.filter(
-        user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
-    ).select_related('food').extra(
-        select={'date': "DATE(date_time)"}
-    ).values('date').annotate(
-        total=Sum(F(f'food__{metadata_type}') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2))
-    ).order_by('date')
+    # Goal history, searched per day
+    goals = GoalTimeline.for_user(request.user, until=date_to)
     
-    # Get goals for the timeframe
-    goals = UserGoal.objects.filter(
-        user=request.user,
-        created_at__lte=date_to
-    ).order_by('-created_at')
+    if period != 'day':
+        data, avg_value, ratio_within_8_percent = _bucketed_metadata_progress(
+            request.user, metadata_type, goals, date_from, date_to, period
+        )
+        return Response({
+            'success': True,
+            'data': {
+                'metadata_type': metadata_type,
+                'period': period,
+                'date_from': date_from.isoformat(),
+                'date_to': date_to.isoformat(),
+                'average': round(avg_value, 2),
+                'ratio_within_8_percent': round(ratio_within_8_percent, 2),
+                **_point_series(data, max_points, 'actual')
+            }
+        })
+    
+    # Daily totals from the cached series; NaN on days without food logs
+    daily_totals = user_series(request.user).window(metadata_type, date_from, date_to)
     
     # Build data points with goals
     data = []
@@ -743,19 +763,19 @@ def food_metadata_progress(request):
     total_days = 0
     
     current_date = date_from
-    while current_date <= date_to:
+    for day_total in daily_totals.tolist():
         date_key = current_date.isoformat()
         
         # Find applicable goal (most recent goal before or on this date)
-        goal_obj = goals.filter(created_at__lte=current_date).first() if goals.exists() else None
+        goal_obj = goals.goal_on(current_date)
         goal_field = f'{metadata_type}_goal'
         goal_value = float(getattr(goal_obj, goal_field, 0) or 0) if goal_obj else None
         
-        # Find food log total for this date
-        log_entry = next((item for item in food_logs if item['date'].isoformat() == date_key), None)
-        actual_value = float(log_entry['total']) if log_entry and log_entry['total'] else 0.0
+        # Food log total for this date
+        logged = not np.isnan(day_total)
+        actual_value = day_total if logged else 0.0
         
-        if log_entry:
+        if logged:
             total_value += Decimal(str(actual_value))
             total_days += 1
             
@@ -769,9 +789,7 @@ def food_metadata_progress(request):
             'date': date_key,
             'actual': round(actual_value, 2),
             'goal': round(goal_value, 2) if goal_value else None,
-            'is_below_goal': goal_value and actual_value < goal_value,
-            'is_above_goal': goal_value and actual_value > goal_value,
-            'is_within_goal': goal_value and abs(actual_value - goal_value) / goal_value * 100 <= 8
+            **_goal_flags(actual_value, goal_value)
         }
         
         data.append(point_data)
@@ -785,11 +803,12 @@ def food_metadata_progress(request):
         'success': True,
         'data': {
             'metadata_type': metadata_type,
+            'period': period,
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
             'average': round(avg_value, 2),
             'ratio_within_8_percent': round(ratio_within_8_percent, 2),
-            'points': data
+            **_point_series(data, max_points, 'actual')
         }
     })
 
@@ -806,15 +825,10 @@ def food_timing(request):
     date_to = request.GET.get('date_to')
     
     # Validate metadata type
-    valid_metadata = [
-        'calories', 'protein', 'fat', 'carbohydrates', 'fiber', 'sodium',
-        'sugar', 'saturated_fat', 'trans_fat', 'calcium', 'iron', 'magnesium',
-        'cholesterol', 'vitamin_a', 'vitamin_c', 'vitamin_d', 'caffeine'
-    ]
-    if metadata_type not in valid_metadata:
+    if metadata_type not in _NUTRIENT_METADATA:
         return Response({
             'success': False,
-            'error': {'message': f'Invalid metadata_type. Must be one of: {valid_metadata}'}
+            'error': {'message': f'Invalid metadata_type. Must be one of: {_NUTRIENT_METADATA}'}
         }, status=status.HTTP_400_BAD_REQUEST)
     
     date_from, date_to = parse_analytics_date_range(request)
@@ -823,11 +837,10 @@ def food_timing(request):
     # Per (date, hour) sum of metadata, then average at each hour over the date range
     food_logs = FoodLog.objects.filter(
         user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
+        **day_range('date_time', user_timezone(request.user), date_from, date_to)
     ).select_related('food').annotate(
-        date=TruncDate('date_time'),
-        hour=ExtractHour('date_time')
+        date=LocalDate('date_time', user_timezone(request.user)),
+        hour=ExtractHour('date_time', tzinfo=user_timezone(request.user))
     ).values('date', 'hour').annotate(
         total=Sum(F(f'food__{metadata_type}') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2))
     ).order_by('hour', 'date')
@@ -858,34 +871,25 @@ def food_timing(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def macro_split(request):
+@with_max_points
+def macro_split(request, max_points):
     """
     Macro split chart
     Shows split of protein, carbohydrates, and fats over calories
     """
     date_from, date_to = parse_analytics_date_range(request)
     
-    # Get food logs grouped by date
-    food_logs = FoodLog.objects.filter(
-        user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
-    ).select_related('food').extra(
-        select={'date': "DATE(date_time)"}
-    ).values('date').annotate(
-        total_calories=Sum(F('food__calories') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2)),
-        total_protein=Sum(F('food__protein') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2)),
-        total_fat=Sum(F('food__fat') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2)),
-        total_carbs=Sum(F('food__carbohydrates') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2))
-    ).order_by('date')
+    # Daily macro totals from the cached series
+    series = user_series(request.user)
+    macros = np.vstack([
+        series.window(column, date_from, date_to)
+        for column in ('calories', 'protein', 'fat', 'carbohydrates')
+    ])
     
-    # Build response data
+    # Build response data for days with food logged
     data = []
-    for log_entry in food_logs:
-        calories = float(log_entry['total_calories'] or 0)
-        protein = float(log_entry['total_protein'] or 0)
-        fat = float(log_entry['total_fat'] or 0)
-        carbs = float(log_entry['total_carbs'] or 0)
+    for offset in np.flatnonzero(~np.isnan(macros[0])):
+        calories, protein, fat, carbs = macros[:, offset].tolist()
         
         # Calculate percentages of calories (protein and carbs = 4 cal/g, fat = 9 cal/g)
         protein_cals = protein * 4
@@ -901,7 +905,7 @@ def macro_split(request):
             protein_pct = fat_pct = carbs_pct = 0
         
         data.append({
-            'date': log_entry['date'].isoformat(),
+            'date': (date_from + timedelta(days=int(offset))).isoformat(),
             'calories': round(calories, 2),
             'protein': round(protein, 2),
             'protein_percentage': round(protein_pct, 2),
@@ -916,7 +920,7 @@ def macro_split(request):
         'data': {
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
-            'points': data
+            **_point_series(data, max_points, 'calories')
         }
     })
 
@@ -937,8 +941,7 @@ def food_frequency(request):
 
     food_logs = FoodLog.objects.filter(
         user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
+        **day_range('date_time', user_timezone(request.user), date_from, date_to)
     ).select_related('food')
 
     if entry_type == 'both':
@@ -1009,10 +1012,11 @@ def food_frequency(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def food_cost(request):
+@with_max_points
+def food_cost(request, max_points):
     """
     Food cost analytics
-    - Average cost per day/week/month/year
+    - Average cost per calendar day/ISO week/month/year, with one bucket per period
     - Most expensive brands vs calorie density
     - Cost vs macro/micro metadata
     - Date range from shared analytics range
@@ -1022,30 +1026,26 @@ def food_cost(request):
     date_from, date_to = parse_analytics_date_range(request)
     
     if analysis_type == 'average':
-        # Calculate average cost per period
-        food_logs = FoodLog.objects.filter(
-            user=request.user,
-            date_time__gte=date_from,
-            date_time__lte=date_to,
-            food__cost__isnull=False
-        ).select_related('food').extra(
-            select={'date': "DATE(date_time)"}
-        ).values('date').annotate(
-            total_cost=Sum(F('food__cost') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2))
-        ).order_by('date')
-        
-        total_cost = sum(float(item['total_cost'] or 0) for item in food_logs)
+        if period not in CALENDAR_PERIODS:
+            return Response({
+                'success': False,
+                'error': {'message': f'period must be one of: {list(CALENDAR_PERIODS)}'}
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate number of periods
-        if period == 'day':
-            num_periods = (date_to - date_from).days + 1
-        elif period == 'week':
-            num_periods = ((date_to - date_from).days + 1) / 7
-        elif period == 'month':
-            num_periods = ((date_to - date_from).days + 1) / 30
-        else:  # year
-            num_periods = ((date_to - date_from).days + 1) / 365
+        # Cost per calendar day / ISO week / month / year, grouped in SQL over the rollup
+        # (foods without a cost contribute 0); edge periods cover only the part in range
+        totals = rollup_calendar_totals(request.user.pk, ['cost'], date_from, date_to, period)
+        buckets = []
+        for start, end in calendar_buckets(date_from, date_to, period):
+            bucket_cost = totals.get(period_start(start, period), {}).get('cost', 0.0)
+            buckets.append({
+                'period_start': start.isoformat(),
+                'period_end': end.isoformat(),
+                'total_cost': round(bucket_cost, 2)
+            })
         
+        total_cost = sum(bucket['cost'] for bucket in totals.values())
+        num_periods = len(buckets)
         avg_cost = total_cost / num_periods if num_periods > 0 else 0
         
         return Response({
@@ -1056,7 +1056,8 @@ def food_cost(request):
                 'date_to': date_to.isoformat(),
                 'average_cost': round(avg_cost, 2),
                 'total_cost': round(total_cost, 2),
-                'num_periods': round(num_periods, 2)
+                'num_periods': num_periods,
+                'buckets': buckets
             }
         })
     
@@ -1064,8 +1065,7 @@ def food_cost(request):
         # Most expensive brands vs calorie density
         food_logs = FoodLog.objects.filter(
             user=request.user,
-            date_time__gte=date_from,
-            date_time__lte=date_to,
+            **day_range('date_time', user_timezone(request.user), date_from, date_to),
             food__cost__isnull=False,
             food__brand__isnull=False
         ).exclude(food__brand='').select_related('food').values('food__brand').annotate(
@@ -1099,14 +1099,15 @@ def food_cost(request):
     elif analysis_type == 'cost_vs_metadata':
         # Cost vs macro/micro metadata
         metadata_type = request.GET.get('metadata_type', 'calories')
+        zone = user_timezone(request.user)
         
+        # Grouped by the user's local day, the same days the range filter uses
         food_logs = FoodLog.objects.filter(
             user=request.user,
-            date_time__gte=date_from,
-            date_time__lte=date_to,
+            **day_range('date_time', zone, date_from, date_to),
             food__cost__isnull=False
-        ).select_related('food').extra(
-            select={'date': "DATE(date_time)"}
+        ).annotate(
+            date=LocalDate('date_time', zone)
         ).values('date').annotate(
             total_cost=Sum(F('food__cost') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2)),
             total_metadata=Sum(F(f'food__{metadata_type}') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2))
@@ -1130,7 +1131,7 @@ def food_cost(request):
                 'metadata_type': metadata_type,
                 'date_from': date_from.isoformat(),
                 'date_to': date_to.isoformat(),
-                'points': data
+                **_point_series(data, max_points, 'cost')
             }
         })
     
@@ -1153,7 +1154,7 @@ def food_radar_chart(request):
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now().date()
+        date_to = local_today(request.user)
     else:
         date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
@@ -1177,18 +1178,14 @@ def food_radar_chart(request):
     actual_data = {}
     goal_data = {}
     
+    # Range totals for every nutrient in one rollup aggregate
+    totals = rollup_nutrient_vector(request.user.pk, date_from, date_to)
+    total_days = (date_to - date_from).days + 1
+    
     for metadata in metadata_types:
         # Get average actual
-        food_logs = FoodLog.objects.filter(
-            user=request.user,
-            date_time__gte=date_from,
-            date_time__lte=date_to
-        ).aggregate(
-            total=Sum(F(f'food__{metadata}') * F('servings'), output_field=DecimalField(max_digits=10, decimal_places=2))
-        )
-        
-        total_days = (date_to - date_from).days + 1
-        avg_actual = float(food_logs['total'] or 0) / total_days if total_days > 0 else 0
+        range_total = float(totals[NUTRIENT_VECTOR_INDEX[metadata]])
+        avg_actual = range_total / total_days if total_days > 0 else 0
         actual_data[metadata] = round(avg_actual, 2)
         
         # Get goal
@@ -1211,26 +1208,25 @@ def food_radar_chart(request):
 @permission_classes([IsAuthenticated])
 def workout_tracking_heatmap(request):
     """
-    Heatmap of days workouts were tracked over the past year
+    Heatmap of days workouts were tracked over the past year: sets per day from the workout
+    rollup, and the number of days tracked from the workout activity bitmap
     """
     date_to = request.GET.get('date_to')
     
     if not date_to:
-        date_to = timezone.now().date()
+        date_to = local_today(request.user)
     else:
         date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
     date_from = date_to - timedelta(days=365)
     
-    # Get all workout log dates
-    workout_dates = WorkoutLog.objects.filter(
+    # Sets logged per day, from the workout rollup
+    workout_dates = WorkoutDayRollup.objects.filter(
         user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
-    ).extra(
-        select={'date': "DATE(date_time)"}
+        date__gte=date_from,
+        date__lte=date_to
     ).values('date').annotate(
-        workout_count=Count('workout_log_id')
+        workout_count=Sum('set_count')
     ).order_by('date')
     
     # Build heatmap data
@@ -1244,17 +1240,341 @@ def workout_tracking_heatmap(request):
         'data': {
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
+            'days_tracked': days_logged(request.user.pk, 'workout', date_from, date_to),
             'heatmap': data
         }
     })
 
 
+# ========== CROSS-TRACKER ANALYTICS ==========
+
+
+def _float_or_none(value):
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def correlations(request):
+    """
+    Correlation matrix between daily metric series (nutrients, sleep, health, steps, water,
+    cardio, weight, training volume) over the selected range.
+    - metrics: comma-separated series columns; default every metric logged in the range
+    - method: pearson (default) | spearman
+    - max_lag: 0-7; matrices for each lag L correlate row metrics on day t with column
+      metrics on day t + L
+    Coefficients need at least MIN_PAIRED_DAYS days where both metrics were logged.
+    """
+    date_from, date_to = parse_analytics_date_range(request, default_preset='6months')
+    method = request.GET.get('method', 'pearson').lower()
+    metrics_param = request.GET.get('metrics', '')
+    requested = [m.strip() for m in metrics_param.split(',') if m.strip()]
+    
+    if method not in CORRELATION_METHODS:
+        return Response({
+            'success': False,
+            'error': {'message': f'method must be one of: {list(CORRELATION_METHODS)}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        max_lag = int(request.GET.get('max_lag', 0))
+    except ValueError:
+        max_lag = -1
+    if not 0 <= max_lag <= MAX_LAG_DAYS:
+        return Response({
+            'success': False,
+            'error': {'message': f'max_lag must be an integer from 0 to {MAX_LAG_DAYS}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    unknown = [m for m in requested if m not in SERIES_COLUMNS]
+    if unknown:
+        return Response({
+            'success': False,
+            'error': {'message': f'Unknown metrics: {unknown}. Must be among: {list(SERIES_COLUMNS)}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Aligned daily vectors from the cached series, one column per metric
+    series = user_series(request.user)
+    windows = {
+        metric: series.window(metric, date_from, date_to)
+        for metric in (requested or SERIES_COLUMNS)
+    }
+    if not requested:
+        windows = {
+            metric: window for metric, window in windows.items()
+            if np.count_nonzero(~np.isnan(window)) >= MIN_PAIRED_DAYS
+        }
+    metrics = list(windows)
+    
+    matrices = []
+    if metrics:
+        values = np.column_stack(list(windows.values()))
+        for lag, r, n in compute_correlations(values, method=method, max_lag=max_lag):
+            matrices.append({
+                'lag': lag,
+                'r': [[_float_or_none(value) for value in row] for row in r],
+                'n': n.tolist()
+            })
+    
+    return Response({
+        'success': True,
+        'data': {
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'method': method,
+            'metrics': metrics,
+            'matrices': matrices
+        }
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@with_max_points
+def metric_series(request, max_points):
+    """
+    Any combination of registry metrics (apps.analytics.metrics) as one point per day.
+    - metrics: comma-separated metric keys, e.g. food__total_protein,weight__weight (required)
+    - Shared analytics range; one query per source table whatever the metric mix
+    - Days without data report each metric's default (0 for totals, null otherwise)
+    - max_points downsamples on the first metric
+    """
+    date_from, date_to = parse_analytics_date_range(request)
+    metric_keys = list(dict.fromkeys(
+        m.strip() for m in request.GET.get('metrics', '').split(',') if m.strip()
+    ))
+    unknown = [key for key in metric_keys if key not in METRIC_REGISTRY]
+    if not metric_keys or unknown:
+        return Response({
+            'success': False,
+            'error': {'message': f'metrics must be a comma-separated list of: {list(METRIC_REGISTRY)}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    metrics = [METRIC_REGISTRY[key] for key in metric_keys]
+    values = load_metric_days(request.user.pk, metric_keys, date_from, date_to, user_timezone(request.user))
+
+    data = []
+    current_date = date_from
+    while current_date <= date_to:
+        point_data = {'date': current_date.isoformat()}
+        for metric in metrics:
+            point_data[metric.key] = metric.present(values[metric.key].get(current_date))
+        data.append(point_data)
+        current_date += timedelta(days=1)
+
+    return Response({
+        'success': True,
+        'data': {
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'metrics': [{'key': m.key, 'label': m.label, 'unit': m.unit} for m in metrics],
+            **_point_series(data, max_points, metric_keys[0])
+        }
+    })
+
+
+# Series columns /rolling/ reports when metrics is omitted
+_ROLLING_DEFAULT_METRICS = ('calories', 'protein', 'weight', 'steps', 'workout_volume')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@with_max_points
+def rolling_statistics(request, max_points):
+    """
+    Moving sums/averages and week-over-week deltas of daily series over the selected range.
+    - metrics: comma-separated series columns (default calories, protein, weight, steps,
+      workout_volume)
+    - windows: comma-separated window sizes in days, 1-MAX_WINDOW_DAYS (default 7,14,30)
+    - gaps: skip (default) | zero | carry - how days without data count (see rolling.py)
+    - max_points downsamples each metric's points on its first window's average
+    Windows reach back before date_from, so the first day in range has full windows.
+    """
+    date_from, date_to = parse_analytics_date_range(request)
+    gaps = request.GET.get('gaps', 'skip').lower()
+    if gaps not in GAP_POLICIES:
+        return Response({
+            'success': False,
+            'error': {'message': f'gaps must be one of: {list(GAP_POLICIES)}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        windows = sorted({int(w) for w in request.GET.get('windows', '').split(',') if w.strip()})
+    except ValueError:
+        windows = [0]
+    windows = windows or list(DEFAULT_WINDOWS)
+    if not all(1 <= w <= MAX_WINDOW_DAYS for w in windows):
+        return Response({
+            'success': False,
+            'error': {'message': f'windows must be integers from 1 to {MAX_WINDOW_DAYS}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    requested = [m.strip() for m in request.GET.get('metrics', '').split(',') if m.strip()]
+    unknown = [m for m in requested if m not in SERIES_COLUMNS]
+    if unknown:
+        return Response({
+            'success': False,
+            'error': {'message': f'Unknown metrics: {unknown}. Must be among: {list(SERIES_COLUMNS)}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    series = user_series(request.user)
+    # History needed for full windows (and the week-earlier average) on date_from
+    load_from = date_from - timedelta(days=max(windows + [WEEK_DAYS]) - 1 + WEEK_DAYS)
+    if gaps == 'carry' and series.start is not None:
+        # Carry the last value logged before the range, however long ago
+        load_from = min(load_from, series.start)
+    skip = (date_from - load_from).days
+    dates = [(date_from + timedelta(days=i)).isoformat() for i in range((date_to - date_from).days + 1)]
+
+    results = []
+    for metric in dict.fromkeys(requested or _ROLLING_DEFAULT_METRICS):
+        stats = rolling_stats(series.window(metric, load_from, date_to), windows, policy=gaps)
+        columns = {name: values[skip:] for name, values in stats.items()}
+        points = [
+            {'date': day, **{name: _float_or_none(values[i]) for name, values in columns.items()}}
+            for i, day in enumerate(dates)
+        ]
+        results.append({'metric': metric, **_point_series(points, max_points, f'avg_{windows[0]}')})
+
+    return Response({
+        'success': True,
+        'data': {
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'windows': windows,
+            'gaps': gaps,
+            'series': results
+        }
+    })
+
+
+# /distribution/ metric -> registry metric whose daily values are distributed
+_DAILY_DISTRIBUTIONS = {
+    'calories': 'food__total_calories',
+    'steps': 'steps__total_steps',
+    'sleep_minutes': 'sleep__total_sleep_time',
+}
+# /distribution/ metrics read per log row rather than per day
+_ROW_DISTRIBUTIONS = ('meal_time', 'rest_time', 'set_weight')
+_DISTRIBUTION_METRICS = tuple(_DAILY_DISTRIBUTIONS) + _ROW_DISTRIBUTIONS
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def value_distribution(request):
+    """
+    Histogram and p10/p50/p90 of one metric over the selected range.
+    - metric: calories | steps | sleep_minutes (one value per logged day),
+      meal_time (local hour of each food log, e.g. 12.5), rest_time (seconds per set),
+      set_weight (weight per set; requires workout_id)
+    - workout_id: limits rest_time and set_weight to one workout
+    - bins: histogram bins, 1-MAX_BINS (default DEFAULT_BINS)
+    The value column is read with one query; statistics are computed in distributions.py.
+    """
+    date_from, date_to = parse_analytics_date_range(request, default_preset='6months')
+    metric = request.GET.get('metric', '')
+    workout_id = request.GET.get('workout_id')
+
+    if metric not in _DISTRIBUTION_METRICS:
+        return Response({
+            'success': False,
+            'error': {'message': f'metric must be one of: {list(_DISTRIBUTION_METRICS)}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        bins = int(request.GET.get('bins', DEFAULT_BINS))
+    except ValueError:
+        bins = 0
+    if not 1 <= bins <= MAX_BINS:
+        return Response({
+            'success': False,
+            'error': {'message': f'bins must be an integer from 1 to {MAX_BINS}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if metric == 'set_weight' and not workout_id:
+        return Response({
+            'success': False,
+            'error': {'message': 'workout_id is required for set_weight'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    zone = user_timezone(request.user)
+    if metric in _DAILY_DISTRIBUTIONS:
+        key = _DAILY_DISTRIBUTIONS[metric]
+        values = load_metric_days(request.user.pk, [key], date_from, date_to, zone)[key].values()
+    elif metric == 'meal_time':
+        times = np.array(FoodLog.objects.filter(
+            user=request.user,
+            **day_range('date_time', zone, date_from, date_to)
+        ).annotate(
+            hour=ExtractHour('date_time', tzinfo=zone),
+            minute=ExtractMinute('date_time', tzinfo=zone)
+        ).values_list('hour', 'minute'), dtype=np.float64).reshape(-1, 2)
+        values = times[:, 0] + times[:, 1] / 60
+    else:
+        field = 'rest_time' if metric == 'rest_time' else 'weight'
+        logs = WorkoutLog.objects.filter(
+            user=request.user,
+            **day_range('date_time', zone, date_from, date_to),
+            **{f'{field}__isnull': False}
+        )
+        if workout_id:
+            logs = logs.filter(workout_id=workout_id)
+        values = logs.values_list(field, flat=True)
+
+    return Response({
+        'success': True,
+        'data': {
+            'metric': metric,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'bins': bins,
+            **distribution(values, bins)
+        }
+    })
+
+
 # ========== HEALTH ANALYTICS ==========
 
 
+# weight_progression overlay key -> cached series column (health values are whole numbers)
+_WEIGHT_PROGRESSION_HEALTH_METRICS = {
+    'stress': 'stress_level',
+    'mood': 'mood',
+    'illness': 'illness_level',
+    'blood_pressure_systolic': 'blood_pressure_systolic',
+    'blood_pressure_diastolic': 'blood_pressure_diastolic',
+}
+
+
+def _load_weight_progression_range(user, date_from, date_to, include_metrics):
+    """
+    Slice every column the weight_progression chart reads for date_from..date_to out of the
+    user's cached series, one array per column aligned with the days of the window.
+    Returns {column: array} plus the user's GoalTimeline under 'goals'.
+    """
+    series = user_series(user)
+    loaded = {
+        'weight': series.window('weight', date_from, date_to),
+        'goals': GoalTimeline.for_user(user, until=date_to),
+    }
+    if not include_metrics:
+        return loaded
+
+    for column in ('calories', 'protein', 'fat', 'carbohydrates', 'cardio_calories', 'water'):
+        loaded[column] = np.nan_to_num(series.window(column, date_from, date_to))
+    for column in _WEIGHT_PROGRESSION_HEALTH_METRICS.values():
+        loaded[column] = series.window(column, date_from, date_to)
+    # Sleep is looked up for the night before each day
+    loaded['slept_before'] = ~np.isnan(series.window(
+        'sleep_minutes', date_from - timedelta(days=1), date_to - timedelta(days=1)
+    ))
+    return loaded
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def weight_progression(request):
+@with_max_points
+def weight_progression(request, max_points):
     """
     Weight progression chart
     - Show weight across selected timeframe
@@ -1268,7 +1588,7 @@ def weight_progression(request):
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now().date()
+        date_to = local_today(request.user)
     else:
         date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
@@ -1277,29 +1597,19 @@ def weight_progression(request):
     else:
         date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
     
-    # Get weight logs
-    weight_logs = WeightLog.objects.filter(
-        user=request.user,
-        date_time__gte=date_from,
-        date_time__lte=date_to
-    ).order_by('date_time')
-    
-    # Get goals
-    goals = UserGoal.objects.filter(
-        user=request.user,
-        created_at__lte=date_to
-    ).order_by('-created_at')
+    loaded = _load_weight_progression_range(request.user, date_from, date_to, include_metrics)
+    goals = loaded['goals']
     
     # Build data points
     data = []
-    current_date = date_from
     
-    while current_date <= date_to:
-        # Get weight for this date
-        weight_log = weight_logs.filter(date_time__date=current_date).order_by('-date_time').first()
+    for offset, weight in enumerate(loaded['weight'].tolist()):
+        current_date = date_from + timedelta(days=offset)
+        if np.isnan(weight):
+            weight = None
         
         # Get goal weight (most recent goal before or on this date)
-        goal = goals.filter(created_at__lte=current_date).first() if goals.exists() else None
+        goal = goals.goal_on(current_date)
         goal_weight = float(goal.weight_goal) if goal and goal.weight_goal else None
         
         # Get lean mass and fat mass goals for ratio calculation
@@ -1308,7 +1618,7 @@ def weight_progression(request):
         
         point_data = {
             'date': current_date.isoformat(),
-            'weight': float(weight_log.weight) if weight_log else None,
+            'weight': weight,
             'goal_weight': goal_weight,
             'lean_mass_goal': lean_mass_goal,
             'fat_mass_goal': fat_mass_goal
@@ -1317,80 +1627,124 @@ def weight_progression(request):
         # Calculate fat/lean ratio if both goals exist
         if lean_mass_goal and fat_mass_goal and fat_mass_goal > 0:
             point_data['fat_lean_ratio'] = round(fat_mass_goal / lean_mass_goal, 3)
-        elif weight_log and lean_mass_goal and fat_mass_goal:
+        elif weight is not None and lean_mass_goal and fat_mass_goal:
             # Estimate from goals if current weight matches
-            estimated_fat = (weight_log.weight * (fat_mass_goal / (lean_mass_goal + fat_mass_goal))) if (lean_mass_goal + fat_mass_goal) > 0 else None
-            estimated_lean = (weight_log.weight * (lean_mass_goal / (lean_mass_goal + fat_mass_goal))) if (lean_mass_goal + fat_mass_goal) > 0 else None
+            estimated_fat = (weight * (fat_mass_goal / (lean_mass_goal + fat_mass_goal))) if (lean_mass_goal + fat_mass_goal) > 0 else None
+            estimated_lean = (weight * (lean_mass_goal / (lean_mass_goal + fat_mass_goal))) if (lean_mass_goal + fat_mass_goal) > 0 else None
             if estimated_fat and estimated_lean and estimated_lean > 0:
                 point_data['fat_lean_ratio'] = round(float(estimated_fat / estimated_lean), 3)
         
         # Add optional metrics
         if include_metrics:
             # Calories, fat, carbs, protein logged
-            food_logs = FoodLog.objects.filter(
-                user=request.user,
-                date_time__date=current_date
-            ).select_related('food').aggregate(
-                total_calories=Sum(F('food__calories') * F('servings')),
-                total_protein=Sum(F('food__protein') * F('servings')),
-                total_fat=Sum(F('food__fat') * F('servings')),
-                total_carbs=Sum(F('food__carbohydrates') * F('servings'))
-            )
-            
-            point_data['calories'] = float(food_logs['total_calories'] or 0)
-            point_data['protein'] = float(food_logs['total_protein'] or 0)
-            point_data['fat'] = float(food_logs['total_fat'] or 0)
-            point_data['carbohydrates'] = float(food_logs['total_carbs'] or 0)
+            for column in ('calories', 'protein', 'fat', 'carbohydrates'):
+                point_data[column] = float(loaded[column][offset])
             
             # Sleep the night before
-            sleep_before = SleepLog.objects.filter(
-                user=request.user,
-                date_time=current_date - timedelta(days=1)
-            ).first()
-            if sleep_before:
+            if loaded['slept_before'][offset]:
                 point_data['sleep_hours'] = None  # Would need time calculation
             
             # Health metrics
-            health = HealthMetricsLog.objects.filter(
-                user=request.user,
-                date_time=current_date
-            ).first()
-            if health:
-                if health.stress_level is not None:
-                    point_data['stress'] = health.stress_level
-                if health.mood is not None:
-                    point_data['mood'] = health.mood
-                if health.illness_level is not None:
-                    point_data['illness'] = health.illness_level
-                if health.blood_pressure_systolic is not None:
-                    point_data['blood_pressure_systolic'] = health.blood_pressure_systolic
-                if health.blood_pressure_diastolic is not None:
-                    point_data['blood_pressure_diastolic'] = health.blood_pressure_diastolic
+            for key, column in _WEIGHT_PROGRESSION_HEALTH_METRICS.items():
+                value = loaded[column][offset]
+                if not np.isnan(value):
+                    point_data[key] = int(value)
             
             # Cardio calories burned
-            cardio = CardioLog.objects.filter(
-                user=request.user,
-                date_time__date=current_date
-            ).aggregate(total_calories=Sum('calories_burned'))
-            point_data['cardio_calories'] = int(cardio['total_calories'] or 0)
+            point_data['cardio_calories'] = int(loaded['cardio_calories'][offset])
             
             # Daily water
-            water = WaterLog.objects.filter(
-                user=request.user,
-                date_time__date=current_date
-            ).aggregate(total=Sum('amount'))
-            point_data['water'] = float(water['total'] or 0)
+            point_data['water'] = float(loaded['water'][offset])
         
         data.append(point_data)
-        current_date += timedelta(days=1)
     
     return Response({
         'success': True,
         'data': {
             'date_from': date_from.isoformat(),
             'date_to': date_to.isoformat(),
-            'points': data
+            **_point_series(data, max_points, 'weight')
+        }
+    })
+
+
+# Forecast horizon in days, and how close (kg) the trend must be to count as at the goal
+_FORECAST_DEFAULT_DAYS = 90
+_FORECAST_MAX_DAYS = 365
+_GOAL_REACHED_KG = 0.25
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def weight_forecast(request):
+    """
+    Weight trend and projection toward UserGoal.weight_goal, from the stored Holt's trend
+    (apps.analytics.weight_trend) - no weight history scan.
+    - horizon: days to project, 1-365 (default 90); one projected point per week
+    - goal_status: no_data | no_goal | reached | on_track | stable | away
+    - goal_date/days_to_goal: when the current trend reaches the goal (on_track only)
+    Weights are kilograms.
+    """
+    try:
+        horizon = int(request.GET.get('horizon', _FORECAST_DEFAULT_DAYS))
+    except ValueError:
+        horizon = 0
+    if not 1 <= horizon <= _FORECAST_MAX_DAYS:
+        return Response({
+            'success': False,
+            'error': {'message': f'horizon must be an integer from 1 to {_FORECAST_MAX_DAYS}'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    zone = user_timezone(request.user)
+    today = local_today(request.user)
+    goal = latest_user_goal(request.user)
+    weight_goal = float(goal.weight_goal) if goal and goal.weight_goal else None
+    trend = WeightTrend.objects.filter(user=request.user).first()
+
+    data = {
+        'unit': 'kg',
+        'weight_goal': weight_goal,
+        'trend': None,
+        'goal_status': 'no_data',
+        'goal_date': None,
+        'days_to_goal': None,
+        'projection': []
+    }
+    if trend is not None:
+        # Projections are for the end of each local day, where the trend line is drawn
+        current = projected_weight(trend, day_bounds(today, zone)[1])
+        weekly_change = trend.slope * 7
+        data['trend'] = {
+            'weight': round(current, 2),
+            'weekly_change': round(weekly_change, 3),
+            'last_weigh_in': local_date(trend.last_date_time, zone).isoformat(),
+            'weigh_in_count': trend.weigh_in_count
         }
+        data['projection'] = [
+            {
+                'date': (today + timedelta(days=offset)).isoformat(),
+                'weight': round(current + trend.slope * offset, 2)
+            }
+            for offset in range(7, horizon + 1, 7)
+        ]
+
+        if weight_goal is None:
+            data['goal_status'] = 'no_goal'
+        elif abs(weight_goal - current) <= _GOAL_REACHED_KG:
+            data['goal_status'] = 'reached'
+        elif abs(weekly_change) < STABLE_KG_PER_WEEK:
+            data['goal_status'] = 'stable'
+        elif (weight_goal - current) * trend.slope > 0:
+            days_to_goal = int(np.ceil((weight_goal - current) / trend.slope))
+            data['goal_status'] = 'on_track'
+            data['days_to_goal'] = days_to_goal
+            data['goal_date'] = (today + timedelta(days=days_to_goal)).isoformat()
+        else:
+            data['goal_status'] = 'away'
+
+    return Response({
+        'success': True,
+        'data': data
     })
 
 
@@ -1405,7 +1759,7 @@ def health_metrics_radial(request):
     
     # Set date range defaults
     if not date_to:
-        date_to = timezone.now().date()
+        date_to = local_today(request.user)
     else:
         date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
     
@@ -1441,81 +1795,6 @@ def health_metrics_radial(request):
     })
 
 
-def _latest_user_goal(user):
-    return UserGoal.objects.filter(user=user).order_by('-updated_at', '-created_at').first()
-
-
-def _weight_kg_latest(user):
-    """Most recent weight log in kilograms, or None."""
-    wl = WeightLog.objects.filter(user=user).order_by('-date_time', '-created_at').first()
-    if not wl or wl.weight is None:
-        return None
-    w = float(wl.weight)
-    unit = (wl.weight_unit or 'kg').lower()
-    if unit in ('lb', 'lbs', 'pound', 'pounds'):
-        return round(w * 0.45359237, 2)
-    return round(w, 2)
-
-
-def _steps_to_walking_kcal(steps, height_cm, weight_kg):
-    """
-    Approximate walking kcal from steps using stride length from height (m) and body mass.
-    stride ≈ 0.414 × height_m; energy ≈ 0.7 kcal/kg/km (walking).
-    """
-    if not steps or steps <= 0 or not height_cm or not weight_kg:
-        return 0.0
-    height_m = float(height_cm) / 100.0
-    stride_m = height_m * 0.414
-    distance_km = (steps * stride_m) / 1000.0
-    return round(distance_km * float(weight_kg) * 0.7, 1)
-
-
-# Food-log field → UserGoal attribute → display label, unit (home extended nutrients).
-_HOME_EXTENDED_NUTRIENT_SPECS = (
-    ('fiber', 'fiber_goal', 'Fiber', 'g'),
-    ('sodium', 'sodium_goal', 'Sodium', 'mg'),
-    ('sugar', 'sugar_goal', 'Sugar', 'g'),
-    ('saturated_fat', 'saturated_fat_goal', 'Sat. fat', 'g'),
-    ('trans_fat', 'trans_fat_goal', 'Trans fat', 'g'),
-    ('calcium', 'calcium_goal', 'Calcium', 'mg'),
-    ('iron', 'iron_goal', 'Iron', 'mg'),
-    ('magnesium', 'magnesium_goal', 'Magnesium', 'mg'),
-    ('cholesterol', 'cholesterol_goal', 'Cholesterol', 'mg'),
-    ('vitamin_a', 'vitamin_a_goal', 'Vitamin A', 'µg'),
-    ('vitamin_c', 'vitamin_c_goal', 'Vitamin C', 'mg'),
-    ('vitamin_d', 'vitamin_d_goal', 'Vitamin D', 'µg'),
-    ('caffeine', 'caffeine_goal', 'Caffeine', 'mg'),
-)
-
-# Home dashboard "today" and day windows use US Eastern so the calendar matches EST/EDT
-# regardless of Django TIME_ZONE (often UTC on servers).
-HOME_DASHBOARD_TZ = ZoneInfo('America/New_York')
-
-
-def _home_dashboard_today_date():
-    return timezone.now().astimezone(HOME_DASHBOARD_TZ).date()
-
-
-def _eastern_day_datetime_bounds(target_date: date):
-    """Inclusive start and exclusive end (aware) for one calendar day in Eastern time."""
-    start = datetime.combine(target_date, time.min, tzinfo=HOME_DASHBOARD_TZ)
-    end = start + timedelta(days=1)
-    return start, end
-
-
-def _activation_actual_by_muscle(user, window_start, window_end):
-    """Sum WorkoutMuscle activation_rating for workout logs in [window_start, window_end)."""
-    logs = WorkoutLog.objects.filter(
-        user=user, date_time__gte=window_start, date_time__lt=window_end
-    ).select_related('workout').prefetch_related('workout__workoutmuscle_set__muscle')
-    actual = {}
-    for log in logs:
-        for wm in log.workout.workoutmuscle_set.all():
-            mid = wm.muscle.muscles_id
-            actual[mid] = actual.get(mid, 0) + int(wm.activation_rating or 0)
-    return actual
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def home_dashboard(request):
@@ -1524,8 +1803,9 @@ def home_dashboard(request):
     calorie budget including cardio and estimated walking burn from steps (height + latest weight),
     and which additional trackers have no entry today.
 
-    Default calendar day is US Eastern (America/New_York, EST/EDT). Optional ?date=YYYY-MM-DD
-    selects that Eastern calendar day; datetime logs are filtered by the Eastern midnight-to-midnight window.
+    Default calendar day is today in the user's timezone (User.timezone). Optional ?date=YYYY-MM-DD
+    selects another day; datetime logs are filtered by that day's local midnight-to-midnight window.
+    Served from a per-day HomeDashboardSnapshot; only sections invalidated by writes are rebuilt.
     """
     date_str = request.GET.get('date')
     if date_str:
@@ -1537,221 +1817,9 @@ def home_dashboard(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
     else:
-        target_date = _home_dashboard_today_date()
-
-    day_start, day_end = _eastern_day_datetime_bounds(target_date)
-
-    user = request.user
-    goals = _latest_user_goal(user)
-
-    goal_macros = {
-        'calories': int(goals.calories_goal) if goals and goals.calories_goal is not None else None,
-        'protein': float(goals.protein_goal) if goals and goals.protein_goal is not None else None,
-        'carbohydrates': float(goals.carbohydrates_goal) if goals and goals.carbohydrates_goal is not None else None,
-        'fat': float(goals.fat_goal) if goals and goals.fat_goal is not None else None,
-    }
-
-    food_totals = FoodLog.objects.filter(
-        user=user, date_time__gte=day_start, date_time__lt=day_end
-    ).aggregate(
-        calories=Sum(F('food__calories') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        protein=Sum(F('food__protein') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        carbohydrates=Sum(F('food__carbohydrates') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        fat=Sum(F('food__fat') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-    )
-    consumed = {
-        'calories': round(float(food_totals['calories'] or 0), 1),
-        'protein': round(float(food_totals['protein'] or 0), 1),
-        'carbohydrates': round(float(food_totals['carbohydrates'] or 0), 1),
-        'fat': round(float(food_totals['fat'] or 0), 1),
-    }
-
-    ext_totals = FoodLog.objects.filter(
-        user=user, date_time__gte=day_start, date_time__lt=day_end
-    ).aggregate(
-        fiber=Sum(F('food__fiber') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        sodium=Sum(F('food__sodium') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        sugar=Sum(F('food__sugar') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        saturated_fat=Sum(F('food__saturated_fat') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        trans_fat=Sum(F('food__trans_fat') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        calcium=Sum(F('food__calcium') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        iron=Sum(F('food__iron') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        magnesium=Sum(F('food__magnesium') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        cholesterol=Sum(F('food__cholesterol') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        vitamin_a=Sum(F('food__vitamin_a') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        vitamin_c=Sum(F('food__vitamin_c') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        vitamin_d=Sum(F('food__vitamin_d') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        caffeine=Sum(F('food__caffeine') * F('servings'), output_field=DecimalField(max_digits=14, decimal_places=4)),
-        tokens_used=Sum('tokens_used'),
-        cost_sum=Sum(
-            F('servings') * Coalesce(F('food__cost'), Value(Decimal('0'))),
-            output_field=DecimalField(max_digits=14, decimal_places=4),
-        ),
-    )
-
-    extended_nutrients = []
-    if goals:
-        for field_key, attr_goal, label, unit in _HOME_EXTENDED_NUTRIENT_SPECS:
-            gv = getattr(goals, attr_goal, None)
-            if gv is None:
-                continue
-            goal_f = float(gv)
-            consumed_f = round(float(ext_totals.get(field_key) or 0), 1)
-            extended_nutrients.append({
-                'key': field_key,
-                'label': label,
-                'goal': round(goal_f, 1),
-                'consumed': consumed_f,
-                'remaining': round(goal_f - consumed_f, 1),
-                'unit': unit,
-            })
-        if goals.cost_goal is not None:
-            cg = float(goals.cost_goal)
-            cc = round(float(ext_totals.get('cost_sum') or 0), 1)
-            extended_nutrients.append({
-                'key': 'cost',
-                'label': 'Cost',
-                'goal': round(cg, 1),
-                'consumed': cc,
-                'remaining': round(cg - cc, 1),
-                'unit': '$',
-            })
-        if goals.tokens_goal is not None:
-            tg = int(goals.tokens_goal)
-            tu = int(ext_totals.get('tokens_used') or 0)
-            extended_nutrients.append({
-                'key': 'tokens',
-                'label': 'Tokens',
-                'goal': float(tg),
-                'consumed': float(tu),
-                'remaining': float(tg - tu),
-                'unit': '',
-            })
-
-    macro_remaining = {}
-    for key in ('protein', 'carbohydrates', 'fat'):
-        g = goal_macros.get(key)
-        if g is not None:
-            macro_remaining[key] = round(g - consumed[key], 1)
-        else:
-            macro_remaining[key] = None
-
-    cardio_sum = CardioLog.objects.filter(
-        user=user, date_time__gte=day_start, date_time__lt=day_end
-    ).aggregate(
-        total=Sum('calories_burned')
-    )
-    cardio_calories = int(cardio_sum['total'] or 0)
-
-    steps_sum = StepsLog.objects.filter(
-        user=user, date_time__gte=day_start, date_time__lt=day_end
-    ).aggregate(
-        total=Sum('steps')
-    )
-    steps_today = int(steps_sum['total'] or 0)
-
-    height_cm = float(user.height) if user.height else None
-    weight_kg = _weight_kg_latest(user)
-    steps_calories = _steps_to_walking_kcal(steps_today, height_cm, weight_kg)
-
-    calorie_remaining = None
-    if goal_macros['calories'] is not None:
-        calorie_remaining = round(
-            goal_macros['calories']
-            - consumed['calories']
-            + cardio_calories
-            + steps_calories,
-            1,
-        )
-
-    split_section = {
-        'active_split': None,
-        'current_split_day': None,
-        'muscle_rows': [],
-    }
-    active_split = Split.objects.filter(user=user, start_date__lte=target_date).order_by('-start_date').first()
-    if active_split:
-        split_days = active_split.splitday_set.all().order_by('day_order')
-        if split_days.exists() and active_split.start_date:
-            days_since = (target_date - active_split.start_date).days
-            idx = days_since % split_days.count()
-            current_day = split_days[idx]
-            targets = SplitDayTarget.objects.filter(split_day=current_day).select_related('muscle')
-            actual_map = _activation_actual_by_muscle(user, day_start, day_end)
-            rows = []
-            for t in targets:
-                mid = t.muscle.muscles_id
-                tgt = int(t.target_activation or 0)
-                act = int(actual_map.get(mid, 0))
-                rows.append({
-                    'muscle_id': mid,
-                    'muscle_name': t.muscle.muscle_name,
-                    'target_activation': tgt,
-                    'done_activation': act,
-                    'remaining_activation': max(0, tgt - act),
-                })
-            split_section = {
-                'active_split': {
-                    'splits_id': active_split.splits_id,
-                    'split_name': active_split.split_name,
-                    'start_date': active_split.start_date.isoformat() if active_split.start_date else None,
-                },
-                'current_split_day': {
-                    'split_days_id': current_day.split_days_id,
-                    'day_name': current_day.day_name,
-                    'day_order': current_day.day_order,
-                },
-                'muscle_rows': rows,
-            }
-
-    tracker_logged = {
-        'weight': WeightLog.objects.filter(
-            user=user, date_time__gte=day_start, date_time__lt=day_end
-        ).exists(),
-        'water': WaterLog.objects.filter(
-            user=user, date_time__gte=day_start, date_time__lt=day_end
-        ).exists(),
-        'body_measurement': BodyMeasurementLog.objects.filter(
-            user=user, date_time__gte=day_start, date_time__lt=day_end
-        ).exists(),
-        'steps': StepsLog.objects.filter(
-            user=user, date_time__gte=day_start, date_time__lt=day_end
-        ).exists(),
-        'cardio': CardioLog.objects.filter(
-            user=user, date_time__gte=day_start, date_time__lt=day_end
-        ).exists(),
-        'sleep': SleepLog.objects.filter(user=user, date_time=target_date).exists(),
-        'health_metrics': HealthMetricsLog.objects.filter(user=user, date_time=target_date).exists(),
-    }
-    tracker_labels = {
-        'weight': 'Weight',
-        'water': 'Water',
-        'body_measurement': 'Body measurements',
-        'steps': 'Steps',
-        'cardio': 'Cardio',
-        'sleep': 'Sleep',
-        'health_metrics': 'Health metrics',
-    }
-    trackers_not_logged = [
-        {'id': k, 'label': tracker_labels[k]}
-        for k, v in tracker_logged.items() if not v
-    ]
+        target_date = home_dashboard_today_date(request.user)
 
     return Response({
         'success': True,
-        'data': {
-            'date': target_date.isoformat(),
-            'goals': goal_macros,
-            'consumed': consumed,
-            'macro_remaining': macro_remaining,
-            'cardio_calories_burned': cardio_calories,
-            'steps_today': steps_today,
-            'steps_calories_estimate': steps_calories,
-            'calorie_remaining': calorie_remaining,
-            'split': split_section,
-            'trackers_not_logged': trackers_not_logged,
-            'weight_kg_used_for_steps': weight_kg,
-            'height_cm': height_cm,
-            'extended_nutrients': extended_nutrients,
-        },
+        'data': home_dashboard_payload(request.user, target_date),
     })
@@ -0,0 +1,137 @@
+"""
+Weight trend - Holt's linear exponential smoothing over a user's weigh-ins, stored as state.
+
+WeightTrend keeps a smoothed weight (level, kg) and its rate of change (slope, kg/day) as of
+the newest weigh-in folded in. A weigh-in logged after that one advances the state in O(1)
+(record_weigh_in, called from apps.analytics.signals); edits, deletes and back-dated logs
+change history the state has already absorbed, so those rebuild the user's trend from their
+weigh-ins with one ordered query. Forecasts read the single WeightTrend row.
+
+Weigh-ins are irregular, so each step projects the level across the gap before blending the
+new weight in, and the slope update divides by the gap (at least MIN_GAP_DAYS, so two
+weigh-ins minutes apart don't read as a steep rate).
+"""
+
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.logging.models import WeightLog
+from .models import WeightTrend
+
+# Level smoothing (the Hacker's Diet trend line uses 0.1) and slope smoothing
+ALPHA = 0.1
+BETA = 0.1
+MIN_GAP_DAYS = 1.0
+# Weekly changes below this many kg count as holding steady
+STABLE_KG_PER_WEEK = 0.1
+
+_KG_PER_POUND = 0.45359237
+_SECONDS_PER_DAY = 86400.0
+
+
+def weight_in_kg(weight, unit):
+    """A logged weight in kilograms; unit is the WeightLog.weight_unit it was entered in."""
+    weight = float(weight)
+    if (unit or 'kg').lower() in ('lb', 'lbs', 'pound', 'pounds'):
+        return weight * _KG_PER_POUND
+    return weight
+
+
+def advance(trend, weight_kg, at):
+    """Fold one weigh-in (kg, at a timestamp not before trend.last_date_time) into trend."""
+    if not trend.weigh_in_count:
+        trend.level, trend.slope = weight_kg, 0.0
+    else:
+        gap = (at - trend.last_date_time).total_seconds() / _SECONDS_PER_DAY
+        level = ALPHA * weight_kg + (1 - ALPHA) * (trend.level + trend.slope * gap)
+        trend.slope = BETA * (level - trend.level) / max(gap, MIN_GAP_DAYS) + (1 - BETA) * trend.slope
+        trend.level = level
+    trend.last_date_time = at
+    trend.weigh_in_count += 1
+    return trend
+
+
+def projected_weight(trend, at):
+    """The trend's weight (kg) extrapolated to timestamp at."""
+    return trend.level + trend.slope * (at - trend.last_date_time).total_seconds() / _SECONDS_PER_DAY
+
+
+def _fold(user_id, weigh_ins):
+    """A new WeightTrend for user_id from (weight, unit, date_time) rows in time order."""
+    trend = WeightTrend(user_id=user_id, level=0.0, slope=0.0, weigh_in_count=0)
+    for weight, unit, at in weigh_ins:
+        advance(trend, weight_in_kg(weight, unit), at)
+    return trend
+
+
+def rebuild_weight_trend(user_id):
+    """Recompute one user's trend from all their weigh-ins; returns it, or None without any."""
+    weigh_ins = WeightLog.objects.filter(user_id=user_id).order_by(
+        'date_time', 'pk'
+    ).values_list('weight', 'weight_unit', 'date_time')
+    trend = _fold(user_id, weigh_ins)
+    with transaction.atomic():
+        WeightTrend.objects.filter(user_id=user_id).delete()
+        if not trend.weigh_in_count:
+            return None
+        trend.save()
+    return trend
+
+
+def _aware(at):
+    return timezone.make_aware(at) if timezone.is_naive(at) else at
+
+
+def record_weigh_in(log):
+    """
+    Update the owner's trend after a new weigh-in: O(1) when it is the newest, otherwise
+    (back-dated) a rebuild.
+    """
+    return record_weigh_ins(log.user_id, [log])
+
+
+def record_weigh_ins(user_id, logs):
+    """
+    Update a user's trend after new weigh-ins (e.g. a bulk insert, which sends no signals):
+    folded in time order when all are newer than the trend, otherwise a rebuild.
+    """
+    logs = sorted(logs, key=lambda log: _aware(log.date_time))
+    if not logs:
+        return WeightTrend.objects.filter(user_id=user_id).first()
+    trend = WeightTrend.objects.filter(user_id=user_id).first()
+    if trend is None or _aware(logs[0].date_time) < trend.last_date_time:
+        return rebuild_weight_trend(user_id)
+    for log in logs:
+        advance(trend, weight_in_kg(log.weight, log.weight_unit), _aware(log.date_time))
+    trend.save()
+    return trend
+
+
+def backfill_weight_trends(user_ids=None):
+    """
+    Rebuild WeightTrend from scratch with one ordered query over WeightLog.
+
+    user_ids: optional iterable restricting the rebuild to those users.
+    Returns the number of trend rows written.
+    """
+    trends = WeightTrend.objects.all()
+    weigh_ins = WeightLog.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        trends = trends.filter(user_id__in=user_ids)
+        weigh_ins = weigh_ins.filter(user_id__in=user_ids)
+    rows = weigh_ins.order_by('user_id', 'date_time', 'pk').values_list(
+        'user_id', 'weight', 'weight_unit', 'date_time'
+    )
+
+    with transaction.atomic():
+        trends.delete()
+        built = [
+            _fold(user_id, (row[1:] for row in user_rows))
+            for user_id, user_rows in groupby(rows.iterator(), key=itemgetter(0))
+        ]
+        WeightTrend.objects.bulk_create(built)
+    return len(built)
@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.db import transaction
 from apps.users.models import User, AccessLevel, Unit, ActivityLevel, UserGoal, InviteKey
+from apps.users.timezones import is_valid_timezone
 from apps.workouts.models import Muscle, MuscleLog
 
 
@@ -116,9 +117,14 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = ('user_id', 'username', 'email', 'access_level', 'height', 'birthday', 'gender', 'created_at')
+        fields = ('user_id', 'username', 'email', 'access_level', 'height', 'birthday', 'gender', 'timezone', 'created_at')
         read_only_fields = ('user_id', 'created_at')
 
+    def validate_timezone(self, value):
+        if not is_valid_timezone(value):
+            raise serializers.ValidationError("Unknown timezone; use an IANA name such as Europe/Berlin.")
+        return value
+
 
 class ChangePasswordSerializer(serializers.Serializer):
     """Serializer for password change"""
@@ -0,0 +1,66 @@
+"""
+Tests for the batch endpoint: sub-requests run in order with per-item status codes.
+"""
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.workouts.models import Workout
+
+User = get_user_model()
+
+
+class BatchEndpointTest(APITestCase):
+    url = '/api/batch/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='batchuser', email='b@x.com', password='testpass123')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        Workout.objects.create(user=self.user, workout_name='Row', type='cable')
+
+    def test_runs_sub_requests_in_order(self):
+        response = self.client.post(self.url, {'requests': [
+            {'id': 'workouts', 'method': 'GET', 'path': '/api/workouts/'},
+            {'id': 'split', 'path': '/api/workouts/current-split-day/', 'query': {'date': date.today().isoformat()}},
+            {'id': 'missing', 'path': '/api/workouts/current-split-day/'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['data']
+        self.assertEqual([r['id'] for r in results], ['workouts', 'split', 'missing'])
+        self.assertEqual([r['status'] for r in results], [200, 200, 400])
+        self.assertEqual(results[0]['body']['data'][0]['workout_name'], 'Row')
+        self.assertIsNone(results[1]['body']['data']['active_split'])
+
+    def test_query_in_path_is_kept(self):
+        response = self.client.post(self.url, {'requests': [
+            {'path': f'/api/workouts/current-split-day/?date={date.today().isoformat()}'},
+        ]}, format='json')
+        self.assertEqual(response.data['data'][0]['status'], 200)
+
+    def test_rejected_items_get_their_own_status(self):
+        response = self.client.post(self.url, {'requests': [
+            {'method': 'DELETE', 'path': '/api/workouts/'},
+            {'path': '/api/nope/'},
+            {'path': '/api/batch/'},
+            {'path': '/admin/'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['data']], [405, 404, 400, 400])
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_size_cap(self):
+        response = self.client.post(self.url, {
+            'requests': [{'path': '/api/workouts/'}] * 3
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.post(self.url, {'requests': [{'path': '/api/workouts/'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
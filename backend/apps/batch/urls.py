@@ -0,0 +1,10 @@
+"""
+URL configuration for batch app
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.batch, name='batch'),
+]
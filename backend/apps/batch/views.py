@@ -0,0 +1,138 @@
+"""
+Batch Views - run several read-only API calls in one HTTP request
+
+The app's startup burst (profile, goals, home dashboard, streaks, splits, ...) otherwise pays
+for JWT decoding, a user lookup and an ApiUsageLog insert per call. POST /api/batch/
+authenticates once and dispatches each sub-request in-process through the URL resolver,
+bypassing the middleware stack; the batch itself is logged as a single API call.
+"""
+
+import json
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.analytics.models import ErrorLog
+
+# Sub-requests may only read; writes keep going through their own endpoints
+ALLOWED_METHODS = ('GET',)
+BATCH_PATH_PREFIX = '/api/'
+
+
+def _sub_request(request, method, path, query):
+    """Build a bodiless WSGIRequest for one sub-request, carrying the batch's headers."""
+    environ = request.META.copy()
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '0',
+        'wsgi.input': BytesIO(b''),
+    })
+    environ.pop('CONTENT_TYPE', None)
+    sub = WSGIRequest(environ)
+    sub.user = request.user
+    # DRF honours these in Request.__init__, so sub-views reuse the batch's authentication
+    # instead of decoding the JWT and looking the user up again.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _response_body(response):
+    """Payload of a sub-view response: DRF data as-is, otherwise decoded JSON content."""
+    if hasattr(response, 'data'):
+        return response.data
+    try:
+        return json.loads(response.content.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _run_sub_request(request, item):
+    """Dispatch one batch item; returns (status_code, body)."""
+    if not isinstance(item, dict):
+        return status.HTTP_400_BAD_REQUEST, {'error': {'message': 'Each request must be an object'}}
+
+    method = str(item.get('method', 'GET')).upper()
+    if method not in ALLOWED_METHODS:
+        return status.HTTP_405_METHOD_NOT_ALLOWED, {
+            'error': {'message': f'method must be one of: {list(ALLOWED_METHODS)}'}
+        }
+
+    raw_path = item.get('path')
+    if not isinstance(raw_path, str):
+        return status.HTTP_400_BAD_REQUEST, {'error': {'message': 'path is required'}}
+    url = urlsplit(raw_path)
+    path = url.path
+    if not path.startswith(BATCH_PATH_PREFIX) or path.startswith(request.path):
+        return status.HTTP_400_BAD_REQUEST, {
+            'error': {'message': f'path must be an API path under {BATCH_PATH_PREFIX} (and not the batch endpoint)'}
+        }
+
+    query = item.get('query') or {}
+    if not isinstance(query, dict):
+        return status.HTTP_400_BAD_REQUEST, {'error': {'message': 'query must be an object'}}
+    query_string = '&'.join(filter(None, [url.query, urlencode(query, doseq=True)]))
+
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {'error': {'message': 'Not found'}}
+
+    sub = _sub_request(request, method, path, query_string)
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+    except Exception as e:
+        # Mirror LoggingMiddleware.process_exception, which never sees sub-requests
+        ErrorLog.objects.create(
+            user=request.user,
+            error_type=type(e).__name__,
+            error_message=str(e),
+            user_input=json.dumps({'method': method, 'path': path, 'query': query_string})[:1000],
+        )
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {'error': {'message': 'Internal server error'}}
+    return response.status_code, _response_body(response)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """
+    Run up to BATCH_MAX_REQUESTS GET sub-requests with a single authentication pass.
+
+    Body: {"requests": [{"method": "GET", "path": "/api/...", "query": {...}, "id": "optional"}]}
+    Response data is one {"id", "status", "body"} entry per sub-request, in order; a failing
+    sub-request does not fail the batch.
+    """
+    items = request.data.get('requests') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({
+            'success': False,
+            'error': {'message': 'requests must be a non-empty list'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    max_size = settings.BATCH_MAX_REQUESTS
+    if len(items) > max_size:
+        return Response({
+            'success': False,
+            'error': {'message': f'A batch may contain at most {max_size} requests'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    results = []
+    for item in items:
+        status_code, body = _run_sub_request(request, item)
+        results.append({
+            'id': item.get('id') if isinstance(item, dict) else None,
+            'status': status_code,
+            'body': body,
+        })
+
+    return Response({'success': True, 'data': results})
@@ -25,6 +25,7 @@ from django.apps import apps
 from django.core.paginator import Paginator
 from apps.users.models import User
 from apps.analytics.models import ApiUsageLog, ErrorLog
+from apps.logging.pagination import keyset_page
 
 logger = logging.getLogger(__name__)
 
@@ -608,10 +609,59 @@ class DataAccessService:
             self._log_data_access(table_name, {'action': 'schema'}, False, 0, error_msg)
             raise ValueError(error_msg)
     
+    def _cursor_ordering(self, queryset: models.QuerySet) -> Tuple[str, ...]:
+        """
+        Keyset ordering for a sorted queryset: its sort field, then pk in the same direction.
+        Foreign keys sort by their column (user_id), so the cursor holds the id, not the row.
+
+        Raises:
+            ValidationError: If the sort field is nullable (NULLs cannot be seeked past)
+        """
+        ordering = list(queryset.query.order_by) or ['pk']
+        name = ordering[0].lstrip('-')
+        if name == 'pk':
+            return tuple(ordering)
+        field = queryset.model._meta.get_field(name)
+        if field.null:
+            raise ValidationError(f"Cursor pagination cannot sort by nullable field '{name}'")
+        direction = '-' if ordering[0].startswith('-') else ''
+        return (direction + field.attname, direction + 'pk')
+    
+    def _serialize_row(self, model, obj) -> Dict[str, Any]:
+        """Convert one model instance to a JSON-ready dict of its concrete fields."""
+        row = {}
+        for field in model._meta.get_fields():
+            if field.many_to_many or field.one_to_many:
+                continue  # Skip reverse relations
+            
+            try:
+                value = getattr(obj, field.name, None)
+                
+                # Handle different field types
+                if value is None:
+                    row[field.name] = None
+                elif isinstance(field, models.ForeignKey):
+                    # Include both ID and string representation
+                    row[field.name] = str(value) if value else None
+                    row[f"{field.name}_id"] = value.pk if value else None
+                elif isinstance(field, (models.DateField, models.DateTimeField)):
+                    row[field.name] = value.isoformat() if value else None
+                elif isinstance(field, models.DecimalField):
+                    row[field.name] = float(value) if value else None
+                elif isinstance(field, models.JSONField):
+                    row[field.name] = value
+                else:
+                    row[field.name] = value
+            except Exception as e:
+                logger.warning(f"Error serializing field {field.name}: {e}")
+                row[field.name] = None
+        return row
+    
     def get_table_data(self, table_name: str, filters: Optional[Dict[str, Any]] = None,
                       sort_by: Optional[str] = None, sort_order: str = 'asc',
                       search: Optional[str] = None, page: int = 1, 
-                      page_size: int = 20) -> Dict[str, Any]:
+                      page_size: int = 20, use_cursor: bool = False,
+                      cursor: Optional[str] = None, include_total: bool = False) -> Dict[str, Any]:
         """
         Get data from a table with filtering, sorting, searching, and pagination.
         
@@ -626,11 +676,15 @@ class DataAccessService:
             search: Search term for full-text search
             page: Page number for pagination (1-indexed)
             page_size: Number of results per page
+            use_cursor: Keyset pagination instead of pages: no OFFSET, no COUNT
+            cursor: next_cursor of the previous keyset page (None for the first)
+            include_total: Count matching rows in keyset mode (page mode always counts)
             
         Returns:
             Dictionary containing:
             - data: List of row dictionaries
-            - pagination: Pagination metadata (total, pages, current_page, has_next, has_previous)
+            - pagination: Pagination metadata (total, pages, current_page, has_next, has_previous;
+              in keyset mode page_size, next_cursor, has_next and total if requested)
             - filters_applied: Filters that were applied
             - sort_applied: Sorting that was applied
             
@@ -671,63 +725,49 @@ class DataAccessService:
                 # Default sorting by primary key
                 queryset = queryset.order_by('pk')
             
-            # Count total results before pagination
-            total_count = queryset.count()
-            
-            # Apply pagination
-            paginator = Paginator(queryset, page_size)
-            
-            # Validate page number
-            if page < 1:
-                page = 1
-            if page > paginator.num_pages and paginator.num_pages > 0:
-                page = paginator.num_pages
-            
-            page_obj = paginator.get_page(page)
+            if use_cursor:
+                total_count = queryset.count() if include_total else None
+                try:
+                    rows, next_cursor = keyset_page(queryset, self._cursor_ordering(queryset), cursor, page_size)
+                except ValueError as e:
+                    raise ValidationError(str(e))
+                pagination = {
+                    'page_size': page_size,
+                    'next_cursor': next_cursor,
+                    'has_next': next_cursor is not None,
+                }
+                if total_count is not None:
+                    pagination['total'] = total_count
+            else:
+                # Count total results before pagination
+                total_count = queryset.count()
+                
+                # Apply pagination
+                paginator = Paginator(queryset, page_size)
+                
+                # Validate page number
+                if page < 1:
+                    page = 1
+                if page > paginator.num_pages and paginator.num_pages > 0:
+                    page = paginator.num_pages
+                
+                rows = paginator.get_page(page)
+                pagination = {
+                    'total': total_count,
+                    'pages': paginator.num_pages,
+                    'current_page': page,
+                    'page_size': page_size,
+                    'has_next': rows.has_next(),
+                    'has_previous': rows.has_previous(),
+                }
             
             # Serialize data
-            data = []
-            for obj in page_obj:
-                row = {}
-                for field in model._meta.get_fields():
-                    if field.many_to_many or field.one_to_many:
-                        continue  # Skip reverse relations
-                    
-                    try:
-                        value = getattr(obj, field.name, None)
-                        
-                        # Handle different field types
-                        if value is None:
-                            row[field.name] = None
-                        elif isinstance(field, models.ForeignKey):
-                            # Include both ID and string representation
-                            row[field.name] = str(value) if value else None
-                            row[f"{field.name}_id"] = value.pk if value else None
-                        elif isinstance(field, (models.DateField, models.DateTimeField)):
-                            row[field.name] = value.isoformat() if value else None
-                        elif isinstance(field, models.DecimalField):
-                            row[field.name] = float(value) if value else None
-                        elif isinstance(field, models.JSONField):
-                            row[field.name] = value
-                        else:
-                            row[field.name] = value
-                    except Exception as e:
-                        logger.warning(f"Error serializing field {field.name}: {e}")
-                        row[field.name] = None
-                
-                data.append(row)
+            data = [self._serialize_row(model, obj) for obj in rows]
             
             # Build response
             response = {
                 'data': data,
-                'pagination': {
-                    'total': total_count,
-                    'pages': paginator.num_pages,
-                    'current_page': page,
-                    'page_size': page_size,
-                    'has_next': page_obj.has_next(),
-                    'has_previous': page_obj.has_previous(),
-                },
+                'pagination': pagination,
                 'filters_applied': filters or {},
                 'sort_applied': {
                     'field': sort_by,
@@ -13,6 +13,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
+from apps.logging.pagination import CURSOR_PARAM, cursor_requested, total_requested
 from .services import DataAccessService
 import logging
 
@@ -119,9 +120,16 @@ def get_table_data(request, table_name):
             "sort_order": "asc",                 // 'asc' or 'desc'
             "search": "search term",             // Full-text search
             "page": 1,                           // Page number (1-indexed)
-            "page_size": 20                      // Results per page
+            "page_size": 20,                     // Results per page
+            "pagination": "cursor",              // Optional: keyset pages instead of page numbers
+            "cursor": "...",                     // next_cursor of the previous keyset page
+            "include_total": false               // Count matching rows in cursor mode
         }
     
+    Cursor mode skips the OFFSET scan and the COUNT of page mode; its pagination metadata is
+    {page_size, next_cursor, has_next} plus total when include_total is true. Cursor mode
+    cannot sort by a nullable field.
+    
     Access Control:
     - admin: All data from all tables
     - user: Own data + public data (tables with make_public=True)
@@ -177,7 +185,10 @@ def get_table_data(request, table_name):
             sort_order=sort_order,
             search=search,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            use_cursor=cursor_requested(request.data),
+            cursor=request.data.get(CURSOR_PARAM),
+            include_total=total_requested(request.data)
         )
         
         return Response({
@@ -8,7 +8,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from apps.users.models import AccessLevel
 from apps.foods.models import Food
 from apps.logging.models import FoodLog
-from datetime import datetime
+from django.utils import timezone
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 User = get_user_model()
@@ -190,6 +191,34 @@ class FoodLogSerializerTest(TestCase):
         self.assertIn('data', response_data)
         self.assertIn('logs', response_data['data'])
 
+    
+    def test_food_log_cursor_pagination(self):
+        """pagination=cursor pages food logs newest first without a COUNT, total on request."""
+        now = timezone.now().replace(microsecond=0)
+        for hours_ago in (3, 3, 2, 1, 1):
+            FoodLog.objects.create(user=self.user, food=self.food, servings=1, measurement='g',
+                                   date_time=now - timedelta(hours=hours_ago))
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}', 'HTTP_HOST': 'localhost'}
+        seen, cursor = [], None
+        while True:
+            params = {'pagination': 'cursor', 'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get('/api/foods/logs/', params, **auth).json()['data']
+            self.assertNotIn('total', data['pagination'])
+            seen += [log['macro_log_id'] for log in data['logs']]
+            cursor = data['pagination']['next_cursor']
+            if not cursor:
+                break
+        expected = list(FoodLog.objects.filter(user=self.user).order_by('-date_time', '-pk')
+                        .values_list('macro_log_id', flat=True))
+        self.assertEqual(seen, expected)
+        
+        response = self.client.get('/api/foods/logs/', {'pagination': 'cursor', 'include_total': 'true'}, **auth)
+        self.assertEqual(response.json()['data']['pagination']['total'], 5)
+        response = self.client.get('/api/foods/?cursor=garbage', **auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class FoodModelTest(TestCase):
     """Basic food model tests"""
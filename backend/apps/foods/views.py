@@ -13,11 +13,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q, Count
-from django.db.models.functions import TruncDate, ExtractHour
+from django.db.models.functions import ExtractHour
 from django.utils import timezone
 from datetime import timedelta
 from .models import Food, Meal, MealFood
 from apps.logging.models import FoodLog
+from apps.logging.pagination import (
+    CURSOR_PARAM, DATE_TIME_ORDERING, cursor_requested, keyset_page, total_requested,
+)
+from apps.users.timezones import LocalDate, local_date, user_timezone
 from .serializers import (
     FoodSerializer,
     FoodCreateSerializer,
@@ -35,7 +39,7 @@ def _food_visible_to_user(food, user):
     """Public foods, foods the user created, or foods they have logged."""
     if food.make_public:
         return True
-    if getattr(food, 'created_by_id', None) and food.created_by_id == user.id:
+    if getattr(food, 'created_by_id', None) and food.created_by_id == user.pk:
         return True
     return FoodLog.objects.filter(user=user, food_id=food.food_id).exists()
 
@@ -44,7 +48,30 @@ def _user_may_edit_food(food, user):
     """Only the creator may edit/delete when creator is set; legacy rows (no creator) stay editable."""
     if food.created_by_id is None:
         return True
-    return food.created_by_id == user.id
+    return food.created_by_id == user.pk
+
+
+def _cursor_page_response(request, queryset, ordering, page_size, serializer_class, key):
+    """
+    Keyset page for `pagination=cursor` list requests: no OFFSET and no COUNT unless
+    `include_total=true` (apps.logging.pagination).
+    """
+    total = queryset.count() if total_requested(request.GET) else None
+    try:
+        rows, next_cursor = keyset_page(queryset, ordering, request.GET.get(CURSOR_PARAM), page_size)
+    except ValueError as e:
+        return Response({
+            'error': {'message': str(e)}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    pagination = {'page_size': page_size, 'next_cursor': next_cursor}
+    if total is not None:
+        pagination['total'] = total
+    return Response({
+        'data': {
+            key: serializer_class(rows, many=True).data,
+            'pagination': pagination,
+        }
+    })
 
 
 @api_view(['GET', 'POST'])
@@ -95,8 +122,11 @@ def food_list_create(request):
         # Order by name
         queryset = queryset.order_by('food_name')
         
-        # Paginate
         page_size = int(request.GET.get('page_size', 20))
+        if cursor_requested(request.GET):
+            return _cursor_page_response(request, queryset, ('food_name', 'pk'), page_size, FoodSerializer, 'foods')
+        
+        # Paginate
         page = int(request.GET.get('page', 1))
         
         start = (page - 1) * page_size
@@ -254,16 +284,17 @@ def food_analytics(request, food_id):
     
     # Get frequency data (logs per day)
     frequency_logs = food_logs.filter(date_time__gte=start_date)
+    zone = user_timezone(request.user)
     frequency_data = frequency_logs.annotate(
-        date=TruncDate('date_time')
+        date=LocalDate('date_time', zone)
     ).values('date').annotate(
         count=Count('macro_log_id')
     ).order_by('date')
     
     frequency_list = []
     # Fill in missing dates with 0
-    current_date = start_date.date()
-    end_date = now.date()
+    current_date = local_date(start_date, zone)
+    end_date = local_date(now, zone)
     date_index = 0
     
     while current_date <= end_date:
@@ -282,7 +313,7 @@ def food_analytics(request, food_id):
     
     # Get time of day data (logs per hour, 0-23)
     time_of_day_data = food_logs.annotate(
-        hour=ExtractHour('date_time')
+        hour=ExtractHour('date_time', tzinfo=zone)
     ).values('hour').annotate(
         count=Count('macro_log_id')
     ).order_by('hour')
@@ -416,8 +447,11 @@ def food_log_list_create(request):
         # Order by most recent first
         queryset = queryset.order_by('-date_time')
         
-        # Paginate
         page_size = int(request.GET.get('page_size', 20))
+        if cursor_requested(request.GET):
+            return _cursor_page_response(request, queryset, DATE_TIME_ORDERING, page_size, FoodLogSerializer, 'logs')
+        
+        # Paginate
         page = int(request.GET.get('page', 1))
         
         start = (page - 1) * page_size
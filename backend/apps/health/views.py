@@ -4,11 +4,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
-from datetime import date, timedelta
+from datetime import date
 
 from apps.health.models import SleepLog, HealthMetricsLog
 from apps.health.serializers import SleepLogSerializer, HealthMetricsLogSerializer
 from apps.logging.pagination import LargeResultsSetPagination
+from apps.analytics.streaks import streak_payload
 
 
 # --- Sleep Log Views ---
@@ -65,20 +66,8 @@ class SleepLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_sleep_streak(request):
-    """Calculate consecutive days of sleep logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if SleepLog.objects.filter(user=user, date_time=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
+    """Calculate consecutive days of sleep logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'sleep'), status=status.HTTP_200_OK)
 
 
 # --- Health Metrics Log Views ---
@@ -135,17 +124,5 @@ class HealthMetricsLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAP
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_health_metrics_streak(request):
-    """Calculate consecutive days of health metrics logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if HealthMetricsLog.objects.filter(user=user, date_time=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
\ No newline at end of file
+    """Calculate consecutive days of health metrics logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'health_metrics'), status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Bulk tracker log ingest - many mixed tracker entries validated and inserted together.
+
+Wearable sync otherwise costs one request, one auth lookup, one ApiUsageLog row and one
+insert per reading. bulk_create_logs groups the entries by type, validates each group with
+the tracker's own serializer in many=True mode and inserts every group with bulk_create in
+one transaction: either all entries are saved or none are.
+
+bulk_create sends no post_save signals, so the analytics state those signals keep current
+(weight trend, streaks, activity bitmaps, home snapshots, cached series) is brought up to
+date once per tracker with apps.analytics.signals.tracker_logs_bulk_created, inside the
+same transaction.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics.signals import tracker_logs_bulk_created
+from apps.health.serializers import HealthMetricsLogSerializer, SleepLogSerializer
+from apps.logging.serializers import (
+    BodyMeasurementLogSerializer, CardioLogSerializer, StepsLogSerializer, WaterLogSerializer,
+    WeightLogSerializer,
+)
+
+# Entry "type" -> serializer validating it (keys match apps.analytics.streaks.TRACKERS); the
+# same serializers the tracker's own create endpoint uses
+BULK_SERIALIZERS = {
+    'weight': WeightLogSerializer,
+    'body_measurement': BodyMeasurementLogSerializer,
+    'water': WaterLogSerializer,
+    'steps': StepsLogSerializer,
+    'cardio': CardioLogSerializer,
+    'sleep': SleepLogSerializer,
+    'health_metrics': HealthMetricsLogSerializer,
+}
+BULK_BATCH_SIZE = 500
+
+
+def validate_entries(entries):
+    """
+    Validate a list of {"type": ..., **fields} entries.
+
+    Returns (valid, errors): valid maps type -> validated_data list, errors is one
+    {'index', 'type', 'errors'} item per invalid entry, index being its position in entries.
+    """
+    errors = []
+    grouped = {}
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append({'index': index, 'type': None, 'errors': {
+                'non_field_errors': ['Each entry must be an object']
+            }})
+            continue
+        kind = entry.get('type')
+        if not isinstance(kind, str) or kind not in BULK_SERIALIZERS:
+            errors.append({'index': index, 'type': kind, 'errors': {
+                'type': [f"type must be one of: {', '.join(BULK_SERIALIZERS)}"]
+            }})
+            continue
+        fields = {key: value for key, value in entry.items() if key != 'type'}
+        grouped.setdefault(kind, []).append((index, fields))
+
+    valid = {}
+    for kind, items in grouped.items():
+        serializer = BULK_SERIALIZERS[kind](data=[fields for _, fields in items], many=True)
+        if serializer.is_valid():
+            valid[kind] = serializer.validated_data
+            continue
+        for (index, _), item_errors in zip(items, serializer.errors):
+            if item_errors:
+                errors.append({'index': index, 'type': kind, 'errors': item_errors})
+    errors.sort(key=lambda item: item['index'])
+    return valid, errors
+
+
+def bulk_create_logs(user, valid):
+    """
+    Insert validated entries (validate_entries' `valid`) for user in one transaction.
+
+    Timestamped entries without a date_time get the current time, as in the single-log
+    create views. Returns {type: rows created}.
+    """
+    now = timezone.now()
+    created = {}
+    with transaction.atomic():
+        for kind, rows in valid.items():
+            model = BULK_SERIALIZERS[kind].Meta.model
+            timestamped = model._meta.get_field('date_time').get_internal_type() == 'DateTimeField'
+            logs = []
+            for data in rows:
+                log = model(user=user, **data)
+                if timestamped and not log.date_time:
+                    log.date_time = now
+                logs.append(log)
+            model.objects.bulk_create(logs, batch_size=BULK_BATCH_SIZE)
+            tracker_logs_bulk_created(model, user, logs)
+            created[kind] = len(logs)
+    return created
@@ -0,0 +1,253 @@
+"""
+Tracker history import - stream CSV or JSON exports from other apps into the tracker logs.
+
+Files can run to hundreds of MB, so nothing here holds one in memory: CSV is read a line at
+a time, JSON (a top-level array of objects, or JSON Lines) a chunk at a time. Every row is
+an object with a "type" (a key of apps.logging.bulk.BULK_SERIALIZERS, or the import's
+default type) and that tracker's create fields; CSV columns carry the same names, empty
+cells count as missing. Rows are validated with the tracker's serializer and must carry a
+date_time.
+
+Rows are imported in fixed-size batches, each in one transaction:
+- rows whose (user, date_time) already exists, in the table or earlier in the file, are
+  skipped as duplicates;
+- the rest are inserted with bulk_create, and apps.analytics.signals.tracker_logs_bulk_created
+  brings the analytics state up to date (bulk_create sends no signals);
+- the TrackerImport row's counters and checkpoint (rows_read) are saved with them.
+
+A TrackerImport is keyed by the file's SHA-256, so importing the same file again after a
+crash skips the rows before the checkpoint and carries on; a completed file is not read again.
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import re
+
+from django.db import transaction
+
+from apps.analytics.signals import tracker_logs_bulk_created
+from apps.logging.bulk import BULK_SERIALIZERS
+from apps.logging.models import TrackerImport
+
+IMPORT_FORMATS = ('csv', 'json')
+IMPORT_BATCH_SIZE = 1000
+# Invalid rows kept on the TrackerImport for the user to see
+MAX_STORED_ERRORS = 50
+
+_CHUNK_BYTES = 64 * 1024
+# A JSON value still undecodable after this many characters is malformed, not truncated
+_MAX_JSON_VALUE_CHARS = 1024 * 1024
+_JSON_SEPARATORS = re.compile(r'\s*')
+_JSON_ARRAY_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def import_format(file_name, declared=None):
+    """'csv' or 'json' from the declared format or the file extension (.jsonl/.ndjson are JSON)."""
+    if declared:
+        return declared.lower() if declared.lower() in IMPORT_FORMATS else None
+    extension = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'json'
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def file_sha256(stream):
+    """Hex SHA-256 of a binary stream, read in chunks; the stream is rewound afterwards."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(_CHUNK_BYTES), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _csv_rows(stream, job):
+    """Dict rows of a CSV file, decoded a line at a time."""
+    def lines():
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        for raw in stream:
+            job.bytes_read += len(raw)
+            yield decoder.decode(raw)
+    return csv.DictReader(lines())
+
+
+def _json_rows(stream, job):
+    """Values of a top-level JSON array, or of JSON Lines, decoded a chunk at a time."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof, array = '', 0, False, None
+    separators = _JSON_SEPARATORS
+    while True:
+        pos = separators.match(buffer, pos).end()
+        if array is None and pos < len(buffer):
+            array = buffer[pos] == '['
+            if array:
+                pos += 1
+                separators = _JSON_ARRAY_SEPARATORS
+                continue
+        if array and buffer.startswith(']', pos):
+            return
+        if pos < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof or len(buffer) - pos > _MAX_JSON_VALUE_CHARS:
+                    raise ValueError(f'Invalid JSON: {e.msg}')
+            else:
+                # A value running to the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    pos = end
+                    yield value
+                    continue
+        elif eof:
+            if array:
+                raise ValueError('Invalid JSON: the array is not closed')
+            return
+        chunk = stream.read(_CHUNK_BYTES)
+        job.bytes_read += len(chunk)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+
+def _validated_log(user, row, default_type):
+    """(tracker, unsaved log, None) for a valid row, else (tracker or None, None, errors)."""
+    if not isinstance(row, dict):
+        return None, None, {'non_field_errors': ['Each row must be an object']}
+    kind = row.get('type') or default_type
+    if not isinstance(kind, str) or kind not in BULK_SERIALIZERS:
+        return None, None, {'type': [f"type must be one of: {', '.join(BULK_SERIALIZERS)}"]}
+    fields = {
+        key: value for key, value in row.items()
+        if key is not None and key != 'type' and value not in ('', None)
+    }
+    if 'date_time' not in fields:
+        return kind, None, {'date_time': ['Imported rows need a date_time']}
+    serializer = BULK_SERIALIZERS[kind](data=fields)
+    if not serializer.is_valid():
+        return kind, None, serializer.errors
+    return kind, serializer.Meta.model(user=user, **serializer.validated_data), None
+
+
+def _import_batch(job, batch, default_type):
+    """Insert one batch of (row number, row) and advance the checkpoint, in one transaction."""
+    grouped = {}
+    invalid = []
+    for number, row in batch:
+        kind, log, errors = _validated_log(job.user, row, default_type)
+        if errors:
+            invalid.append({'row': number, 'type': kind, 'errors': errors})
+        else:
+            grouped.setdefault(kind, []).append(log)
+
+    created = duplicates = 0
+    with transaction.atomic():
+        for kind, logs in grouped.items():
+            model = BULK_SERIALIZERS[kind].Meta.model
+            seen = set(model.objects.filter(
+                user=job.user, date_time__in={log.date_time for log in logs}
+            ).values_list('date_time', flat=True))
+            new = []
+            for log in logs:
+                if log.date_time in seen:
+                    duplicates += 1
+                    continue
+                seen.add(log.date_time)
+                new.append(log)
+            model.objects.bulk_create(new)
+            tracker_logs_bulk_created(model, job.user, new)
+            created += len(new)
+
+        job.rows_read = batch[-1][0]
+        job.rows_created += created
+        job.rows_duplicate += duplicates
+        job.rows_invalid += len(invalid)
+        job.errors = (job.errors + invalid)[:MAX_STORED_ERRORS]
+        job.save()
+
+
+def start_import(user, stream, file_name, file_format):
+    """
+    The TrackerImport for this user and file: the one left by an earlier attempt at the same
+    file (to resume or report), or a new one.
+    """
+    digest = file_sha256(stream)
+    job, _ = TrackerImport.objects.get_or_create(
+        user=user, file_sha256=digest,
+        defaults={'file_name': file_name[:255], 'file_format': file_format, 'total_bytes': stream.size},
+    )
+    return job
+
+
+def run_import(job, stream, default_type=None, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Import the rows of stream past job's checkpoint, IMPORT_BATCH_SIZE at a time.
+
+    default_type: tracker for rows without a "type".
+    progress: optional callable, passed job after every committed batch.
+    A file that cannot be parsed marks job failed with a message; other errors mark it
+    failed and propagate. Either way committed batches stay, and a rerun resumes after them.
+    """
+    if job.status == 'completed':
+        return job
+    job.status, job.message, job.bytes_read = 'running', None, 0
+    job.save(update_fields=['status', 'message', 'bytes_read', 'updated_at'])
+
+    read_rows = _csv_rows if job.file_format == 'csv' else _json_rows
+    checkpoint = job.rows_read
+    batch = []
+    try:
+        for number, row in enumerate(read_rows(stream, job), start=1):
+            if number <= checkpoint:
+                continue
+            batch.append((number, row))
+            if len(batch) >= batch_size:
+                _import_batch(job, batch, default_type)
+                batch = []
+                if progress:
+                    progress(job)
+        if batch:
+            _import_batch(job, batch, default_type)
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        _mark_failed(job, str(e))
+        return job
+    except Exception as e:
+        _mark_failed(job, f'{type(e).__name__}: {e}')
+        raise
+
+    job.status = 'completed'
+    job.bytes_read = job.total_bytes
+    job.save(update_fields=['status', 'bytes_read', 'updated_at'])
+    if progress:
+        progress(job)
+    return job
+
+
+def _mark_failed(job, message):
+    # Drop counters from a batch that was rolled back
+    job.refresh_from_db(fields=['rows_read', 'rows_created', 'rows_duplicate', 'rows_invalid', 'errors'])
+    job.status, job.message = 'failed', message
+    job.save(update_fields=['status', 'message', 'updated_at'])
+
+
+def import_payload(job):
+    """API representation of a TrackerImport, with progress as a percentage of bytes read."""
+    progress = 100.0 if job.status == 'completed' else (
+        round(100 * min(job.bytes_read / job.total_bytes, 1), 1) if job.total_bytes else 0.0
+    )
+    return {
+        'import_id': job.import_id,
+        'file_name': job.file_name,
+        'format': job.file_format,
+        'status': job.status,
+        'progress': progress,
+        'rows_read': job.rows_read,
+        'rows_created': job.rows_created,
+        'rows_duplicate': job.rows_duplicate,
+        'rows_invalid': job.rows_invalid,
+        'errors': job.errors,
+        'message': job.message,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+    }
@@ -0,0 +1,93 @@
+"""
+Django Management Command: import_tracker_history
+
+Streams a CSV or JSON history export (steps, weight, sleep, cardio, health metrics, ...)
+into one user's tracker logs in fixed-size batches (see apps.logging.imports). Rows already
+logged at the same timestamp are skipped. Rerunning the command on the same file after a
+crash or Ctrl-C resumes from the last committed batch.
+
+Usage:
+    python manage.py import_tracker_history export.csv --user 12
+    python manage.py import_tracker_history steps.json --user 12 --type steps
+    python manage.py import_tracker_history export.jsonl --user 12 --batch-size 5000
+"""
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.logging.bulk import BULK_SERIALIZERS
+from apps.logging.imports import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_format, run_import, start_import
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV or JSON tracker history export for one user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV, JSON array or JSON Lines file')
+        parser.add_argument(
+            '--user',
+            type=int,
+            required=True,
+            dest='user_id',
+            help='user_id the rows are logged for',
+        )
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--type',
+            choices=tuple(BULK_SERIALIZERS),
+            help='Tracker for rows without a type column',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f'Rows per transaction (default {IMPORT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        """Run (or resume) the import and report progress after every batch."""
+        user = User.objects.filter(pk=options['user_id']).first()
+        if user is None:
+            raise CommandError(f"No user with user_id {options['user_id']}")
+        file_format = import_format(options['path'], options['format'])
+        if file_format is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        try:
+            stream = open(options['path'], 'rb')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with File(stream) as upload:
+            job = start_import(user, upload, options['path'], file_format)
+            if job.status == 'completed':
+                self.stdout.write(self.style.WARNING(
+                    f'[SKIP] File already imported (import {job.import_id}, {job.rows_created} rows created)'
+                ))
+                return
+            if job.rows_read:
+                self.stdout.write(f'Resuming import {job.import_id} after row {job.rows_read}')
+            job = run_import(job, upload, options['type'], options['batch_size'], progress=self._report)
+
+        if job.status == 'failed':
+            raise CommandError(f'Import {job.import_id} failed after row {job.rows_read}: {job.message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] Import {job.import_id} complete: {job.rows_created} created, '
+            f'{job.rows_duplicate} duplicates skipped, {job.rows_invalid} invalid'
+        ))
+        for error in job.errors:
+            self.stdout.write(f"  row {error['row']}: {error['errors']}")
+
+    def _report(self, job):
+        percent = 100 * job.bytes_read / job.total_bytes if job.total_bytes else 0
+        self.stdout.write(
+            f'  {percent:5.1f}%  rows {job.rows_read}  created {job.rows_created}  '
+            f'duplicates {job.rows_duplicate}  invalid {job.rows_invalid}'
+        )
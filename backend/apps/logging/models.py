@@ -106,3 +106,38 @@ class CardioLog(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.cardio_type} ({self.date_time})"
+
+
+class TrackerImport(models.Model):
+    """One history file imported into the tracker logs; its checkpoint makes the import resumable (see apps.logging.imports)"""
+    import_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, db_column='user_id')
+    file_name = models.CharField(max_length=255)
+    file_sha256 = models.CharField(max_length=64)  # Identifies the file when an import is resumed
+    file_format = models.CharField(max_length=10, choices=[
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+    ])
+    status = models.CharField(max_length=20, default='running', choices=[
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ])
+    total_bytes = models.BigIntegerField(default=0)
+    bytes_read = models.BigIntegerField(default=0)
+    # Checkpoint: rows of the file fully handled (committed, skipped as duplicates or invalid)
+    rows_read = models.IntegerField(default=0)
+    rows_created = models.IntegerField(default=0)
+    rows_duplicate = models.IntegerField(default=0)
+    rows_invalid = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # First invalid rows: [{row, errors}]
+    message = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tracker_import'
+        unique_together = ('user', 'file_sha256')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.file_name} ({self.status})"
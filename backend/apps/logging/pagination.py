@@ -1,10 +1,148 @@
-"""Custom pagination for tracking logs"""
+"""
+Custom pagination for tracking logs, plus opt-in keyset (cursor) paging for large lists.
+
+Page-number paging costs an OFFSET scan and a COUNT(*) per page, both growing with history
+depth. Cursor mode (`?pagination=cursor`, then `?cursor=<next_cursor>`) seeks past the last
+row of the previous page instead: the cursor is an opaque token carrying that row's sort key
+(e.g. date_time and pk), turned into a WHERE predicate the index can answer. No COUNT is run
+unless the client asks for one with `include_total=true`.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import exceptions
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_PARAM = 'cursor'
+# Largest keyset page a client can ask for; bigger pages would bring back the full scan
+MAX_CURSOR_PAGE_SIZE = 1000
+# Newest first, the pk breaking ties between rows logged at the same moment
+DATE_TIME_ORDERING = ('-date_time', '-pk')
+
+
+def cursor_requested(params):
+    """Whether query params / body opt in to cursor mode."""
+    return params.get('pagination') == 'cursor' or CURSOR_PARAM in params
+
+
+def total_requested(params):
+    return str(params.get('include_total', '')).lower() in ('1', 'true', 'yes')
+
+
+def cursor_page_size(value, default=100):
+    """Page size from a query param, clamped to 1..MAX_CURSOR_PAGE_SIZE; ValueError when not an integer."""
+    if value in (None, ''):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return min(max(size, 1), MAX_CURSOR_PAGE_SIZE)
+
+
+def _plain(value):
+    # Full precision: microseconds matter for a seek on date_time
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _field(model, name):
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+
+def encode_cursor(row, ordering):
+    """Opaque cursor pointing just past row in ordering."""
+    values = [_plain(getattr(row, name.lstrip('-'))) for name in ordering]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, model, ordering):
+    """Sort-key values from a cursor; ValueError when it was not made for this ordering."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError
+        return [_field(model, name.lstrip('-')).to_python(value) for name, value in zip(ordering, values)]
+    except (ValueError, TypeError, ValidationError):
+        raise ValueError('Invalid cursor')
+
+
+def _seek(ordering, values):
+    """Rows after the cursor row: (a, b) > (x, y) as (a > x) OR (a = x AND b > y), per direction."""
+    after = Q()
+    equal = {}
+    for name, value in zip(ordering, values):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        after |= Q(**equal, **{f'{field}__{lookup}': value})
+        equal[field] = value
+    return after
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=20):
+    """
+    One page of queryset sorted by ordering (non-null fields ending in a unique one, such as
+    DATE_TIME_ORDERING), starting after cursor.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page. Raises ValueError
+    for a cursor that does not decode.
+    """
+    page_size = max(page_size, 1)
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_seek(ordering, decode_cursor(cursor, queryset.model, ordering)))
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1], ordering)
 
 
 class LargeResultsSetPagination(PageNumberPagination):
-    """Pagination class that allows large page sizes for graph data"""
+    """
+    Pagination class that allows large page sizes for graph data.
+
+    With `pagination=cursor` (or a `cursor` param) pages are keyset pages in cursor_ordering:
+    {next_cursor, next, results}, plus `count` only when `include_total=true`.
+    """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100000  # Allow very large page sizes for historical data queries
+    cursor_ordering = DATE_TIME_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = cursor_requested(request.query_params)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.total = queryset.count() if total_requested(request.query_params) else None
+        try:
+            rows, self.next_cursor = keyset_page(
+                queryset, self.cursor_ordering, request.query_params.get(CURSOR_PARAM), self.get_page_size(request)
+            )
+        except ValueError as e:
+            raise exceptions.ValidationError({CURSOR_PARAM: [str(e)]})
+        return rows
 
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        payload = {}
+        if self.total is not None:
+            payload['count'] = self.total
+        payload['next_cursor'] = self.next_cursor
+        payload['next'] = replace_query_param(
+            self.request.build_absolute_uri(), CURSOR_PARAM, self.next_cursor
+        ) if self.next_cursor else None
+        payload['results'] = data
+        return Response(payload)
@@ -0,0 +1,319 @@
+"""
+Tests for the bulk tracker log endpoint (all-or-nothing inserts with per-entry errors, and
+the analytics state signals would have maintained brought up to date), for streaming
+history imports (dedupe, batching, resume) and for keyset (cursor) pagination of log lists.
+"""
+import json
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.analytics import activity_bitmaps
+from apps.analytics.models import HomeDashboardSnapshot, TrackerStreak, WeightTrend
+from apps.analytics.series_cache import series_cache, user_series
+from apps.health.models import HealthMetricsLog, SleepLog
+from apps.logging import imports
+from apps.logging.models import StepsLog, TrackerImport, WaterLog, WeightLog
+from apps.logging.pagination import DATE_TIME_ORDERING, keyset_page
+from apps.users.models import AccessLevel
+
+User = get_user_model()
+
+
+class BulkTrackerLogTest(APITestCase):
+    url = '/api/logging/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulkuser', email='bulk@x.com', password='testpass123',
+                                             timezone='UTC')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.today = timezone.now().date()
+        series_cache.clear()
+
+    def _at(self, days_ago, hour=8):
+        return datetime.combine(self.today - timedelta(days=days_ago), time(hour)).isoformat() + 'Z'
+
+    def test_creates_mixed_entries_in_few_queries(self):
+        entries = [{'type': 'steps', 'steps': 1000 + i, 'date_time': self._at(i % 5)} for i in range(200)]
+        entries += [
+            {'type': 'water', 'amount': '500', 'unit': 'ml', 'date_time': self._at(0)},
+            {'type': 'health_metrics', 'resting_heart_rate': 58, 'date_time': self.today.isoformat()},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'entries': entries}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['created'], {'steps': 200, 'water': 1, 'health_metrics': 1})
+        self.assertEqual(response.data['data']['total'], 202)
+        self.assertEqual(StepsLog.objects.filter(user=self.user).count(), 200)
+        self.assertEqual(HealthMetricsLog.objects.get(user=self.user).resting_heart_rate, 58)
+        self.assertLess(len(queries.captured_queries), 60)
+
+    def test_invalid_entry_saves_nothing(self):
+        response = self.client.post(self.url, {'entries': [
+            {'type': 'steps', 'steps': 100, 'date_time': self._at(0)},
+            {'type': 'steps', 'steps': -5, 'date_time': self._at(0)},
+            {'type': 'coffee', 'cups': 2},
+            {'type': 'weight', 'weight': '80', 'weight_unit': 'stone'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        items = response.data['error']['items']
+        self.assertEqual([item['index'] for item in items], [1, 2, 3])
+        self.assertIn('steps', items[0]['errors'])
+        self.assertIn('type', items[1]['errors'])
+        self.assertIn('weight_unit', items[2]['errors'])
+        self.assertFalse(StepsLog.objects.exists())
+
+    def test_overnight_sleep_entry_is_valid(self):
+        response = self.client.post(self.url, {'entries': [
+            {'type': 'sleep', 'date_time': self.today.isoformat(), 'time_went_to_bed': '23:00',
+             'time_got_out_of_bed': '07:00'},
+            {'type': 'steps', 'steps': 100, 'date_time': self._at(0)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(str(SleepLog.objects.get(user=self.user).time_went_to_bed), '23:00:00')
+
+    def test_rejects_empty_and_oversized_payloads(self):
+        response = self.client.post(self.url, {'entries': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(BULK_LOG_MAX_ENTRIES=2):
+            response = self.client.post(self.url, {'entries': [{'type': 'steps', 'steps': 1}] * 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_missing_date_time_defaults_to_now(self):
+        response = self.client.post(self.url, {'entries': [{'type': 'weight', 'weight': '80', 'weight_unit': 'kg'}]},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(WeightLog.objects.get(user=self.user).date_time.date(), self.today)
+
+    def test_refreshes_analytics_state(self):
+        WaterLog.objects.create(user=self.user, amount=500, unit='ml',
+                                date_time=timezone.make_aware(datetime.combine(self.today - timedelta(days=3), time(9))))
+        self.client.get('/api/analytics/home/dashboard/')
+        stamp = user_series(self.user).stamp
+
+        response = self.client.post(self.url, {'entries': [
+            {'type': 'water', 'amount': '250', 'unit': 'ml', 'date_time': self._at(days_ago)} for days_ago in (2, 1, 0)
+        ] + [
+            {'type': 'weight', 'weight': weight, 'weight_unit': 'kg', 'date_time': self._at(days_ago)}
+            for weight, days_ago in (('81', 2), ('80', 0))
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        streak = TrackerStreak.objects.get(user=self.user, tracker='water')
+        self.assertEqual((streak.current, streak.longest), (4, 4))
+        self.assertEqual(activity_bitmaps.days_logged(self.user.pk, 'water', self.today - timedelta(days=3), self.today), 4)
+        self.assertTrue(activity_bitmaps.logged_on(self.user.pk, 'weight', self.today))
+        self.assertEqual(WeightTrend.objects.get(user=self.user).weigh_in_count, 2)
+        self.assertIsNone(HomeDashboardSnapshot.objects.get(user=self.user, date=self.today).trackers)
+        self.assertNotEqual(user_series(self.user).stamp, stamp)
+        missing = {t['id'] for t in self.client.get('/api/analytics/home/dashboard/').data['data']['trackers_not_logged']}
+        self.assertNotIn('water', missing)
+        self.assertNotIn('weight', missing)
+        self.assertEqual(user_series(self.user).window('weight', self.today, self.today)[0], 80.0)
+
+
+class TrackerImportTest(APITestCase):
+    url = '/api/logging/import/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='importuser', email='imp@x.com', password='testpass123',
+                                             timezone='UTC')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _steps_csv(self, days):
+        lines = ['type,date_time,steps,weight,weight_unit']
+        lines += [f'steps,2024-01-{day:02d}T08:00:00Z,{1000 * day},,' for day in days]
+        return ('\n'.join(lines) + '\n').encode()
+
+    def _file(self, content):
+        return File(BytesIO(content), name='export')
+
+    def test_csv_upload_dedupes_and_reports_invalid_rows(self):
+        StepsLog.objects.create(user=self.user, steps=1, date_time=timezone.make_aware(datetime(2024, 1, 2, 8)))
+        content = self._steps_csv([1, 2, 3, 3]) + b'steps,,500,,\nweight,2024-01-03T07:00:00Z,,80.5,kg\n'
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('export.csv', content)}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['status'], 'completed')
+        self.assertEqual(data['progress'], 100.0)
+        self.assertEqual((data['rows_read'], data['rows_created'], data['rows_duplicate'], data['rows_invalid']),
+                         (6, 3, 2, 1))
+        self.assertEqual(data['errors'][0]['row'], 5)
+        self.assertEqual(StepsLog.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(float(WeightLog.objects.get(user=self.user).weight), 80.5)
+
+        again = self.client.post(self.url, {'file': SimpleUploadedFile('copy.csv', content)}, format='multipart')
+        self.assertEqual(again.data['data']['import_id'], data['import_id'])
+        self.assertEqual(StepsLog.objects.filter(user=self.user).count(), 3)
+        detail = self.client.get(f"{self.url}{data['import_id']}/")
+        self.assertEqual(detail.data['data']['rows_created'], 3)
+
+    @override_settings(TRACKER_IMPORT_MAX_UPLOAD_BYTES=64)
+    def test_upload_over_the_size_cap_is_refused(self):
+        content = self._steps_csv(range(1, 11))
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('export.csv', content)}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertIn('import_tracker_history', response.data['error']['message'])
+        self.assertFalse(StepsLog.objects.exists())
+
+    def test_json_array_and_lines_across_chunks(self):
+        rows = [{'type': 'steps', 'date_time': f'2024-02-{day:02d}T09:00:00Z', 'steps': day} for day in range(1, 21)]
+        rows.append({'type': 'sleep', 'date_time': '2024-02-01', 'time_went_to_bed': '01:00',
+                     'time_got_out_of_bed': '08:30'})
+        with mock.patch.object(imports, '_CHUNK_BYTES', 7):
+            for content in (json.dumps(rows, indent=2).encode(), '\n'.join(json.dumps(row) for row in rows).encode()):
+                StepsLog.objects.all().delete()
+                SleepLog.objects.all().delete()
+                job = imports.start_import(self.user, self._file(content), 'export.json', 'json')
+                job = imports.run_import(job, self._file(content), batch_size=4)
+                self.assertEqual(job.status, 'completed', job.message)
+                self.assertEqual(job.rows_created, 21)
+        self.assertEqual(sorted(StepsLog.objects.values_list('steps', flat=True)), list(range(1, 21)))
+        self.assertEqual(SleepLog.objects.get(user=self.user).date_time, date(2024, 2, 1))
+
+    def test_overnight_sleep_rows_are_imported(self):
+        content = (b'type,date_time,time_went_to_bed,time_got_out_of_bed\n'
+                   b'sleep,2024-02-01,23:30,07:15\nsleep,2024-02-02,00:45,08:00\n')
+        job = imports.start_import(self.user, self._file(content), 'sleep.csv', 'csv')
+        job = imports.run_import(job, self._file(content))
+        self.assertEqual((job.status, job.rows_created, job.rows_invalid), ('completed', 2, 0), job.errors)
+        self.assertEqual(SleepLog.objects.filter(user=self.user).count(), 2)
+
+    def test_malformed_json_fails_the_import(self):
+        content = b'[{"type": "steps", "steps": 5, "date_time": "2024-02-01T09:00:00Z"}, {"type": '
+        job = imports.start_import(self.user, self._file(content), 'broken.json', 'json')
+        job = imports.run_import(job, self._file(content))
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Invalid JSON', job.message)
+
+    def test_crash_resumes_after_last_committed_batch(self):
+        content = self._steps_csv(range(1, 11))
+        job = imports.start_import(self.user, self._file(content), 'export.csv', 'csv')
+
+        def crash(job):
+            raise RuntimeError('worker killed')
+
+        with self.assertRaises(RuntimeError):
+            imports.run_import(job, self._file(content), batch_size=3, progress=crash)
+        job = TrackerImport.objects.get(pk=job.pk)
+        self.assertEqual((job.status, job.rows_read), ('failed', 3))
+        self.assertEqual(StepsLog.objects.count(), 3)
+
+        job = imports.start_import(self.user, self._file(content), 'export.csv', 'csv')
+        with mock.patch.object(imports, '_validated_log', wraps=imports._validated_log) as validate:
+            job = imports.run_import(job, self._file(content), batch_size=3)
+        self.assertEqual(validate.call_count, 7)  # rows before the checkpoint are not re-validated
+        self.assertEqual((job.status, job.rows_created, job.rows_duplicate), ('completed', 10, 0))
+        self.assertEqual(StepsLog.objects.count(), 10)
+
+    def test_management_command(self):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'wb') as export:
+            export.write(b'date_time,steps\n2024-03-01T10:00:00Z,4000\n2024-03-02T10:00:00Z,5000\n')
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+        call_command('import_tracker_history', path, user_id=self.user.pk, type='steps', batch_size=1, stdout=out)
+        self.assertIn('2 created', out.getvalue())
+        self.assertEqual(StepsLog.objects.filter(user=self.user).count(), 2)
+        call_command('import_tracker_history', path, user_id=self.user.pk, type='steps', stdout=out)
+        self.assertIn('already imported', out.getvalue())
+
+
+class CursorPaginationTest(APITestCase):
+    url = '/api/logging/steps/'
+
+    def setUp(self):
+        access_level, _ = AccessLevel.objects.get_or_create(role_name='user')
+        self.user = User.objects.create_user(username='cursoruser', email='cur@x.com', password='testpass123',
+                                             timezone='UTC', access_level=access_level)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        start = timezone.make_aware(datetime(2024, 1, 1, 8))
+        # Pairs of logs sharing a date_time, so pages must break ties on the pk
+        StepsLog.objects.bulk_create(
+            StepsLog(user=self.user, steps=i, date_time=start + timedelta(hours=i // 2)) for i in range(25)
+        )
+
+    def _walk(self, params):
+        seen, pages, cursor = [], 0, None
+        while True:
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            response = self.client.get(self.url, query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [row['steps'] for row in response.data['results']]
+            pages += 1
+            cursor = response.data['next_cursor']
+            if not cursor:
+                return seen, pages
+
+    def test_cursor_pages_cover_every_row_once_newest_first(self):
+        seen, pages = self._walk({'pagination': 'cursor', 'page_size': 4})
+        self.assertEqual(pages, 7)
+        self.assertEqual(seen, list(range(24, -1, -1)))
+
+    def test_cursor_mode_skips_count_unless_asked(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 5})
+        self.assertNotIn('count', response.data)
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in queries.captured_queries))
+        self.assertIn('cursor=', response.data['next'])
+
+        response = self.client.get(self.url, {'pagination': 'cursor', 'include_total': 'true'})
+        self.assertEqual(response.data['count'], 25)
+        # Page-number mode is unchanged
+        self.assertEqual(self.client.get(self.url, {'page_size': 5}).data['count'], 25)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keyset_page_ascending_ordering(self):
+        queryset = StepsLog.objects.filter(user=self.user)
+        rows, cursor = keyset_page(queryset, ('date_time', 'pk'), page_size=10)
+        rows2, _ = keyset_page(queryset, ('date_time', 'pk'), cursor, page_size=10)
+        self.assertEqual([row.steps for row in rows + rows2], list(range(20)))
+        newest, _ = keyset_page(queryset, DATE_TIME_ORDERING, page_size=1)
+        self.assertEqual(newest[0].steps, 24)
+
+    def _walk_data_viewer(self, body):
+        seen, cursor = [], None
+        while True:
+            page_body = dict(body, pagination='cursor', page_size=10, **({'cursor': cursor} if cursor else {}))
+            response = self.client.post('/api/data-viewer/tables/steps_log/data/', page_body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            pagination = response.data['data']['pagination']
+            self.assertNotIn('total', pagination)
+            seen += [row['steps'] for row in response.data['data']['data']]
+            cursor = pagination['next_cursor']
+            if not cursor:
+                return seen
+
+    def test_data_viewer_cursor_mode(self):
+        seen = self._walk_data_viewer({'sort_by': 'date_time', 'sort_order': 'desc'})
+        self.assertEqual(seen, list(range(24, -1, -1)))
+
+        response = self.client.post('/api/data-viewer/tables/steps_log/data/',
+                                    {'pagination': 'cursor', 'cursor': 'bad'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_data_viewer_cursor_sorted_by_foreign_key(self):
+        other = User.objects.create_user(username='cursorother', email='other@x.com', password='testpass123')
+        StepsLog.objects.create(user=other, steps=99, date_time=timezone.now())
+        # Sorted by user_id, ties in pk order; other users' rows stay hidden
+        self.assertEqual(self._walk_data_viewer({'sort_by': 'user'}), list(range(25)))
@@ -30,4 +30,9 @@ urlpatterns = [
     
     # All Trackers
     path('streaks/', views.get_all_tracker_streaks, name='all-tracker-streaks'),
+    path('bulk/', views.bulk_create_tracker_logs, name='tracker-log-bulk-create'),
+
+    # History Import
+    path('import/', views.import_tracker_history, name='tracker-history-import'),
+    path('import/<int:pk>/', views.get_tracker_import, name='tracker-history-import-detail'),
 ]
\ No newline at end of file
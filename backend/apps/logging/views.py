@@ -2,21 +2,25 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django.utils import timezone
-from datetime import date, timedelta
+from datetime import date
 
 from apps.logging.models import (
     WeightLog, BodyMeasurementLog, WaterLog, 
-    StepsLog, CardioLog
+    StepsLog, CardioLog, TrackerImport
 )
-from apps.health.models import SleepLog, HealthMetricsLog
 from apps.logging.serializers import (
     WeightLogSerializer, BodyMeasurementLogSerializer, WaterLogSerializer,
     StepsLogSerializer, CardioLogSerializer
 )
+from apps.logging.bulk import BULK_SERIALIZERS, bulk_create_logs, validate_entries
+from apps.logging.imports import import_format, import_payload, run_import, start_import
 from apps.logging.pagination import LargeResultsSetPagination
+from apps.users.timezones import day_range, local_today, user_timezone
+from apps.analytics.streaks import current_streak, streak_payload, tracker_streaks
 
 
 # --- Weight Log Views ---
@@ -36,14 +40,14 @@ class WeightLogListCreateView(generics.ListCreateAPIView):
         if start_date_param:
             try:
                 start_date = date.fromisoformat(start_date_param)
-                queryset = queryset.filter(date_time__date__gte=start_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_from=start_date))
             except ValueError:
                 pass
         
         if end_date_param:
             try:
                 end_date = date.fromisoformat(end_date_param)
-                queryset = queryset.filter(date_time__date__lte=end_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_to=end_date))
             except ValueError:
                 pass
         
@@ -52,7 +56,7 @@ class WeightLogListCreateView(generics.ListCreateAPIView):
         if date_param and not start_date_param and not end_date_param:
             try:
                 log_date = date.fromisoformat(date_param)
-                queryset = queryset.filter(date_time__date=log_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), log_date, log_date))
             except ValueError:
                 pass
         
@@ -74,20 +78,8 @@ class WeightLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_weight_streak(request):
-    """Calculate consecutive days of weight logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if WeightLog.objects.filter(user=user, date_time__date=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
+    """Calculate consecutive days of weight logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'weight'), status=status.HTTP_200_OK)
 
 
 # --- Body Measurement Log Views ---
@@ -107,14 +99,14 @@ class BodyMeasurementLogListCreateView(generics.ListCreateAPIView):
         if start_date_param:
             try:
                 start_date = date.fromisoformat(start_date_param)
-                queryset = queryset.filter(date_time__date__gte=start_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_from=start_date))
             except ValueError:
                 pass
         
         if end_date_param:
             try:
                 end_date = date.fromisoformat(end_date_param)
-                queryset = queryset.filter(date_time__date__lte=end_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_to=end_date))
             except ValueError:
                 pass
         
@@ -123,7 +115,7 @@ class BodyMeasurementLogListCreateView(generics.ListCreateAPIView):
         if date_param and not start_date_param and not end_date_param:
             try:
                 log_date = date.fromisoformat(date_param)
-                queryset = queryset.filter(date_time__date=log_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), log_date, log_date))
             except ValueError:
                 pass
         
@@ -145,20 +137,8 @@ class BodyMeasurementLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroy
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_body_measurement_streak(request):
-    """Calculate consecutive days of body measurement logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if BodyMeasurementLog.objects.filter(user=user, date_time__date=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
+    """Calculate consecutive days of body measurement logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'body_measurement'), status=status.HTTP_200_OK)
 
 
 # --- Water Log Views ---
@@ -176,7 +156,7 @@ class WaterLogListCreateView(generics.ListCreateAPIView):
         if date_param:
             try:
                 log_date = date.fromisoformat(date_param)
-                queryset = queryset.filter(date_time__date=log_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), log_date, log_date))
             except ValueError:
                 pass
         
@@ -202,20 +182,8 @@ class WaterLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_water_streak(request):
-    """Calculate consecutive days of water logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if WaterLog.objects.filter(user=user, date_time__date=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
+    """Calculate consecutive days of water logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'water'), status=status.HTTP_200_OK)
 
 
 # --- Steps Log Views ---
@@ -235,14 +203,14 @@ class StepsLogListCreateView(generics.ListCreateAPIView):
         if start_date_param:
             try:
                 start_date = date.fromisoformat(start_date_param)
-                queryset = queryset.filter(date_time__date__gte=start_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_from=start_date))
             except ValueError:
                 pass
         
         if end_date_param:
             try:
                 end_date = date.fromisoformat(end_date_param)
-                queryset = queryset.filter(date_time__date__lte=end_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_to=end_date))
             except ValueError:
                 pass
         
@@ -251,7 +219,7 @@ class StepsLogListCreateView(generics.ListCreateAPIView):
         if date_param and not start_date_param and not end_date_param:
             try:
                 log_date = date.fromisoformat(date_param)
-                queryset = queryset.filter(date_time__date=log_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), log_date, log_date))
             except ValueError:
                 pass
         
@@ -273,20 +241,8 @@ class StepsLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_steps_streak(request):
-    """Calculate consecutive days of steps logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if StepsLog.objects.filter(user=user, date_time__date=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
+    """Calculate consecutive days of steps logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'steps'), status=status.HTTP_200_OK)
 
 
 # --- Cardio Log Views ---
@@ -306,14 +262,14 @@ class CardioLogListCreateView(generics.ListCreateAPIView):
         if start_date_param:
             try:
                 start_date = date.fromisoformat(start_date_param)
-                queryset = queryset.filter(date_time__date__gte=start_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_from=start_date))
             except ValueError:
                 pass
         
         if end_date_param:
             try:
                 end_date = date.fromisoformat(end_date_param)
-                queryset = queryset.filter(date_time__date__lte=end_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), date_to=end_date))
             except ValueError:
                 pass
         
@@ -322,7 +278,7 @@ class CardioLogListCreateView(generics.ListCreateAPIView):
         if date_param and not start_date_param and not end_date_param:
             try:
                 log_date = date.fromisoformat(date_param)
-                queryset = queryset.filter(date_time__date=log_date)
+                queryset = queryset.filter(**day_range('date_time', user_timezone(user), log_date, log_date))
             except ValueError:
                 pass
         
@@ -344,20 +300,8 @@ class CardioLogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_cardio_streak(request):
-    """Calculate consecutive days of cardio logging"""
-    user = request.user
-    today = date.today()
-    streak = 0
-    
-    # Check backwards from today
-    for i in range(365):  # Max 1 year back
-        check_date = today - timedelta(days=i)
-        if CardioLog.objects.filter(user=user, date_time__date=check_date).exists():
-            streak += 1
-        else:
-            break
-    
-    return Response({"streak": streak}, status=status.HTTP_200_OK)
+    """Calculate consecutive days of cardio logging, and the longest run ever"""
+    return Response(streak_payload(request.user, 'cardio'), status=status.HTTP_200_OK)
 
 
 
@@ -366,33 +310,115 @@ def get_cardio_streak(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_all_tracker_streaks(request):
-    """Get streaks for all tracker types"""
+    """Get current streaks for all tracker types from the stored streak rows (one query)"""
     user = request.user
-    today = date.today()
-    
-    def calculate_streak(model_class, date_field='created_at', use_date_lookup=True):
-        """use_date_lookup: True for DateTimeField (use field__date), False for DateField (use field)."""
-        streak = 0
-        for i in range(365):  # Max 1 year back
-            check_date = today - timedelta(days=i)
-            if use_date_lookup:
-                filter_kwargs = {f'{date_field}__date': check_date}
-            else:
-                filter_kwargs = {date_field: check_date}
-            if model_class.objects.filter(user=user, **filter_kwargs).exists():
-                streak += 1
-            else:
-                break
-        return streak
-
+    today = local_today(user)
     streaks = {
-        'weight': calculate_streak(WeightLog, 'created_at'),
-        'body_measurement': calculate_streak(BodyMeasurementLog, 'created_at'),
-        'water': calculate_streak(WaterLog, 'created_at'),
-        'steps': calculate_streak(StepsLog, 'date_time'),
-        'cardio': calculate_streak(CardioLog, 'date_time'),
-        'sleep': calculate_streak(SleepLog, 'date_time', use_date_lookup=False),  # DateField
-        'health_metrics': calculate_streak(HealthMetricsLog, 'date_time', use_date_lookup=False),  # DateField
+        tracker: current_streak(state, today)
+        for tracker, state in tracker_streaks(user).items()
     }
 
-    return Response(streaks, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response(streaks, status=status.HTTP_200_OK)
+
+
+# --- Bulk Ingest View ---
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_tracker_logs(request):
+    """
+    Create up to BULK_LOG_MAX_ENTRIES tracker logs of mixed types in one request.
+
+    Body: {"entries": [{"type": "steps", "steps": 8000, "date_time": "..."}, ...]}, type being
+    weight, body_measurement, water, steps, cardio, sleep or health_metrics and the other
+    keys that tracker's create fields. All entries are saved in one transaction, or none:
+    any invalid entry fails the request with one {index, type, errors} item per bad entry.
+    """
+    entries = request.data.get('entries') if isinstance(request.data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        return Response({
+            'success': False,
+            'error': {'message': 'entries must be a non-empty list'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    max_size = settings.BULK_LOG_MAX_ENTRIES
+    if len(entries) > max_size:
+        return Response({
+            'success': False,
+            'error': {'message': f'A bulk request may contain at most {max_size} entries'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    valid, errors = validate_entries(entries)
+    if errors:
+        return Response({
+            'success': False,
+            'error': {
+                'message': f'{len(errors)} of {len(entries)} entries are invalid; nothing was saved',
+                'items': errors,
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    created = bulk_create_logs(request.user, valid)
+    return Response({
+        'success': True,
+        'data': {'created': created, 'total': sum(created.values())}
+    }, status=status.HTTP_201_CREATED)
+
+
+# --- History Import Views ---
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_tracker_history(request):
+    """
+    Import a CSV or JSON history export (multipart field "file") into the tracker logs.
+
+    Optional fields: "format" (csv or json; default from the file extension) and "type"
+    (tracker for rows without a type column). Uploading a file again resumes an unfinished
+    import of it from its last committed batch. The import runs within the request, so files
+    over TRACKER_IMPORT_MAX_UPLOAD_BYTES are refused (413) and must be imported with
+    `manage.py import_tracker_history`. Progress is readable at import/<id>/ meanwhile.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({
+            'success': False,
+            'error': {'message': 'file is required'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    max_bytes = settings.TRACKER_IMPORT_MAX_UPLOAD_BYTES
+    if upload.size > max_bytes:
+        return Response({
+            'success': False,
+            'error': {'message': f'Files over {max_bytes} bytes must be imported with '
+                                 f'manage.py import_tracker_history'}
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    file_format = import_format(upload.name, request.data.get('format'))
+    if file_format is None:
+        return Response({
+            'success': False,
+            'error': {'message': 'format must be csv or json'}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    default_type = request.data.get('type') or None
+    if default_type is not None and default_type not in BULK_SERIALIZERS:
+        return Response({
+            'success': False,
+            'error': {'message': f"type must be one of: {', '.join(BULK_SERIALIZERS)}"}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    job = start_import(request.user, upload, upload.name, file_format)
+    job = run_import(job, upload, default_type)
+    return Response({'success': True, 'data': import_payload(job)}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_tracker_import(request, pk):
+    """Progress and counters of one of the user's history imports"""
+    job = TrackerImport.objects.filter(user=request.user, pk=pk).first()
+    if job is None:
+        return Response({
+            'success': False,
+            'error': {'message': 'Import not found'}
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response({'success': True, 'data': import_payload(job)}, status=status.HTTP_200_OK)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_add_invite_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='timezone',
+            field=models.CharField(default='America/New_York', max_length=64),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .timezones import DEFAULT_TIMEZONE
+
 
 class AccessLevel(models.Model):
     """User application access levels"""
@@ -83,6 +85,8 @@ class User(AbstractUser):
         related_name='user',
         unique=True,
     )
+    # IANA zone that decides which calendar day a log belongs to (apps.users.timezones)
+    timezone = models.CharField(max_length=64, default=DEFAULT_TIMEZONE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
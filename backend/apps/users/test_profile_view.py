@@ -205,3 +205,17 @@ class ProfileViewTest(APITestCase):
         response = self.client.put(url, {'username': 'otheruser'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+
+    def test_put_profile_timezone(self):
+        """PUT stores an IANA timezone and GET returns it; unknown names are rejected."""
+        url = '/api/users/profile/'
+        response = self.client.put(url, {'timezone': 'Europe/Berlin'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.timezone, 'Europe/Berlin')
+        self.assertEqual(self.client.get(url).data['data']['user']['timezone'], 'Europe/Berlin')
+
+        response = self.client.put(url, {'timezone': 'Mars/Olympus'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.timezone, 'Europe/Berlin')
@@ -0,0 +1,103 @@
+"""
+Per-user calendar days.
+
+Log timestamps are stored in UTC; the calendar day a log belongs to depends on its owner's
+User.timezone. Analytics, rollups, streaks and the home dashboard all bucket through the
+helpers below, so they agree on where each user's day starts and ends:
+
+- Filters use day_range(): a half-open UTC range on the raw timestamp column, which the
+  (user_id, date_time) indexes serve directly, unlike DATE(date_time) or __date lookups.
+- Grouping uses LocalDate(), TruncDate in the user's zone evaluated by the database
+  (CONVERT_TZ on MySQL, which needs the server's time zone tables loaded).
+- Python converts single timestamps only (local_date), never row sets.
+"""
+
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.contrib.auth import get_user_model
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# New users, and users whose stored zone is no longer known
+DEFAULT_TIMEZONE = 'America/New_York'
+
+
+def is_valid_timezone(name):
+    """Whether name is an IANA timezone key, e.g. 'Europe/Berlin'."""
+    if not isinstance(name, str) or not name:
+        return False
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def zone_named(name):
+    """ZoneInfo for a timezone name; unknown or empty names fall back to DEFAULT_TIMEZONE."""
+    return ZoneInfo(name if is_valid_timezone(name) else DEFAULT_TIMEZONE)
+
+
+def user_timezone(user):
+    """The user's ZoneInfo; user is a User, or a user_id (costs one query)."""
+    if isinstance(user, int):
+        name = get_user_model().objects.filter(pk=user).values_list('timezone', flat=True).first()
+    else:
+        name = user.timezone
+    return zone_named(name)
+
+
+def user_timezones(user_ids=None):
+    """{user_id: ZoneInfo} for user_ids (None: every user) in one query."""
+    users = get_user_model().objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=list(user_ids))
+    return {user_id: zone_named(name) for user_id, name in users.values_list('pk', 'timezone')}
+
+
+def group_by_timezone(zones):
+    """Invert {user_id: ZoneInfo} into {ZoneInfo: [user_id, ...]}, one entry per distinct zone."""
+    groups = {}
+    for user_id, zone in zones.items():
+        groups.setdefault(zone, []).append(user_id)
+    return groups
+
+
+def local_today(user):
+    """Today's date where the user is."""
+    return timezone.now().astimezone(user_timezone(user)).date()
+
+
+def local_date(dt, zone):
+    """Calendar day of a timestamp in zone; naive timestamps are read in the default time zone."""
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt.astimezone(zone).date()
+
+
+def day_bounds(day, zone):
+    """[start, end) of a local calendar day as aware datetimes; DST days last 23 or 25 hours."""
+    start = datetime.combine(day, time.min, tzinfo=zone)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=zone)
+    return start, end
+
+
+def day_range(field, zone, date_from=None, date_to=None):
+    """
+    Filter kwargs selecting field values on the local days date_from..date_to (inclusive;
+    either bound optional), as an indexable range on the stored timestamp.
+    """
+    bounds = {}
+    if date_from is not None:
+        bounds[f'{field}__gte'] = day_bounds(date_from, zone)[0]
+    if date_to is not None:
+        bounds[f'{field}__lt'] = day_bounds(date_to, zone)[1]
+    return bounds
+
+
+class LocalDate(TruncDate):
+    """Local calendar day of a timestamp column, computed by the database."""
+
+    def __init__(self, expression, zone, **extra):
+        super().__init__(expression, tzinfo=zone, **extra)
@@ -20,7 +20,10 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from .models import User, UserGoal, Unit, ActivityLevel
 from .services import BodyMetricsService
+from .timezones import is_valid_timezone
 from apps.logging.models import WeightLog, BodyMeasurementLog
+from apps.analytics.models import WeightTrend
+from apps.analytics.weight_trend import weight_in_kg
 
 
 @api_view(['GET', 'PUT'])
@@ -79,6 +82,7 @@ def profile_detail(request):
                     'height': float(user.height) if user.height else None,
                     'birthday': user.birthday.isoformat() if user.birthday else None,
                     'gender': user.gender,
+                    'timezone': user.timezone,
                     'unit_preference': {
                         'unit_id': user.unit_preference.unit_id,
                         'unit_name': user.unit_preference.unit_name
@@ -180,6 +184,14 @@ def profile_detail(request):
                 if 'gender' in data:
                     user.gender = data['gender']
                 
+                if 'timezone' in data:
+                    if not is_valid_timezone(data['timezone']):
+                        return Response(
+                            {'error': {'message': 'Unknown timezone; use an IANA name such as Europe/Berlin'}},
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
+                    user.timezone = data['timezone']
+                
                 if 'unit_preference' in data:
                     raw_unit = data['unit_preference']
                     if raw_unit in (None, '', 0, '0'):
@@ -478,8 +490,12 @@ def _calculate_historical_data(user):
         else:
             days_span = 0
         
-        # Calculate weekly recommendation
-        weekly_change = (total_change / days_span) * 7 if days_span > 0 else 0
+        # Weekly change from the smoothed trend (kept in kg), in the unit of the latest log
+        trend_state = WeightTrend.objects.filter(user=user).first()
+        if trend_state is not None:
+            weekly_change = trend_state.slope * 7 / weight_in_kg(1, last_log.weight_unit)
+        else:
+            weekly_change = (total_change / days_span) * 7 if days_span > 0 else 0
         
         # Determine trend
         if abs(weekly_change) < 0.1:
@@ -0,0 +1,103 @@
+"""
+Split calendar - maps calendar dates onto the days of a workout split.
+
+A split repeats its days in day_order starting from Split.start_date, so the split day for
+any date is (date - start_date).days % len(days). SplitCalendar loads the split's days and
+their muscle targets once, then answers any number of date lookups from memory; the
+activation helpers sum WorkoutMuscle ratings for logged workouts in a single query.
+
+Used by analytics activation_progress and home_dashboard, and by workouts current_split_day.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Sum
+
+from apps.users.timezones import LocalDate, day_range, user_timezone
+from .models import Split, WorkoutLog
+
+
+class SplitCalendar:
+    """Date -> SplitDay lookups for one split, with targets prefetched."""
+
+    def __init__(self, split):
+        self.split = split
+        self.days = list(
+            split.splitday_set.order_by('day_order').prefetch_related('splitdaytarget_set__muscle')
+        )
+
+    @classmethod
+    def for_user(cls, user, on_date=None):
+        """
+        Calendar for the user's active split (latest start_date), or None if there is none.
+
+        on_date: only consider splits that had started by this date.
+        """
+        splits = Split.objects.filter(user=user, start_date__isnull=False)
+        if on_date is not None:
+            splits = splits.filter(start_date__lte=on_date)
+        split = splits.order_by('-start_date').first()
+        return cls(split) if split else None
+
+    def day_for(self, on_date):
+        """SplitDay scheduled on on_date, or None before the split starts or if it has no days."""
+        if not self.days:
+            return None
+        days_since_start = (on_date - self.split.start_date).days
+        if days_since_start < 0:
+            return None
+        return self.days[days_since_start % len(self.days)]
+
+    def days_for_range(self, date_from, date_to):
+        """
+        (date, SplitDay) for every date in date_from..date_to on or after the split start.
+
+        Computes the first index once and advances it modulo the cycle length.
+        """
+        if not self.days:
+            return []
+        first = max(date_from, self.split.start_date)
+        index = (first - self.split.start_date).days % len(self.days)
+        scheduled = []
+        for offset in range((date_to - first).days + 1):
+            scheduled.append((first + timedelta(days=offset), self.days[index]))
+            index = (index + 1) % len(self.days)
+        return scheduled
+
+    @staticmethod
+    def targets(split_day):
+        """SplitDayTarget rows for a split day (prefetched with their muscles)."""
+        return list(split_day.splitdaytarget_set.all())
+
+
+def activation_by_day(user, date_from, date_to):
+    """
+    Summed WorkoutMuscle activation_rating per day and muscle for workouts logged in
+    date_from..date_to (inclusive, by the user's local day): {date: {muscle_id: total}}.
+    """
+    zone = user_timezone(user)
+    rows = WorkoutLog.objects.filter(
+        user=user,
+        **day_range('date_time', zone, date_from, date_to),
+        workout__workoutmuscle__isnull=False,
+    ).annotate(day=LocalDate('date_time', zone)).values(
+        'day', 'workout__workoutmuscle__muscle_id'
+    ).annotate(total=Sum('workout__workoutmuscle__activation_rating'))
+
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(row['day'], {})[row['workout__workoutmuscle__muscle_id']] = int(row['total'] or 0)
+    return by_day
+
+
+def activation_by_muscle(user, window_start, window_end):
+    """Summed WorkoutMuscle activation_rating per muscle for logs in [window_start, window_end)."""
+    rows = WorkoutLog.objects.filter(
+        user=user,
+        date_time__gte=window_start,
+        date_time__lt=window_end,
+        workout__workoutmuscle__isnull=False,
+    ).values('workout__workoutmuscle__muscle_id').annotate(
+        total=Sum('workout__workoutmuscle__activation_rating')
+    )
+    return {row['workout__workoutmuscle__muscle_id']: int(row['total'] or 0) for row in rows}
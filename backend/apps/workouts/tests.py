@@ -6,10 +6,12 @@ These tests simulate real user interactions and actually test the database
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import date, datetime, timedelta
+from apps.logging.pagination import MAX_CURSOR_PAGE_SIZE, cursor_page_size
 from .models import Workout, Muscle, WorkoutLog, MuscleLog, WorkoutMuscle, Split, SplitDay, SplitDayTarget
 
 User = get_user_model()
@@ -460,3 +462,35 @@ class RealUserWorkflowTestCase(APITestCase):
         self.assertEqual(log.attributes, ['pause'])
         
         print("[OK] Workout logging working correctly with database operations")
+
+    def test_workout_logs_cursor_pagination(self):
+        """pagination=cursor returns keyset pages of `limit` sets, newest first"""
+        workout = Workout.objects.create(user=self.user, workout_name='Bench', type='barbell')
+        start = timezone.make_aware(datetime(2024, 1, 1, 8))
+        WorkoutLog.objects.bulk_create(
+            WorkoutLog(user=self.user, workout=workout, reps=i, date_time=start + timedelta(minutes=i // 2))
+            for i in range(7)
+        )
+        
+        seen, cursor = [], None
+        while True:
+            params = {'pagination': 'cursor', 'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/api/workouts/logs/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [log['reps'] for log in response.data['data']]
+            cursor = response.data['pagination']['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, list(range(6, -1, -1)))
+        
+        response = self.client.get('/api/workouts/logs/', {'pagination': 'cursor', 'include_total': 'true'})
+        self.assertEqual(response.data['pagination']['total'], 7)
+        response = self.client.get('/api/workouts/logs/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/workouts/logs/', {'pagination': 'cursor', 'limit': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/workouts/logs/', {'pagination': 'cursor', 'limit': 1000000})
+        self.assertEqual(len(response.data['data']), 7)
+        self.assertEqual(cursor_page_size('1000000'), MAX_CURSOR_PAGE_SIZE)
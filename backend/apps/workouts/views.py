@@ -9,10 +9,16 @@ from rest_framework import status
 from django.db.models import Q, Count, Sum, Avg, Max
 from django.utils import timezone
 from datetime import datetime, timedelta, date
+from apps.analytics.models import WorkoutDayRollup
+from apps.logging.pagination import (
+    CURSOR_PARAM, DATE_TIME_ORDERING, cursor_page_size, cursor_requested, keyset_page, total_requested,
+)
+from apps.users.timezones import day_range, user_timezone
 from .models import (
     Workout, Muscle, WorkoutMuscle, MuscleLog, WorkoutLog, 
-    Split, SplitDay, SplitDayTarget
+    Split, SplitDay
 )
+from .split_calendar import SplitCalendar
 from .serializers import (
     WorkoutSerializer, WorkoutCreateSerializer, WorkoutLogSerializer,
     WorkoutLogCreateSerializer, MuscleSerializer, MuscleLogSerializer,
@@ -172,12 +178,38 @@ def workout_logs(request):
         workout_id = request.GET.get('workout_id')
         limit = request.GET.get('limit')
         
-        if date_from:
-            logs = logs.filter(date_time__date__gte=date_from)
-        if date_to:
-            logs = logs.filter(date_time__date__lte=date_to)
+        try:
+            logs = logs.filter(**day_range(
+                'date_time', user_timezone(request.user),
+                date.fromisoformat(date_from) if date_from else None,
+                date.fromisoformat(date_to) if date_to else None,
+            ))
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': {'message': 'date_from and date_to must be YYYY-MM-DD'}
+            }, status=status.HTTP_400_BAD_REQUEST)
         if workout_id:
             logs = logs.filter(workout_id=workout_id)
+        if cursor_requested(request.GET):
+            # Keyset pages of `limit` (default 100, at most MAX_CURSOR_PAGE_SIZE) sets, newest first
+            try:
+                page_size = cursor_page_size(limit)
+                total = logs.count() if total_requested(request.GET) else None
+                page, next_cursor = keyset_page(logs, DATE_TIME_ORDERING, request.GET.get(CURSOR_PARAM), page_size)
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'error': {'message': str(e)}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            pagination = {'next_cursor': next_cursor}
+            if total is not None:
+                pagination['total'] = total
+            return Response({
+                'success': True,
+                'data': WorkoutLogSerializer(page, many=True, context={'request': request}).data,
+                'pagination': pagination,
+            })
         if limit:
             logs = logs[:int(limit)]
         
@@ -353,12 +385,9 @@ def current_split_day(request):
     
     # Get active split
     try:
-        active_split = Split.objects.filter(
-            user=request.user,
-            start_date__lte=target_date
-        ).order_by('-start_date').first()
+        calendar = SplitCalendar.for_user(request.user, on_date=target_date)
         
-        if not active_split:
+        if not calendar:
             return Response({
                 'success': True,
                 'data': {
@@ -366,12 +395,12 @@ def current_split_day(request):
                     'current_split_day': None
                 }
             })
+        active_split = calendar.split
         
         # Calculate current split day
-        days_since_start = (target_date - active_split.start_date).days
-        split_days = active_split.splitday_set.all().order_by('day_order')
+        current_split_day = calendar.day_for(target_date)
         
-        if not split_days.exists():
+        if not current_split_day:
             return Response({
                 'success': True,
                 'data': {
@@ -380,13 +409,9 @@ def current_split_day(request):
                 }
             })
         
-        current_day_index = days_since_start % split_days.count()
-        current_split_day = split_days[current_day_index]
-        
         # Get targets for this day
-        targets = SplitDayTarget.objects.filter(split_day=current_split_day)
         targets_data = []
-        for target in targets:
+        for target in calendar.targets(current_split_day):
             targets_data.append({
                 'muscle': target.muscle.muscles_id,
                 'muscle_name': target.muscle.muscle_name,
@@ -425,26 +450,25 @@ def workout_stats(request):
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     
-    # Get workout logs for stats calculation
-    workout_logs = WorkoutLog.objects.filter(user=user)
+    # Set totals come from the per-day workout rollup rather than scanning workout_log
+    rollups = WorkoutDayRollup.objects.filter(user=user)
     
     # Apply date filtering if provided
     if date_from:
-        workout_logs = workout_logs.filter(date_time__date__gte=date_from)
+        rollups = rollups.filter(date__gte=date_from)
     if date_to:
-        workout_logs = workout_logs.filter(date_time__date__lte=date_to)
-    
-    # Calculate stats from workout logs
-    total_sets = workout_logs.count()
-    total_weight_lifted = workout_logs.aggregate(
-        total=Sum('weight')
-    )['total'] or 0
-    total_reps = workout_logs.aggregate(
-        total=Sum('reps')
-    )['total'] or 0
-    total_rir = workout_logs.aggregate(
-        total=Sum('rir')
-    )['total'] or 0
+        rollups = rollups.filter(date__lte=date_to)
+    
+    totals = rollups.aggregate(
+        total_sets=Sum('set_count'),
+        total_weight_lifted=Sum('weight_sum'),
+        total_reps=Sum('total_reps'),
+        total_rir=Sum('total_rir'),
+    )
+    total_sets = totals['total_sets'] or 0
+    total_weight_lifted = totals['total_weight_lifted'] or 0
+    total_reps = totals['total_reps'] or 0
+    total_rir = totals['total_rir'] or 0
     
     # Basic stats
     total_workouts = Workout.objects.filter(user=user).count()
@@ -55,6 +55,7 @@ LOCAL_APPS = [
     'apps.openai_service',
     'apps.database_setup',
     'apps.data_viewer',
+    'apps.batch',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -165,6 +166,19 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Maximum number of sub-requests accepted by POST /api/batch/
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+
+# Maximum number of entries accepted by POST /api/logging/bulk/
+BULK_LOG_MAX_ENTRIES = int(os.getenv('BULK_LOG_MAX_ENTRIES', 5000))
+
+# Largest history export accepted by POST /api/logging/import/ (imported within the request);
+# bigger files go through `manage.py import_tracker_history`
+TRACKER_IMPORT_MAX_UPLOAD_BYTES = int(os.getenv('TRACKER_IMPORT_MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+
+# Per-process memory cap for cached analytics series (apps.analytics.series_cache)
+ANALYTICS_SERIES_CACHE_MAX_BYTES = int(os.getenv('ANALYTICS_SERIES_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
 # JWT Configuration
 from datetime import timedelta
 
@@ -214,6 +228,7 @@ OPENAI_API_KEY = _openai_key.strip() if _openai_key else None
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
 
 # Logging Configuration
+(BASE_DIR / 'logs').mkdir(exist_ok=True)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -19,6 +19,7 @@ urlpatterns = [
     path('api/analytics/', include('apps.analytics.urls')),
     path('api/openai/', include('apps.openai_service.urls')),
     path('api/data-viewer/', include('apps.data_viewer.urls')),
+    path('api/batch/', include('apps.batch.urls')),
 ]
 
 if settings.DEBUG: